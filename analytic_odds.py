@@ -0,0 +1,230 @@
+import itertools
+
+import numpy as np
+
+from league_index import get_league_index
+from simulation import HOME_ADVANTAGE, LOGISTIC_SCALE, NOISE_SCALE, schedule_team_ids
+from tiebreakers import CONFERENCES, NUM_PLAYOFF_SEEDS
+
+# Gauss-Hermite points used to average the win probability over the game noise; the integrand is smooth,
+# so 32 points is exact to well below anything the odds are shown with
+QUADRATURE_POINTS = 32
+NUM_DIVISION_WINNERS = 4
+
+
+def game_win_probabilities(schedule, teams, noise_scale=NOISE_SCALE, points=QUADRATURE_POINTS):
+    """
+    Exact chance the home team wins each game under the simulate_game model: the logistic of the strength
+    difference plus home advantage, averaged over the gaussian noise with Gauss-Hermite quadrature.
+    Returns (home_ids, away_ids, home_win_probability), games in schedule_team_ids order.
+    """
+    home_ids, away_ids = schedule_team_ids(schedule, teams)
+    strength = get_league_index(teams).strength
+    base_diff = strength[home_ids] + HOME_ADVANTAGE - strength[away_ids]
+
+    # E[f(noise)] for noise ~ N(0, s^2) is sum(w_k f(sqrt(2) s x_k)) / sqrt(pi)
+    nodes, weights = np.polynomial.hermite.hermgauss(points)
+    noise = np.sqrt(2.0) * noise_scale * nodes
+    win_prob = 1 / (1 + np.exp(-LOGISTIC_SCALE * (base_diff[:, None] + noise[None, :])))
+    # the weights sum to sqrt(pi) only up to rounding, which can push a sure thing just past 1
+    return home_ids, away_ids, np.clip(win_prob @ weights / np.sqrt(np.pi), 0.0, 1.0)
+
+
+def win_distributions(schedule, teams, noise_scale=NOISE_SCALE):
+    """
+    (number of teams x most games + 1) array where [i, w] is the exact chance team i wins w regular season
+    games. Games are independent given the schedule, so each row is a Poisson-binomial distribution,
+    built one game at a time for every team at once.
+    """
+    home_ids, away_ids, home_win = game_win_probabilities(schedule, teams, noise_scale)
+    return _poisson_binomial(np.concatenate([home_ids, away_ids]), np.concatenate([home_win, 1 - home_win]),
+                             len(teams))
+
+
+def _poisson_binomial(team_ids, game_probs, num_teams):
+    # win_distributions for any set of games, team_ids[k] wins game k with game_probs[k]
+    # every team's win probability in each of its games, padded with games it can't win
+    order = np.argsort(team_ids, kind="stable")
+    games_played = np.bincount(team_ids, minlength=num_teams)
+    slots = np.arange(len(team_ids)) - np.repeat(np.cumsum(games_played) - games_played, games_played)
+    probs = np.zeros((num_teams, games_played.max(initial=0)))
+    probs[team_ids[order], slots] = game_probs[order]
+
+    distribution = np.zeros((num_teams, probs.shape[1] + 1))
+    distribution[:, 0] = 1.0
+    for game in range(probs.shape[1]):
+        p = probs[:, game:game + 1]
+        distribution[:, 1:] = distribution[:, 1:] * (1 - p) + distribution[:, :-1] * p
+        distribution[:, 0] *= 1 - p[:, 0]
+    return distribution
+
+
+def _record_pct(wins, games):
+    # like the tiebreakers, no games counts as .500
+    return np.where(games > 0, wins / np.maximum(games, 1), 0.5)
+
+
+def _division_winner_odds(members, pair_games, outside, strength, num_totals):
+    """
+    (division teams x win totals) chance that members[i] wins w games and its division, with the division's
+    games against each other modeled jointly.
+
+    pair_games[(a, b)] are the chances members[a] beats members[b] in each of their games (a < b) and
+    outside[i] is members[i]'s win distribution from every other game. Given who won the games inside the
+    division, the members' other games have nothing in common, so their totals are independent from there.
+    Every split of the head-to-head games is enumerated (3^6 of them for a division playing home and away)
+    and ties are broken like tiebreakers.PlayoffSeeding: head-to-head among the tied teams, then division
+    record, then strength and list order (common games and conference record would need the other games too).
+    """
+    size = len(members)
+    pairs = sorted(pair_games)
+    # chance of each number of wins for the first team of every pair, and every combination of those
+    pair_dists = [_poisson_binomial(np.zeros(len(pair_games[pair]), dtype=np.intp),
+                                    np.asarray(pair_games[pair]), 1)[0] for pair in pairs]
+    splits = np.array(list(itertools.product(*(range(len(dist)) for dist in pair_dists))), dtype=np.intp)
+    splits = splits.reshape(-1, len(pairs))
+    chance = np.ones(len(splits))
+    beat = np.zeros((len(splits), size, size))     # beat[s, a, b] = how often a beat b in split s
+    games = np.zeros((size, size))
+    for column, ((a, b), dist) in enumerate(zip(pairs, pair_dists)):
+        chance *= dist[splits[:, column]]
+        beat[:, a, b] = splits[:, column]
+        beat[:, b, a] = len(dist) - 1 - splits[:, column]
+        games[a, b] = games[b, a] = len(dist) - 1
+
+    # win total distributions given the split: the outside distribution shifted by the division wins
+    division_wins = beat.sum(axis=2).astype(np.intp)
+    totals = np.arange(num_totals)
+    exactly = np.zeros((len(splits), size, num_totals))
+    for i in range(size):
+        outside_wins = totals[None, :] - division_wins[:, i:i + 1]
+        valid = (outside_wins >= 0) & (outside_wins < len(outside[i]))
+        exactly[:, i] = np.where(valid, outside[i][np.clip(outside_wins, 0, len(outside[i]) - 1)], 0.0)
+    below = np.cumsum(exactly, axis=2) - exactly
+    division_pct = _record_pct(division_wins, games.sum(axis=1)[None, :])
+
+    # who comes out on top of every set of tied teams, in every split
+    top = {}
+    for tied in itertools.chain.from_iterable(itertools.combinations(range(size), n) for n in range(1, size + 1)):
+        tied = list(tied)
+        head_to_head = _record_pct(beat[:, tied][:, :, tied].sum(axis=2),
+                                   games[tied][:, tied].sum(axis=1)[None, :])
+        order = np.lexsort((
+            np.broadcast_to(members[tied], (len(splits), len(tied))),
+            np.broadcast_to(-strength[members[tied]], (len(splits), len(tied))),
+            -division_pct[:, tied],
+            -head_to_head,
+        ), axis=-1)
+        top[tuple(tied)] = np.array(tied)[order[:, 0]]
+
+    joint = np.zeros((size, num_totals))
+    for i in range(size):
+        rivals = [j for j in range(size) if j != i]
+        for n in range(size):
+            for tied_with in itertools.combinations(rivals, n):
+                # the rivals in tied_with have as many wins as team i, the rest fewer
+                wins_it = chance * (top[tuple(sorted((i,) + tied_with))] == i)
+                outcome = exactly[:, i].copy()
+                for j in rivals:
+                    outcome *= exactly[:, j] if j in tied_with else below[:, j]
+                joint[i] += wins_it @ outcome
+    return joint
+
+
+def _count_ahead(ahead):
+    """
+    Distribution of how many of the teams are ahead, (teams + 1 x win totals), each team independently
+    ahead with ahead[j]
+    """
+    count = np.zeros((len(ahead) + 1, ahead.shape[1]))
+    count[0] = 1.0
+    for ahead_j in ahead:
+        count[1:] = count[1:] * (1 - ahead_j) + count[:-1] * ahead_j
+        count[0] *= 1 - ahead_j
+    return count
+
+
+def analytic_playoff_odds(schedule, teams, noise_scale=NOISE_SCALE):
+    """
+    playoff_probabilities without sampling: deterministic, and milliseconds for the whole league.
+    Returns per-team arrays indexed like `teams`:
+      - 'mean_wins'        : exact expected regular season wins
+      - 'win_distribution' : (number of teams x most games + 1) exact chance of each win total
+      - 'win_division'     : chance of winning the division
+      - 'make_playoffs'    : chance of one of the 7 seeds
+
+    Division odds model the division's games against each other jointly and break ties on head-to-head and
+    division record (see _division_winner_odds), so they only leave out the common games and conference
+    record tiebreakers. Wild cards are rougher: they treat the teams' win totals as independent, which they
+    aren't (every game is one team's win and the other's loss), ties go to the stronger team, then list
+    order, and the chances are scaled so every conference has exactly 3 wild cards. Use playoff_probabilities
+    when the playoff odds of a close race matter.
+    """
+    home_ids, away_ids, home_win = game_win_probabilities(schedule, teams, noise_scale)
+    team_ids = np.concatenate([home_ids, away_ids])
+    opponent_ids = np.concatenate([away_ids, home_ids])
+    game_probs = np.concatenate([home_win, 1 - home_win])
+    distribution = _poisson_binomial(team_ids, game_probs, len(teams))
+    num_teams, num_totals = distribution.shape
+    at_most = np.cumsum(distribution, axis=1)
+    above = 1 - at_most                          # P(W_j > w)
+    strength = get_league_index(teams).strength
+    wild_card_slots = NUM_PLAYOFF_SEEDS - NUM_DIVISION_WINNERS
+
+    divisions = [(team.conference, team.division) for team in teams]
+    division_code = np.unique(divisions, axis=0, return_inverse=True)[1].ravel()
+    in_division = division_code[team_ids] == division_code[opponent_ids]
+    outside = _poisson_binomial(team_ids[~in_division], game_probs[~in_division], num_teams)
+    # chance of each win total together with winning the division
+    wins_division = np.zeros((num_teams, num_totals))
+    for code in np.unique(division_code):
+        members = np.nonzero(division_code == code)[0]
+        local = {team_id: position for position, team_id in enumerate(members)}
+        pair_games = {}
+        for home_id, away_id, p in zip(home_ids, away_ids, home_win):
+            if home_id in local and away_id in local:
+                a, b = sorted((local[home_id], local[away_id]))
+                pair_games.setdefault((a, b), []).append(p if local[home_id] == a else 1 - p)
+        wins_division[members] = _division_winner_odds(members, pair_games, outside[members], strength, num_totals)
+    win_division = wins_division.sum(axis=1)
+
+    wild_card = np.zeros(num_teams)
+    for i in range(num_teams):
+        rivals = [j for j in range(num_teams) if j != i and divisions[j] == divisions[i]]
+
+        # chance every other team finishes ahead of team i for wild card purposes, if team i wins w games
+        wins_ties = np.array([(strength[j], -j) > (strength[i], -i) for j in range(num_teams)])
+        ahead = above + distribution * wins_ties[:, None]
+
+        # wild card contenders ahead of us from the other divisions: everyone ahead except the division
+        # winner, so max(0, ahead - 1) per division. Only counts below wild_card_slots matter.
+        contenders = np.zeros((wild_card_slots, num_totals))
+        contenders[0] = 1.0
+        for division in sorted({d for d in divisions if d[0] == divisions[i][0] and d != divisions[i]}):
+            count = _count_ahead(ahead[[j for j in range(num_teams) if divisions[j] == division]])
+            extra = np.concatenate([count[:1] + count[1:2], count[2:]])
+            total = np.zeros_like(contenders)
+            for k, share in enumerate(extra[:wild_card_slots]):
+                total[k:] += contenders[:wild_card_slots - k] * share
+            contenders = total
+
+        # the rivals ahead of us are contenders too, all but the one who wins the division
+        own = _count_ahead(ahead[rivals])
+        makes_it = own[0] * contenders.sum(axis=0)
+        for rivals_ahead in range(1, min(len(own), wild_card_slots + 1)):
+            makes_it += own[rivals_ahead] * contenders[:wild_card_slots - rivals_ahead + 1].sum(axis=0)
+        # and we need to not win the division ourselves
+        wild_card[i] = (distribution[i] - wins_division[i]) @ makes_it
+
+    for conf in CONFERENCES:
+        in_conf = np.array([team.conference == conf for team in teams])
+        total = wild_card[in_conf].sum()
+        if total > 0:
+            wild_card[in_conf] *= wild_card_slots / total
+
+    return {
+        'mean_wins': distribution @ np.arange(num_totals),
+        'win_distribution': distribution,
+        'win_division': win_division,
+        'make_playoffs': np.minimum(win_division + wild_card, 1.0),
+    }
@@ -1,4 +1,6 @@
+import json
 import math
+import os
 import random
 from collections import defaultdict
 import streamlit as st
@@ -18,15 +20,24 @@ from optimizer import (
     generate_swap_candidates,
     swap_games,
     optimize_schedule_backtracking,
+    SearchProfile,
 )
-from schedule_to_df import schedule_to_dataframe
+from multistart import optimize_multistart
+from league_index import get_league_index
+from result_store import ResultStore, result_key
+from schedule_library import open_library, DEFAULT_LIBRARY_PATH
+from pareto import ParetoArchive
+from schedule_to_df import schedule_to_dataframe, schedule_views
+from validation import validate_schedule
 from simulation import (
     simulate_game,
     simulate_season,
     determine_playoff_teams,
     simulate_playoffs,
     full_season_playoff_simulation,
+    playoff_probabilities,
 )
+from analytic_odds import analytic_playoff_odds
 
 # Configuring the page layout and title
 st.set_page_config(
@@ -52,18 +63,40 @@ revenue_weight = st.sidebar.slider("Revenue/Prime Time weight", 0.0, 2.0, 0.5, 0
 #random seeds for reproducibility
 initial_schedule_seed = st.sidebar.number_input("Initial schedule seed", 0, 9999, 123, 1)
 optimizer_seed = st.sidebar.number_input("Optimizer seed", 0, 9999, 0, 1)
+vary_seeds = st.sidebar.checkbox("New seeds on every click", value=True,
+                                 help="Turn off to get the same schedule back for the same settings. Only then "
+                                      "are schedules remembered, so going back to earlier settings is instant "
+                                      "(runs with a time budget never are, they depend on how fast they ran)")
 
 
 #limits for backtracking
 max_depth = st.sidebar.slider("Backtracking depth", 1, 4, 2, 1)
 max_nodes = st.sidebar.slider("Max search nodes", 100, 5000, 800, 100)
+
+# anytime limits, 0 turns them off; the optimizer returns the best schedule so far when one hits
+time_budget_s = st.sidebar.slider("Time budget per run (seconds, 0 = off)", 0.0, 30.0, 0.0, 0.5)
+patience = st.sidebar.number_input("Stop after swaps without improvement (0 = off)", 0, 100000, 0, 50)
+
+# more starts = more initial schedules tried, and workers lets them run on several cores at once
+n_starts = st.sidebar.slider("Optimizer starts", 1, 32, 1, 1)
+# a slider needs two values to pick from, so there's only one on machines with more than one CPU
+cpu_count = os.cpu_count() or 1
+n_workers = st.sidebar.slider("Worker processes", 1, cpu_count, 1, 1) if cpu_count > 1 else 1
+profile_optimizer = st.sidebar.checkbox("Profile the optimizer", value=False)
+keep_pareto = st.sidebar.checkbox("Keep trade-off archive (1 start only)", value=False,
+                                  help="Keeps every non-dominated schedule the search sees, so other weights "
+                                       "can be tried without optimizing again")
     
 if "schedule_df" not in st.session_state:
     st.session_state["schedule_df"] = None
+    st.session_state["schedule_views"] = None
     st.session_state["debug"] = None
     st.session_state["initial_metrics"] = None
     st.session_state["current_schedule"] = None
     st.session_state["teams"] = None
+    st.session_state["start_stats"] = None
+    st.session_state["schedule_issues"] = None
+    st.session_state["pareto_archive"] = None
 
 
 #Used AI to debug for this(69- 78), essentially was getting same schedules, needed different randomness
@@ -75,57 +108,219 @@ if "simulate_run_id" not in st.session_state:
     st.session_state["simulate_run_id"] = 0
 
 
-# Main schedule generation button
-if st.sidebar.button("Generate Schedule"):
-    # Increment our run counter so we get different results each time
-    st.session_state["generate_run_id"] += 1
-    run_id = st.session_state["generate_run_id"]
+@st.cache_resource
+def load_league():
+    """
+    The league and its index (distances, matchup quality, fingerprint), built once and shared by every session
+    """
+    teams = make_full_league()
+    return teams, get_league_index(teams)
+
+
+@st.cache_resource
+def load_result_store():
+    """
+    On-disk store of optimizer results shared with every other app process on this machine
+    (the file is set by the SCHEDULE_RESULT_STORE environment variable)
+    """
+    return ResultStore()
+
+
+@st.cache_resource
+def load_schedule_library():
+    """
+    Saved schedules for this league, kept across restarts (the file is set by the SCHEDULE_LIBRARY
+    environment variable). Memory-mapped, so only the schedules we look at get read.
+    """
+    teams, _ = load_league()
+    return open_library(DEFAULT_LIBRARY_PATH, teams)
+
+
+def _generate_schedule(
+    _teams,
+    league_fingerprint,
+    weights,
+    initial_seed,
+    optimizer_seed,
+    max_depth,
+    max_nodes,
+    n_starts,
+    time_budget_s,
+    patience,
+    profile,
+    pareto=False,
+    _n_workers=1,
+    _progress_callback=None,
+):
+    teams = _teams
+
+    def optimize():
+        return _optimize(teams, weights, initial_seed, optimizer_seed, max_depth, max_nodes, n_starts,
+                         time_budget_s, patience, profile, pareto, _progress_callback, _n_workers)
+
+    if profile or pareto or time_budget_s:
+        # profiles are about how long this run took and archives are too big to store, so neither
+        # comes from the store. A time budget stops wherever the clock says, so those runs can't be reused
+        optimized_schedule, stored = optimize()
+    else:
+        key = result_key(
+            league_fingerprint,
+            weights=list(weights),
+            initial_seed=initial_seed,
+            optimizer_seed=optimizer_seed,
+            max_depth=max_depth,
+            max_nodes=max_nodes,
+            n_starts=n_starts,
+            time_budget_s=time_budget_s,
+            patience=patience,
+        )
+        optimized_schedule, stored = load_result_store().get_or_compute(key, teams, optimize)
 
-    teams = make_full_league()  #Create league 
-    
-    starting_schedule, starting_debug = generate_initial_schedule( #generate some initial valid schedule
-        teams, 
-        num_weeks=18, 
-        seed=int(initial_schedule_seed) + run_id
-    )
-    
-    
-    # Calculate metrics for the initial schedule so we can compare improvement later
-    initial_metrics = compute_metrics(starting_schedule, teams, {})
-    st.session_state["initial_metrics"] = initial_metrics
-    
+    schedule_df = schedule_to_dataframe(optimized_schedule)
+    return {
+        "schedule": optimized_schedule,
+        "debug": stored["debug"],
+        "initial_metrics": stored["initial_metrics"],
+        "start_stats": stored["start_stats"],
+        "pareto_archive": stored.get("pareto_archive"),
+        # Convert schedule to a DataFrame for easier use/display on streamlit
+        "schedule_df": schedule_df,
+        "schedule_views": schedule_views(schedule_df),
+        "schedule_issues": validate_schedule(optimized_schedule, teams),
+    }
+
+
+# Remembers the last few generated schedules, so going back to a combination of weights, seeds and limits
+# is instant. Keyed by every argument except the ones starting with _ (the worker count doesn't change
+# the result), bounded so long sessions don't keep growing. Only used when the same settings give the
+# same schedule, i.e. fixed seeds and no time budget.
+generate_optimized_schedule = st.cache_data(max_entries=32, show_spinner=False)(_generate_schedule)
+
+
+def _optimize(teams, weights, initial_seed, optimizer_seed, max_depth, max_nodes, n_starts, time_budget_s, patience,
+              profile, pareto, progress_callback, n_workers):
+    """
+    Runs the optimizer for generate_optimized_schedule. Returns the schedule and a dict with the debug,
+    initial metrics and multi-start stats, which is what goes in the result store (plus the trade-off
+    archive if pareto, which doesn't).
+    """
+    archive = None
+    if n_starts > 1:
+        # Optimize several different initial schedules (in parallel if we have workers) and keep the best
+        optimized_schedule, final_debug, start_stats = optimize_multistart(
+            teams,
+            n_starts=n_starts,
+            workers=n_workers,
+            travel_weight=weights[0],
+            fatigue_weight=weights[1],
+            sos_weight=weights[2],
+            revenue_weight=weights[3],
+            max_depth=max_depth,
+            max_nodes=max_nodes,
+            initial_seed=initial_seed,
+            optimizer_seed=optimizer_seed,
+            time_budget_s=time_budget_s,
+            patience=patience,
+            profile=profile,
+        )
+        best_start = min(start_stats, key=lambda stats: stats["best_cost"])
+        initial_metrics = best_start["initial_metrics"]
+    else:
+        starting_schedule, starting_debug = generate_initial_schedule( #generate some initial valid schedule
+            teams, 
+            num_weeks=18, 
+            seed=initial_seed
+        )
     
-    # Run the backtracking optimizer to improve the schedule
-    optimized_schedule, final_debug = optimize_schedule_backtracking(
-        starting_schedule,
+        # Calculate metrics for the initial schedule so we can compare improvement later
+        initial_metrics = compute_metrics(starting_schedule, teams, {})
+        if pareto:
+            archive = ParetoArchive(teams)
+
+        # Run the backtracking optimizer to improve the schedule
+        optimized_schedule, final_debug = optimize_schedule_backtracking(
+            starting_schedule,
+            teams,
+            starting_debug,
+            travel_weight=weights[0],
+            fatigue_weight=weights[1],
+            sos_weight=weights[2],
+            revenue_weight=weights[3],
+            max_depth=max_depth,
+            max_nodes=max_nodes,
+            seed=optimizer_seed,
+            time_budget_s=time_budget_s,
+            patience=patience,
+            progress_callback=progress_callback,
+            profile=SearchProfile() if profile else None,
+            archive=archive,
+        )
+        start_stats = None
+
+    stored = {"debug": final_debug, "initial_metrics": initial_metrics, "start_stats": start_stats}
+    if archive is not None:
+        stored["pareto_archive"] = archive
+    return optimized_schedule, stored
+
+
+# Main schedule generation button
+if st.sidebar.button("Generate Schedule"):
+    # Increment our run counter so we get different results each time (unless the user wants the same seeds,
+    # then the same settings give the same schedule and it comes straight from the cache)
+    if vary_seeds:
+        st.session_state["generate_run_id"] += 1
+    run_id = st.session_state["generate_run_id"] if vary_seeds else 0
+
+    teams, league_index = load_league()  #Create league 
+
+    # Progress bar follows whichever limit we're closest to, the node budget or the time budget
+    progress_bar = st.progress(0.0, text="Optimizing schedule...")
+
+    def show_progress(elapsed, nodes, best_cost):
+        done = nodes / max_nodes
+        if time_budget_s:
+            done = max(done, elapsed / time_budget_s)
+        progress_bar.progress(min(done, 1.0), text=f"Optimizing schedule... best cost {best_cost:.1f}")
+
+    # new seeds every click would never hit the cache, and time-budgeted runs aren't repeatable
+    generate = _generate_schedule if vary_seeds or time_budget_s else generate_optimized_schedule
+    result = generate(
         teams,
-        starting_debug,
-        travel_weight=travel_weight,
-        fatigue_weight=fatigue_weight,
-        sos_weight=sos_weight,
-        revenue_weight=revenue_weight,
+        league_index.fingerprint,
+        (travel_weight, fatigue_weight, sos_weight, revenue_weight),
+        initial_seed=int(initial_schedule_seed) + run_id,
+        optimizer_seed=int(optimizer_seed) + run_id, #in conjunction with lines 69-78, this was changed as I used Ai to debug 
+                                                      #this is because problem was getting same schedules a lot of time so I needed
+                                                      #to introduce more randomness, which this does, 
         max_depth=int(max_depth),
         max_nodes=int(max_nodes),
-        seed=int(optimizer_seed) + run_id, #in conjunction with lines 69-78, this was changed as I used Ai to debug 
-                                            #this is because problem was getting same schedules a lot of time so I needed
-                                            #to introduce more randomness, which this does, 
+        n_starts=int(n_starts),
+        _n_workers=int(n_workers),
+        time_budget_s=float(time_budget_s) or None,
+        patience=int(patience) or None,
+        profile=profile_optimizer,
+        pareto=keep_pareto,
+        _progress_callback=show_progress,
     )
+    progress_bar.empty()
 
-    
-    # Convert schedule to a DataFrame for easier use/display on streamlit
-    schedule_df = schedule_to_dataframe(optimized_schedule)
-    
     # Store everything in session state
-    st.session_state["schedule_df"] = schedule_df
-    st.session_state["debug"] = final_debug
-    st.session_state["current_schedule"] = optimized_schedule
+    st.session_state["schedule_df"] = result["schedule_df"]
+    st.session_state["schedule_views"] = result["schedule_views"]
+    st.session_state["debug"] = result["debug"]
+    st.session_state["initial_metrics"] = result["initial_metrics"]
+    st.session_state["start_stats"] = result["start_stats"]
+    st.session_state["current_schedule"] = result["schedule"]
     st.session_state["teams"] = teams
+    st.session_state["schedule_issues"] = result["schedule_issues"]
+    st.session_state["pareto_archive"] = result["pareto_archive"]
     
 
 # Playoff simulation section
 st.sidebar.markdown("---")
 st.sidebar.subheader("Playoff Simulation")
 simulation_seed = st.sidebar.number_input("Simulation seed", 0, 9999, 42, 1)
+odds_sims = st.sidebar.number_input("Seasons for playoff odds", 1000, 100000, 10000, 1000)
 
 
 if "playoff_results" not in st.session_state:
@@ -133,6 +328,7 @@ if "playoff_results" not in st.session_state:
     st.session_state["season_records"] = None
     st.session_state["afc_playoff"] = None
     st.session_state["nfc_playoff"] = None
+    st.session_state["playoff_odds"] = None
 
 if st.sidebar.button(" Simulate Season & Playoffs"):
     # Want to make sure we have a schedule first
@@ -153,11 +349,52 @@ if st.sidebar.button(" Simulate Season & Playoffs"):
             st.session_state["afc_playoff"] = afc_teams
             st.session_state["nfc_playoff"] = nfc_teams
             st.session_state["playoff_results"] = playoff_results
+
+            # Run many seasons at once so we can show the odds, not just the one outcome above
+            st.session_state["playoff_odds"] = playoff_probabilities(
+                st.session_state["current_schedule"],
+                st.session_state["teams"],
+                n_sims=int(odds_sims),
+                seed=int(simulation_seed) + sim_run_id,
+            )
             
         st.sidebar.success("Simulation complete!")
     else:
         st.sidebar.error("Please click the generate schedule button first!")
 
+# Saving schedules so they outlive the session, and loading them back
+st.sidebar.markdown("---")
+st.sidebar.subheader("Schedule Library")
+library = load_schedule_library()
+library.refresh()  # other sessions and processes may have added schedules
+
+if st.sidebar.button("Save schedule to library", disabled=st.session_state["current_schedule"] is None):
+    index = library.append(st.session_state["current_schedule"], st.session_state["debug"], st.session_state["teams"])
+    st.sidebar.success(f"Saved as schedule #{index}")
+
+if len(library):
+    # only the metrics column of the file is read to build this list
+    costs = library.metrics_table()[:, library.metric_names.index("best_cost")]
+    library_index = st.sidebar.selectbox(
+        f"Saved schedules ({len(library)})",
+        range(len(library)),
+        index=len(library) - 1,
+        format_func=lambda i: f"#{i}  cost {costs[i]:.1f}",
+    )
+    if st.sidebar.button("Load saved schedule"):
+        teams, _ = load_league()
+        saved_schedule = library.schedule(library_index, teams)
+        st.session_state["current_schedule"] = saved_schedule
+        st.session_state["teams"] = teams
+        st.session_state["schedule_df"] = schedule_to_dataframe(saved_schedule)
+        st.session_state["schedule_views"] = schedule_views(st.session_state["schedule_df"])
+        st.session_state["schedule_issues"] = validate_schedule(saved_schedule, teams)
+        st.session_state["debug"] = library.metrics(library_index)
+        st.session_state["initial_metrics"] = None
+        st.session_state["start_stats"] = None
+        st.session_state["pareto_archive"] = None
+        st.rerun()
+
 # Get our data from session state
 schedule_df = st.session_state["schedule_df"]
 debug = st.session_state["debug"]
@@ -172,7 +409,9 @@ if st.session_state["playoff_results"] is not None:
     st.success(f"### Super Bowl Champion: **{champion.name}** ")
     
     #create different view tabs for better/easier visualizations
-    tab1, tab2, tab3, tab4 = st.tabs(["Final Standings", "Playoff Bracket", "Playoff Results", "Season Stats"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(
+        ["Final Standings", "Playoff Bracket", "Playoff Results", "Season Stats", "Playoff Odds"]
+    )
     
     with tab1:
         st.subheader("Final Regular Season Standings")
@@ -321,6 +560,57 @@ if st.session_state["playoff_results"] is not None:
           
         with col2:
             st.metric("Average Wins", f"{avg_wins:.1f}")
+
+    # Odds over many simulated seasons for every team, split by conference
+    with tab5:
+        odds = st.session_state.get("playoff_odds")
+        if odds is not None:
+            st.subheader(f"Playoff Odds over {int(odds_sims):,} Simulated Seasons")
+            odds_df = pd.DataFrame({
+                'Team': [team.name for team in st.session_state["teams"]],
+                'Conference': [team.conference for team in st.session_state["teams"]],
+                'Division': [team.division for team in st.session_state["teams"]],
+                'Avg Wins': odds['mean_wins'].round(1),
+                'Playoffs %': (odds['make_playoffs'] * 100).round(1),
+                '#1 Seed %': (odds['seed'][:, 0] * 100).round(1),
+                'Win Conf %': (odds['win_conference'] * 100).round(1),
+                'Win SB %': (odds['win_super_bowl'] * 100).round(1),
+            })
+
+            col1, col2 = st.columns(2)
+            for col, conf in [(col1, 'AFC'), (col2, 'NFC')]:
+                with col:
+                    st.markdown(f"### {conf}")
+                    conf_odds = odds_df[odds_df['Conference'] == conf].drop(columns=['Conference'])
+                    st.dataframe(
+                        conf_odds.sort_values(['Playoffs %', 'Win SB %'], ascending=False),
+                        hide_index=True,
+                        use_container_width=True,
+                    )
+
+        # Same model worked out exactly instead of sampled, cheap enough to redo on every rerun
+        st.subheader("Analytic Odds (no sampling)")
+        st.caption("Win totals are exact. Division odds break ties on head-to-head and division record only. "
+                   "Playoff odds treat the teams' records as independent, so they can be well off in close "
+                   "wild card races: use the simulated odds for those")
+        analytic = analytic_playoff_odds(st.session_state["current_schedule"], st.session_state["teams"])
+        team_names = [team.name for team in st.session_state["teams"]]
+        analytic_df = pd.DataFrame({
+            'Team': team_names,
+            'Conference': [team.conference for team in st.session_state["teams"]],
+            'Exp Wins': analytic['mean_wins'].round(2),
+            'Win Div %': (analytic['win_division'] * 100).round(1),
+            'Playoffs %': (analytic['make_playoffs'] * 100).round(1),
+        })
+        st.dataframe(
+            analytic_df.sort_values(['Conference', 'Playoffs %'], ascending=[True, False]),
+            hide_index=True,
+            use_container_width=True,
+        )
+
+        dist_team = st.selectbox("Win distribution for", team_names)
+        dist = analytic['win_distribution'][team_names.index(dist_team)]
+        st.bar_chart(pd.DataFrame({'Chance %': dist * 100}, index=pd.Index(range(len(dist)), name='Wins')))
         
 # If no schedule has been generated yet, let our user know that they need to click the button first
 if schedule_df is None:
@@ -355,11 +645,14 @@ view_mode = st.sidebar.radio(
     ["By Week", "By Team", "Full Schedule"],
 )
 
+# per-week and per-team slices built once per schedule (see schedule_views), so switching is a lookup
+schedule_index = st.session_state["schedule_views"]
+
 if view_mode == "By Week":
-    all_weeks = sorted(schedule_df["Week"].unique().tolist())
+    all_weeks = list(schedule_index["by_week"])
     selected_week = st.selectbox("Select week", all_weeks, index=0)
 
-    week_games = schedule_df[schedule_df["Week"] == selected_week].copy()
+    week_games = schedule_index["by_week"][selected_week]
     week_games = week_games[["Week", "Matchup", "Kickoff", "City", "Prime Time"]]
 
     if show_prime_time:
@@ -375,26 +668,12 @@ if view_mode == "By Week":
     )
 
 elif view_mode == "By Team":
-    all_teams = sorted(
-        set(schedule_df["Home"]).union(set(schedule_df["Away"]))
-    )
+    all_teams = list(schedule_index["by_team"])
     selected_team = st.selectbox("Select team", all_teams, index=0)
 
-    team_games = schedule_df[
-        (schedule_df["Home"] == selected_team) | (schedule_df["Away"] == selected_team)
-    ].copy()
-
-    # Helper functions to help us decide home or away status
-    def determine_home_or_away(row):
-        return "Home" if row["Home"] == selected_team else "Away"
-
-    def get_opponent(row):
-        return row["Away"] if row["Home"] == selected_team else row["Home"]
-
-    team_games["H/A"] = team_games.apply(determine_home_or_away, axis=1)
-    team_games["Opponent"] = team_games.apply(get_opponent, axis=1)
+    # H/A and Opponent are already worked out for every team, already sorted by week
+    team_games = schedule_index["by_team"][selected_team]
     team_games = team_games[["Week", "H/A", "Opponent", "Kickoff", "City", "Prime Time"]]
-    team_games = team_games.sort_values("Week")
 
     if show_prime_time:
         team_games["Prime Time"] = team_games["Prime Time"].map(
@@ -486,6 +765,8 @@ if debug is not None:
     with col4:
         st.write(f"**Revenue score:** {debug.get('revenue_score', 0):.1f}")
         st.write(f"**Backtracks:** {debug.get('backtracks', 0)}")
+        if 'stop_reason' in debug:
+            st.write(f"**Stopped by:** {debug['stop_reason']} after {debug.get('elapsed_s', 0):.2f} s")
         if 'improvements_found' in debug:
             st.write(f"**Improvements found:** {debug.get('improvements_found', 0)}")
 
@@ -498,6 +779,81 @@ if debug is not None:
         st.markdown("### Strength of Schedule by Team")
         st.dataframe(sos_breakdown, hide_index=True, use_container_width=True)
 
+    start_stats = st.session_state.get("start_stats")
+    if start_stats:
+        with st.expander(f"Multi-start runs ({len(start_stats)} starts)"):
+            st.dataframe(
+                pd.DataFrame([
+                    {key: value for key, value in stats.items() if key != "initial_metrics"}
+                    for stats in start_stats
+                ]),
+                hide_index=True,
+                use_container_width=True,
+            )
+
+    if "profile" in debug:
+        profile = debug["profile"]
+        with st.expander("Optimizer profile"):
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Evaluations / s", f"{profile['evaluations_per_s']:.0f}")
+            col2.metric("Search time", f"{profile['elapsed_s']:.2f} s")
+            if profile["branch_acceptance_rate"] is not None:
+                col3.metric("Branches within 5%", f"{profile['branch_acceptance_rate']:.0%}")
+
+            st.dataframe(
+                pd.DataFrame([
+                    {"Phase": phase, "Seconds": totals["seconds"], "Calls": totals["calls"],
+                     "Share of time": f"{totals['share']:.1%}"}
+                    for phase, totals in profile["phases"].items()
+                ]),
+                hide_index=True,
+                use_container_width=True,
+            )
+            if profile["timeline"]:
+                st.write("**Best cost by node**")
+                st.line_chart(pd.DataFrame(profile["timeline"], columns=["Node", "Seconds", "Best cost"]),
+                              x="Node", y="Best cost")
+            st.download_button("Download profile (JSON)", json.dumps(profile, indent=2),
+                               file_name="optimizer_profile.json", mime="application/json")
+
+    archive = st.session_state.get("pareto_archive")
+    if archive is not None and len(archive):
+        st.markdown("### Trade-offs")
+        # re-scoring the archive is instant, so this follows the weight sliders without optimizing again
+        current_weights = (travel_weight, fatigue_weight, sos_weight, revenue_weight)
+        scores = archive.scores(*current_weights)
+        best_cost, best_metrics, _ = archive.best(*current_weights)
+        st.write(f"{len(archive)} non-dominated schedules kept out of {archive.offered} evaluated. "
+                 f"Best one for the current weights has cost **{best_cost:.1f}**.")
+        if st.button("Use the best archived schedule for these weights"):
+            _, _, archived_schedule = archive.best(*current_weights)
+            st.session_state["current_schedule"] = archived_schedule
+            st.session_state["schedule_df"] = schedule_to_dataframe(archived_schedule)
+            st.session_state["schedule_views"] = schedule_views(st.session_state["schedule_df"])
+            st.session_state["schedule_issues"] = validate_schedule(archived_schedule, st.session_state["teams"])
+            st.session_state["debug"] = {**debug, **best_metrics, "best_cost": best_cost}
+            st.rerun()
+
+        front = pd.DataFrame(archive.metrics)
+        front["Schedule"] = ["Best for these weights" if score == best_cost else "Archived" for score in scores]
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("**Travel vs revenue**")
+            st.scatter_chart(front, x="total_travel", y="revenue_score", color="Schedule")
+        with col2:
+            st.write("**Fatigue vs SoS variance**")
+            st.scatter_chart(front, x="fatigue_penalty", y="sos_variance", color="Schedule")
+
+    schedule_issues = st.session_state.get("schedule_issues")
+    if schedule_issues is not None:
+        with st.expander(f"Schedule checks ({len(schedule_issues)} problems)"):
+            if schedule_issues:
+                for issue in schedule_issues:
+                    st.write(f"- {issue}")
+            else:
+                st.write("Every team plays once a week, byes, home/away split, division games and "
+                         "prime-time slots all check out.")
+
     st.caption(
         "**Our Objective:** Our cost function is the following: "
         "a·(total travel) + b·(fatigue penalty) + c·(SoS variance) − d·(revenue score), "
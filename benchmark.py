@@ -0,0 +1,194 @@
+"""
+Benchmarks for schedule generation, evaluation, optimization and simulation.
+
+Every benchmark runs on the 32-team league from make_full_league and the same fixed seeds, times each
+call after a few warm-up calls and records ops/sec, p50/p95 latency and the peak memory of one call
+(traced in a separate call, since tracemalloc slows things down). Results go to JSON, and with
+--baseline they're compared against an earlier results file; the script exits with status 1 if any
+benchmark got more than --threshold slower (on p50) or hungrier (on peak memory).
+
+    python benchmark.py --output bench.json
+    python benchmark.py --baseline bench.json --only optimize
+    python benchmark.py --check-metrics 500
+
+--check-metrics applies that many random moves (from the original swap sampler and from every
+neighborhood) and compares the optimizer's incremental metrics with a full compute_metrics after each one;
+it exits with status 1 on any mismatch before running the benchmarks.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from data_class import make_full_league
+from schedule_core import generate_initial_schedule, compute_metrics
+from optimizer import generate_swap_candidates, optimize_schedule_backtracking, swap_games
+from incremental_metrics import IncrementalMetrics, check_incremental_metrics
+from moves import NEIGHBORHOODS
+from simulation import simulate_season, full_season_playoff_simulation
+
+DEFAULT_WEIGHTS = (1.0, 0.7, 0.7, 0.5)  # the sidebar defaults in app.py
+MEMORY_NOISE_KB = 64  # peak memory moves around by a few KiB between runs, smaller changes aren't regressions
+
+
+def make_benchmarks(seed, max_nodes_options, max_depth):
+    """
+    name -> (function to time, repeats multiplier). Everything is set up once here so only the call is timed.
+    """
+    teams = make_full_league()
+    schedule, base_debug = generate_initial_schedule(teams, num_weeks=18, seed=seed)
+    tracker = IncrementalMetrics(schedule, teams)
+    week1, index1, week2, index2 = generate_swap_candidates(schedule, max_pairs=1, seed=seed)[0]
+
+    def incremental_swap():
+        # score one swap the way the search does, and put it back
+        swap_games(schedule, week1, index1, week2, index2)
+        tracker.update((week1, week2))
+        tracker.metrics()
+        swap_games(schedule, week1, index1, week2, index2)
+        tracker.update((week1, week2))
+
+    benchmarks = {
+        "generate_initial_schedule": (lambda: generate_initial_schedule(teams, num_weeks=18, seed=seed), 1),
+        "compute_metrics": (lambda: compute_metrics(schedule, teams, {}), 1),
+        "incremental_swap": (incremental_swap, 1),
+        "generate_swap_candidates": (lambda: generate_swap_candidates(schedule, max_pairs=20, seed=seed), 1),
+        "simulate_season": (lambda: simulate_season(schedule, teams, seed=seed), 1),
+        "full_season_playoff_simulation": (lambda: full_season_playoff_simulation(schedule, teams, seed=seed), 1),
+    }
+    for max_nodes in max_nodes_options:
+        # the search undoes every swap it makes, so the same schedule can be reused between calls
+        def optimize(max_nodes=max_nodes):
+            return optimize_schedule_backtracking(
+                schedule, teams, base_debug, *DEFAULT_WEIGHTS,
+                max_depth=max_depth, max_nodes=max_nodes, seed=seed,
+            )
+        # the big searches are slow, so they get fewer repeats
+        benchmarks[f"optimize_backtracking[max_nodes={max_nodes}]"] = (optimize, min(1.0, 100 / max_nodes))
+    return benchmarks
+
+
+def time_calls(function, repeats, warmup):
+    for _ in range(warmup):
+        function()
+    seconds = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - started)
+    return np.array(seconds)
+
+
+def peak_memory(function):
+    """
+    Peak bytes allocated by Python during one call
+    """
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_benchmarks(benchmarks, repeats, warmup):
+    results = {}
+    for name, (function, share) in benchmarks.items():
+        runs = max(3, int(repeats * share))
+        seconds = time_calls(function, runs, warmup)
+        results[name] = {
+            "repeats": runs,
+            "ops_per_sec": len(seconds) / seconds.sum(),
+            "mean_ms": seconds.mean() * 1000,
+            "p50_ms": np.percentile(seconds, 50) * 1000,
+            "p95_ms": np.percentile(seconds, 95) * 1000,
+            "peak_memory_kb": peak_memory(function) / 1024,
+        }
+        print(f"{name:<45}{results[name]['ops_per_sec']:>12.1f}{results[name]['p50_ms']:>11.2f}"
+              f"{results[name]['p95_ms']:>11.2f}{results[name]['peak_memory_kb']:>13.0f}")
+    return results
+
+
+def compare_to_baseline(results, baseline, threshold):
+    """
+    Returns a list of (benchmark, what, baseline value, new value) that got worse by more than threshold
+    """
+    regressions = []
+    for name, new in results.items():
+        old = baseline["benchmarks"].get(name)
+        if old is None:
+            continue
+        if new["p50_ms"] > old["p50_ms"] * (1 + threshold):
+            regressions.append((name, "p50_ms", old["p50_ms"], new["p50_ms"]))
+        if new["peak_memory_kb"] > max(old["peak_memory_kb"] * (1 + threshold), old["peak_memory_kb"] + MEMORY_NOISE_KB):
+            regressions.append((name, "peak_memory_kb", old["peak_memory_kb"], new["peak_memory_kb"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0, help="seed for the schedule, the search and the simulations")
+    parser.add_argument("--repeats", type=int, default=20, help="timed calls per benchmark")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed calls before timing")
+    parser.add_argument("--max-nodes", type=int, nargs="+", default=[100, 400, 1600])
+    parser.add_argument("--max-depth", type=int, default=2)
+    parser.add_argument("--only", nargs="+", help="only run benchmarks whose name contains one of these")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, 0.2 = 20%%")
+    parser.add_argument("--check-metrics", type=int, metavar="MOVES",
+                        help="check incremental metrics against compute_metrics over this many moves first")
+    args = parser.parse_args()
+
+    if args.check_metrics:
+        teams = make_full_league()
+        schedule, _ = generate_initial_schedule(teams, num_weeks=18, seed=args.seed)
+        mismatches = sum(
+            check_incremental_metrics(schedule, teams, args.check_metrics, args.seed, neighborhoods)
+            for neighborhoods in (None, NEIGHBORHOODS)
+        )
+        if mismatches:
+            print(f"MISMATCH incremental metrics disagree with compute_metrics after {mismatches} moves")
+            sys.exit(1)
+        print(f"Incremental metrics match compute_metrics over {args.check_metrics} moves per move source")
+
+    benchmarks = make_benchmarks(args.seed, args.max_nodes, args.max_depth)
+    if args.only:
+        benchmarks = {name: bench for name, bench in benchmarks.items() if any(part in name for part in args.only)}
+
+    header = f"{'benchmark':<45}{'ops/sec':>12}{'p50 ms':>11}{'p95 ms':>11}{'peak KiB':>13}"
+    print(header)
+    print("-" * len(header))
+    results = run_benchmarks(benchmarks, args.repeats, args.warmup)
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "seed": args.seed,
+        "benchmarks": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        for name, key, old, new in regressions:
+            print(f"REGRESSION {name}: {key} {old:.2f} -> {new:.2f} ({(new / old - 1) * 100:+.0f}%)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions over {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+
+from compact_schedule import CompactSchedule, encode_schedule, decode_schedule, schedule_digest
+from league_index import get_league_index
+
+# bump when the saved engine state changes shape, so old checkpoints are ignored instead of misread
+CHECKPOINT_VERSION = 3
+
+
+class SearchCheckpoint:
+    """
+    Periodic snapshots of a search engine's state on local disk, so a long run that gets killed can carry on
+    where it left off instead of starting again.
+
+    Engines call resume() once before searching. If path holds a checkpoint of the same run (same engine,
+    league, starting schedule, weights, seed and engine options) they get its state back, otherwise None.
+    The budgets (max_nodes, time_budget_s, patience) aren't part of the run, so a finished run can also be
+    continued with a bigger budget. While searching, engines call save(state) whenever due(nodes) says so,
+    every every_nodes nodes or every_s seconds, and once more at the end.
+
+    The state has the schedule the engine is on in compact form (about 2 KB) and the few moves back to the best
+    one, or the best one itself, so a checkpoint stays the same size however long the run has been going.
+    Resuming decodes that schedule instead of replaying the run. It also has the RNG state, the debug counters
+    and whatever else the engine needs. Writes are atomic: the
+    checkpoint goes to a temporary file in the same directory, is fsynced and then renamed over the old one,
+    so a crash mid-write leaves the previous checkpoint as it was.
+
+    Checkpoints are pickles, so only load ones this code wrote.
+    """
+
+    def __init__(self, path, every_nodes=1000, every_s=60.0):
+        self.path = path
+        self.every_nodes = every_nodes
+        self.every_s = every_s
+        self.run = None
+        self.saves = 0
+        self._compact = False
+        self._last_nodes = 0
+        self._last_time = time.perf_counter()
+
+    def resume(self, engine, schedule, teams, weights, **options):
+        """
+        The saved state of this run, or None to start from scratch
+        """
+        self.run = run_key(engine, schedule, teams, weights, **options)
+        # so checkpoint_best_schedule hands back the same form the engine was given
+        self._compact = isinstance(schedule, CompactSchedule)
+        self._last_time = time.perf_counter()
+        record = read_checkpoint(self.path)
+        if record is None or record["run"] != self.run:
+            return None
+        self._last_nodes = record["state"]["debug"]["nodes_visited"]
+        return record["state"]
+
+    def due(self, nodes):
+        if nodes - self._last_nodes >= self.every_nodes:
+            return True
+        return self.every_s is not None and time.perf_counter() - self._last_time >= self.every_s
+
+    def save(self, state):
+        record = {"version": CHECKPOINT_VERSION, "run": self.run, "saved": time.time(), "compact": self._compact,
+                  "state": state}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        handle, temp_path = tempfile.mkstemp(dir=directory, prefix=".checkpoint-")
+        try:
+            with os.fdopen(handle, "wb") as f:
+                pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        self.saves += 1
+        self._last_nodes = state["debug"]["nodes_visited"]
+        self._last_time = time.perf_counter()
+
+
+def run_key(engine, schedule, teams, weights, **options):
+    """
+    Identifies a search run for resuming: SHA-256 of everything that changes the search except the budgets
+    """
+    parts = {
+        "engine": engine,
+        "league": get_league_index(teams).fingerprint,
+        "schedule": schedule_digest(schedule, teams),
+        "weights": list(weights),
+        "options": options,
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=list).encode()).hexdigest()
+
+
+def read_checkpoint(path):
+    """
+    The checkpoint record at path, or None if there isn't one this code can read
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        record = pickle.load(f)
+    if not isinstance(record, dict) or record.get("version") != CHECKPOINT_VERSION:
+        return None
+    return record
+
+
+def checkpoint_best_schedule(path, teams):
+    """
+    (best schedule, best cost) of the run saved at path, e.g. to warm-start another run from it
+    """
+    from optimizer import make_move_source
+
+    record = read_checkpoint(path)
+    if record is None:
+        raise ValueError(f"No checkpoint at {path}")
+    state = record["state"]
+    if state["best_schedule"] is not None:
+        best = decode_schedule(state["best_schedule"], teams)
+    else:
+        # the engine was standing on the best schedule moves_since_best moves before the saved one
+        best = decode_schedule(state["schedule"], teams)
+        mover = make_move_source(best, teams, state["neighborhoods"])
+        for move in reversed(state["moves_since_best"]):
+            mover.undo(move)
+    if record["compact"]:
+        best = encode_schedule(best, teams)
+    return best, state["best_cost"]
@@ -0,0 +1,439 @@
+"""
+Command line entry point for running the scheduler without the Streamlit app, e.g. from cron or a pipeline.
+
+    python cli.py generate --seed 123 --output schedule.csv
+    python cli.py evaluate --schedule schedule.csv
+    python cli.py optimize --seed 123 --engine tabu --max-nodes 2000 --output best.json
+    python cli.py simulate --schedule best.json --sims 20000 --output odds.parquet
+    python cli.py simulate --schedule best.json --analytic --output odds.csv
+    python cli.py sweep --params sweep.json --output sweep.csv
+    python cli.py optimize --seed 7 --library runs.nflsched
+    python cli.py library runs.nflsched --index 3 --output third.csv
+    python cli.py optimize --engine annealing --max-nodes 1000000 --checkpoint night.ckpt --output best.csv
+    python cli.py optimize --engine tabu --warm-start runs.nflsched --library runs.nflsched
+
+Runs with --checkpoint save their progress to that file every --checkpoint-every nodes (and at the end);
+running the same command again carries on from it, also with a bigger --max-nodes. --warm-start starts the
+search from a saved schedule instead of a generated one.
+
+Output format follows the --output extension (.csv, .json or .parquet); without --output results are
+printed as JSON. Modules are only imported by the commands that use them, so pandas is only loaded for
+Parquet files and streamlit never is.
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+
+DEFAULT_WEIGHTS = (1.0, 0.7, 0.7, 0.5)  # the sidebar defaults in app.py
+SCHEDULE_COLUMNS = ("week", "home", "away", "slot")
+
+# sweep file columns and the type each one is read as (CSV values come in as strings)
+SWEEP_PARAMS = {
+    "seed": int,
+    "optimizer_seed": int,
+    "engine": str,
+    "max_nodes": int,
+    "max_depth": int,
+    "travel_weight": float,
+    "fatigue_weight": float,
+    "sos_weight": float,
+    "revenue_weight": float,
+    "time_budget_s": float,
+    "patience": int,
+}
+
+
+# ---- reading and writing ----
+
+def write_rows(rows, path=None):
+    """
+    Writes a list of flat dicts as CSV, JSON or Parquet depending on path's extension, or JSON to stdout
+    """
+    if path is None or path == "-":
+        json.dump(rows, sys.stdout, indent=2, default=float)
+        sys.stdout.write("\n")
+    elif path.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else [])
+            writer.writeheader()
+            writer.writerows(rows)
+    elif path.endswith(".json"):
+        with open(path, "w") as f:
+            json.dump(rows, f, indent=2, default=float)
+    elif path.endswith(".parquet"):
+        import pandas as pd
+        pd.DataFrame(rows).to_parquet(path, index=False)
+    else:
+        raise SystemExit(f"Don't know how to write {path!r}, use .csv, .json or .parquet")
+
+
+def read_rows(path):
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            return list(csv.DictReader(f))
+    if path.endswith(".json"):
+        with open(path) as f:
+            return json.load(f)
+    if path.endswith(".parquet"):
+        import pandas as pd
+        return pd.read_parquet(path).to_dict("records")
+    raise SystemExit(f"Don't know how to read {path!r}, use .csv, .json or .parquet")
+
+
+def schedule_rows(schedule):
+    return [
+        {"week": week, "home": game.home.name, "away": game.away.name, "slot": game.slot}
+        for week in sorted(schedule)
+        for game in schedule[week]
+    ]
+
+
+def read_schedule(path, teams):
+    """
+    A schedule written by schedule_rows (generate/optimize --output), back as a dict schedule
+    """
+    from data_class import ScheduledGame
+
+    by_name = {team.name: team for team in teams}
+    schedule = {}
+    for row in read_rows(path):
+        week = int(row["week"])
+        schedule.setdefault(week, []).append(ScheduledGame(week, by_name[row["home"]], by_name[row["away"]], row["slot"]))
+    return schedule
+
+
+# ---- shared pieces ----
+
+def load_schedule(args, teams):
+    """
+    The schedule from --schedule if given, otherwise a fresh one from --seed
+    """
+    if args.schedule:
+        return read_schedule(args.schedule, teams), {}
+    from schedule_core import generate_initial_schedule
+    return generate_initial_schedule(teams, num_weeks=args.weeks, seed=args.seed)
+
+
+def load_warm_start(source, teams):
+    """
+    The schedule to start from for --warm-start: a schedule file from generate/optimize, the best schedule of
+    a checkpoint (.ckpt), or a schedule from a library (.nflsched, the lowest cost one or path:index)
+    """
+    path, _, index = source.rpartition(":")
+    if not (path.endswith(".nflsched") and index.isdigit()):
+        path, index = source, None
+
+    if path.endswith(".ckpt"):
+        from checkpoint import checkpoint_best_schedule
+        schedule, _ = checkpoint_best_schedule(path, teams)
+        return schedule
+    if path.endswith(".nflsched"):
+        import numpy as np
+        from schedule_library import ScheduleLibrary
+
+        library = ScheduleLibrary(path)
+        if not len(library):
+            raise SystemExit(f"{path} has no schedules")
+        if index is None:
+            costs = library.metrics_table()[:, library.metric_names.index("best_cost")]
+            index = int(np.nanargmin(costs)) if not np.isnan(costs).all() else len(library) - 1
+        return library.schedule(int(index), teams)
+    return read_schedule(path, teams)
+
+
+def evaluate(schedule, teams, weights):
+    from schedule_core import compute_metrics, objective
+
+    metrics = compute_metrics(schedule, teams, {})
+    return {"cost": objective(metrics, *weights), **metrics}
+
+
+def run_optimizer(teams, seed, optimizer_seed, engine, weights, max_nodes, max_depth, weeks=18,
+                  time_budget_s=None, patience=None, store_path=None, warm_start=None, checkpoint_path=None,
+                  checkpoint_every=1000, incremental=False):
+    """
+    Generates the starting schedule for seed (or loads the warm_start one) and optimizes it.
+    Returns (schedule, debug, seconds).
+    """
+    from optimizer import optimize_schedule
+
+    if warm_start:
+        schedule, base_debug = load_warm_start(warm_start, teams), {}
+    else:
+        from schedule_core import generate_initial_schedule
+        schedule, base_debug = generate_initial_schedule(teams, num_weeks=weeks, seed=seed)
+    options = {"max_nodes": max_nodes, "seed": optimizer_seed, "time_budget_s": time_budget_s, "patience": patience}
+    if engine == "backtracking":
+        options["max_depth"] = max_depth
+    if incremental:
+        options["incremental"] = True
+    if checkpoint_path:
+        from checkpoint import SearchCheckpoint
+        options["checkpoint"] = SearchCheckpoint(checkpoint_path, every_nodes=checkpoint_every)
+
+    started = time.perf_counter()
+    if store_path:
+        from result_store import ResultStore, optimize_with_store
+        best, debug = optimize_with_store(ResultStore(store_path), engine, schedule, teams, base_debug,
+                                          *weights, **options)
+    else:
+        best, debug = optimize_schedule(engine, schedule, teams, base_debug, *weights, **options)
+    return best, debug, time.perf_counter() - started
+
+
+def open_run_library(path, teams, num_weeks):
+    """
+    The schedule library at path for num_weeks seasons, creating it if needed. Opened before optimizing, so a
+    library for another league or season length stops the command before the runs instead of after them.
+    """
+    from schedule_library import open_library
+
+    try:
+        return open_library(path, teams, weeks=range(1, num_weeks + 1))
+    except ValueError as error:
+        raise SystemExit(str(error))
+
+
+def save_to_library(library, teams, results):
+    """
+    Appends (schedule, debug) pairs to a library from open_run_library
+    """
+    count = library.extend(results, teams)
+    print(f"{library.path} now holds {count} schedules", file=sys.stderr)
+
+
+def summary_row(debug):
+    # the numbers worth keeping from an optimizer debug dict, flat so they fit in a table
+    keys = ("best_cost", "total_travel", "travel_time_hours", "fatigue_penalty", "sos_variance", "revenue_score",
+            "nodes_visited", "evaluations", "stop_reason", "resumed_at_node")
+    return {key: debug.get(key) for key in keys}
+
+
+# ---- commands ----
+
+def cmd_generate(args):
+    from data_class import make_full_league
+    from schedule_core import generate_initial_schedule
+
+    teams = make_full_league()
+    schedule, _ = generate_initial_schedule(teams, num_weeks=args.weeks, seed=args.seed)
+    write_rows(schedule_rows(schedule), args.output)
+
+
+def cmd_evaluate(args):
+    from data_class import make_full_league
+
+    teams = make_full_league()
+    schedule, _ = load_schedule(args, teams)
+    write_rows([evaluate(schedule, teams, args.weights)], args.output)
+
+
+def cmd_optimize(args):
+    from data_class import make_full_league
+
+    teams = make_full_league()
+    library = open_run_library(args.library, teams, args.weeks) if args.library else None
+    best, debug, seconds = run_optimizer(
+        teams, args.seed, args.optimizer_seed, args.engine, args.weights, args.max_nodes, args.max_depth,
+        args.weeks, args.time_budget_s, args.patience, args.store, args.warm_start, args.checkpoint,
+        args.checkpoint_every, args.incremental,
+    )
+    print(json.dumps({**summary_row(debug), "seconds": seconds}), file=sys.stderr)
+    if library is not None:
+        save_to_library(library, teams, [(best, debug)])
+    write_rows(schedule_rows(best), args.output)
+
+
+def cmd_simulate(args):
+    from data_class import make_full_league
+    from simulation import playoff_probabilities, NUM_PLAYOFF_SEEDS
+
+    teams = make_full_league()
+    schedule, _ = load_schedule(args, teams)
+    if args.analytic:
+        write_rows(analytic_rows(schedule, teams), args.output)
+        return
+    odds = playoff_probabilities(schedule, teams, args.sims, seed=args.sim_seed)
+    rows = []
+    for team_id, team in enumerate(teams):
+        row = {
+            "team": team.name,
+            "conference": team.conference,
+            "division": team.division,
+            "mean_wins": float(odds["mean_wins"][team_id]),
+            "make_playoffs": float(odds["make_playoffs"][team_id]),
+            "win_conference": float(odds["win_conference"][team_id]),
+            "win_super_bowl": float(odds["win_super_bowl"][team_id]),
+        }
+        for position in range(NUM_PLAYOFF_SEEDS):
+            row[f"seed_{position + 1}"] = float(odds["seed"][team_id, position])
+        rows.append(row)
+    write_rows(rows, args.output)
+
+
+def analytic_rows(schedule, teams):
+    from analytic_odds import analytic_playoff_odds
+
+    odds = analytic_playoff_odds(schedule, teams)
+    rows = []
+    for team_id, team in enumerate(teams):
+        row = {
+            "team": team.name,
+            "conference": team.conference,
+            "division": team.division,
+            "mean_wins": float(odds["mean_wins"][team_id]),
+            "win_division": float(odds["win_division"][team_id]),
+            "make_playoffs": float(odds["make_playoffs"][team_id]),
+        }
+        for wins, chance in enumerate(odds["win_distribution"][team_id]):
+            row[f"win_{wins}"] = float(chance)
+        rows.append(row)
+    return rows
+
+
+def cmd_sweep(args):
+    """
+    One optimizer run per row of the params file; every column not in the file uses the command line value
+    """
+    from data_class import make_full_league
+
+    teams = make_full_league()
+    library = open_run_library(args.library, teams, args.weeks) if args.library else None
+    defaults = {
+        "seed": args.seed,
+        "optimizer_seed": args.optimizer_seed,
+        "engine": args.engine,
+        "max_nodes": args.max_nodes,
+        "max_depth": args.max_depth,
+        "travel_weight": args.weights[0],
+        "fatigue_weight": args.weights[1],
+        "sos_weight": args.weights[2],
+        "revenue_weight": args.weights[3],
+        "time_budget_s": args.time_budget_s,
+        "patience": args.patience,
+    }
+
+    rows = []
+    results = []
+    for run, overrides in enumerate(read_rows(args.params)):
+        unknown = set(overrides) - set(SWEEP_PARAMS)
+        if unknown:
+            raise SystemExit(f"Unknown sweep columns {sorted(unknown)}, use {sorted(SWEEP_PARAMS)}")
+        params = dict(defaults)
+        params.update({name: SWEEP_PARAMS[name](value) for name, value in overrides.items()
+                       if value not in ("", None)})
+        weights = (params["travel_weight"], params["fatigue_weight"], params["sos_weight"], params["revenue_weight"])
+
+        best, debug, seconds = run_optimizer(
+            teams, params["seed"], params["optimizer_seed"], params["engine"], weights, params["max_nodes"],
+            params["max_depth"], args.weeks, params["time_budget_s"], params["patience"], args.store,
+            args.warm_start, incremental=args.incremental,
+        )
+        rows.append({"run": run, **params, **summary_row(debug), "seconds": seconds})
+        results.append((best, debug))
+        print(f"run {run}: best cost {debug['best_cost']:.1f} in {seconds:.2f} s", file=sys.stderr)
+    if library is not None:
+        save_to_library(library, teams, results)
+    write_rows(rows, args.output)
+
+
+def cmd_library(args):
+    """
+    Metrics of every schedule in a library, or with --index one schedule from it
+    """
+    from schedule_library import ScheduleLibrary
+
+    library = ScheduleLibrary(args.path)
+    if args.index is None:
+        write_rows([{"index": index, **library.metrics(index)} for index in range(len(library))], args.output)
+        return
+
+    from data_class import make_full_league
+    from league_index import get_league_index
+
+    teams = make_full_league()
+    if get_league_index(teams).fingerprint != library.fingerprint:
+        raise SystemExit(f"{args.path} holds schedules for a different league")
+    write_rows(schedule_rows(library.schedule(args.index, teams)), args.output)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_schedule_args(command, from_file=False):
+        command.add_argument("--seed", type=int, default=123, help="initial schedule seed")
+        command.add_argument("--weeks", type=int, default=18)
+        if from_file:
+            command.add_argument("--schedule", help="schedule file from generate/optimize instead of --seed")
+        command.add_argument("--output", help=".csv, .json or .parquet file (default: JSON to stdout)")
+
+    def add_weights(command):
+        command.add_argument("--weights", type=float, nargs=4, default=DEFAULT_WEIGHTS,
+                             metavar=("TRAVEL", "FATIGUE", "SOS", "REVENUE"))
+
+    def add_search_args(command):
+        add_weights(command)
+        command.add_argument("--optimizer-seed", type=int, default=0)
+        command.add_argument("--engine", default="backtracking", help="backtracking, annealing or tabu")
+        command.add_argument("--max-nodes", type=int, default=800)
+        command.add_argument("--max-depth", type=int, default=2, help="for the backtracking engine")
+        command.add_argument("--time-budget-s", type=float)
+        command.add_argument("--patience", type=int)
+        command.add_argument("--incremental", action="store_true",
+                             help="score moves from just the teams and weeks they touch instead of a full "
+                                  "compute_metrics (check with benchmark.py --check-metrics first)")
+        command.add_argument("--store", help="SQLite result store to reuse results from (see result_store.py)")
+        command.add_argument("--library", help="schedule library to append the optimized schedules to "
+                                               "(see schedule_library.py)")
+        command.add_argument("--warm-start", help="start from this schedule file, checkpoint (.ckpt) or "
+                                                  "library (.nflsched or .nflsched:INDEX) instead of --seed")
+
+    command = commands.add_parser("generate", help="write an initial schedule")
+    add_schedule_args(command)
+    command.set_defaults(run=cmd_generate)
+
+    command = commands.add_parser("evaluate", help="metrics and cost of a schedule")
+    add_schedule_args(command, from_file=True)
+    add_weights(command)
+    command.set_defaults(run=cmd_evaluate)
+
+    command = commands.add_parser("optimize", help="optimize a schedule and write the best one")
+    add_schedule_args(command)
+    add_search_args(command)
+    command.add_argument("--checkpoint", help="save progress to this file and resume from it if it's there")
+    command.add_argument("--checkpoint-every", type=int, default=1000, help="nodes between checkpoints")
+    command.set_defaults(run=cmd_optimize)
+
+    command = commands.add_parser("simulate", help="playoff odds for a schedule")
+    add_schedule_args(command, from_file=True)
+    command.add_argument("--sims", type=int, default=10000, help="seasons to simulate")
+    command.add_argument("--sim-seed", type=int, default=42)
+    command.add_argument("--analytic", action="store_true",
+                         help="exact win distributions and approximate odds instead of simulating")
+    command.set_defaults(run=cmd_simulate)
+
+    command = commands.add_parser("sweep", help="one optimizer run per row of a params file")
+    add_schedule_args(command)
+    add_search_args(command)
+    command.add_argument("--params", required=True,
+                         help=f".csv/.json/.parquet with any of the columns {', '.join(SWEEP_PARAMS)}")
+    command.set_defaults(run=cmd_sweep)
+
+    command = commands.add_parser("library", help="list the schedules in a library or export one")
+    command.add_argument("path", help="schedule library file")
+    command.add_argument("--index", type=int, help="export this schedule instead of listing metrics")
+    command.add_argument("--output", help=".csv, .json or .parquet file (default: JSON to stdout)")
+    command.set_defaults(run=cmd_library)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
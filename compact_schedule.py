@@ -0,0 +1,129 @@
+import hashlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from data_class import ScheduledGame
+from schedule_core import compute_metrics
+from league_index import get_league_index, index_for_fingerprint
+
+# Slot codes stored in the arrays, in the same order as the ScheduledGame docstring
+SLOT_CODES = ("SUN_1PM", "SUN_4PM", "SUN_NIGHT", "MON", "THU")
+SLOT_IDS = {slot: code for code, slot in enumerate(SLOT_CODES)}
+
+# Columns of the last axis of CompactSchedule.games
+HOME, AWAY, SLOT = 0, 1, 2
+
+EMPTY = -1  # marks an unused game slot in weeks with byes
+
+
+@dataclass
+class CompactSchedule:
+    """
+    Array-backed version of the dict[int, list[ScheduledGame]] schedule.
+
+    games[row, game_index] holds (home_id, away_id, slot_code) as int16, where the team ids come
+    from the LeagueIndex with the same fingerprint and row is the position of the week in `weeks`.
+    Weeks with byes have fewer games, so their unused game slots are filled with EMPTY.
+    A full 18 week season is 18 x 16 x 3 int16 values, which is under 2 KB.
+    """
+
+    games: np.ndarray       # shape (num_weeks, games_per_week, 3), int16
+    weeks: np.ndarray       # week number of every row, int16
+    fingerprint: str        # league fingerprint the team ids refer to
+
+    def copy(self):
+        # the week numbers and fingerprint never change, so only the game array gets copied
+        return CompactSchedule(self.games.copy(), self.weeks, self.fingerprint)
+
+    def week_row(self, week):
+        return int(np.searchsorted(self.weeks, week))
+
+    def games_in_week(self, week):
+        row = self.games[self.week_row(week)]
+        return row[row[:, HOME] != EMPTY]
+
+    def swap(self, week1, index1, week2, index2):
+        """
+        Same as optimizer.swap_games, but on the arrays
+        """
+        row1, row2 = self.week_row(week1), self.week_row(week2)
+        game1 = self.games[row1, index1].copy()
+        self.games[row1, index1] = self.games[row2, index2]
+        self.games[row2, index2] = game1
+
+    def home_away_arrays(self):
+        """
+        Flat home and away id arrays of every game in week order, which is what the simulators want
+        """
+        played = self.games[:, :, HOME] != EMPTY
+        return self.games[:, :, HOME][played], self.games[:, :, AWAY][played]
+
+
+def encode_schedule(schedule, teams):
+    """
+    Converts a dict schedule into a CompactSchedule, keeping the order of the games in each week
+    """
+    index = get_league_index(teams)
+    week_numbers = sorted(schedule)
+    games_per_week = max((len(games) for games in schedule.values()), default=0)
+
+    games = np.full((len(week_numbers), games_per_week, 3), EMPTY, dtype=np.int16)
+    for row, week_number in enumerate(week_numbers):
+        for game_index, game in enumerate(schedule[week_number]):
+            games[row, game_index] = (
+                index.team_ids[game.home.name],
+                index.team_ids[game.away.name],
+                SLOT_IDS[game.slot],
+            )
+
+    return CompactSchedule(games, np.array(week_numbers, dtype=np.int16), index.fingerprint)
+
+
+def schedule_digest(schedule, teams=None):
+    """
+    SHA-256 of a schedule's games (either form), for keying results and checkpoints by starting schedule
+    """
+    compact = schedule if isinstance(schedule, CompactSchedule) else encode_schedule(schedule, teams)
+    return hashlib.sha256(compact.games.tobytes() + compact.weeks.tobytes()).hexdigest()
+
+
+def decode_schedule(compact, teams=None):
+    """
+    Converts a CompactSchedule back to the dict form. Games take their week from the row they sit in.
+
+    If teams isn't given, we use the league index this process already built for the fingerprint.
+    """
+    if teams is not None:
+        index = get_league_index(teams)
+        if index.fingerprint != compact.fingerprint:
+            raise ValueError("Schedule was encoded for a different league")
+    else:
+        index = index_for_fingerprint(compact.fingerprint)
+        if index is None:
+            raise ValueError("No league index for this schedule, pass the teams it was built from")
+
+    schedule = {}
+    for row, week_number in enumerate(compact.weeks.tolist()):
+        schedule[week_number] = [
+            ScheduledGame(week_number, index.teams[home_id], index.teams[away_id], SLOT_CODES[slot_code])
+            for home_id, away_id, slot_code in compact.games[row].tolist()
+            if home_id != EMPTY
+        ]
+    return schedule
+
+
+def as_schedule_dict(schedule, teams=None):
+    """
+    Lets functions written for the dict form also take a CompactSchedule
+    """
+    if isinstance(schedule, CompactSchedule):
+        return decode_schedule(schedule, teams)
+    return schedule
+
+
+def compute_compact_metrics(compact, teams, debug):
+    """
+    compute_metrics for a CompactSchedule
+    """
+    return compute_metrics(decode_schedule(compact, teams), teams, debug)
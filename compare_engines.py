@@ -0,0 +1,86 @@
+"""
+Compares the search engines in optimizer.SEARCH_ENGINES on fixed seeds.
+
+For every initial schedule seed and every engine we record the best cost after each evaluation of the
+objective, and print the best cost reached after a few evaluation counts, so engines are compared on
+the same amount of work no matter how each one counts its nodes.
+
+    python compare_engines.py --seeds 1 2 3 --evaluations 2000
+"""
+import argparse
+import json
+import time
+
+import optimizer
+from data_class import make_full_league
+from schedule_core import generate_initial_schedule
+
+DEFAULT_WEIGHTS = (1.0, 0.7, 0.7, 0.5)  # the sidebar defaults in app.py
+
+
+def traced_run(engine, schedule, teams, base_debug, weights, evaluations, seed, max_depth):
+    """
+    Runs one engine and returns (best cost after each evaluation, seconds). The improvements come from the
+    profile's evaluation_timeline, which is keyed by the engine's own evaluations counter.
+    """
+    initial_cost, _ = optimizer.evaluate_schedule(schedule, teams, weights)
+    profile = optimizer.SearchProfile()
+    options = {"max_nodes": evaluations, "seed": seed, "profile": profile}
+    if engine == "backtracking":
+        options["max_depth"] = max_depth
+
+    started = time.perf_counter()
+    _, debug = optimizer.optimize_schedule(engine, schedule, teams, base_debug, *weights, **options)
+    seconds = time.perf_counter() - started
+
+    trace = [initial_cost] * (debug["evaluations"] + 1)
+    for evaluation, cost in profile.evaluation_timeline:
+        trace[evaluation:] = [cost] * (len(trace) - evaluation)
+    return trace[:evaluations + 1], seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seeds", type=int, nargs="+", default=[1, 2, 3], help="initial schedule seeds")
+    parser.add_argument("--engines", nargs="+", default=sorted(optimizer.SEARCH_ENGINES))
+    parser.add_argument("--evaluations", type=int, default=1000, help="objective evaluations per run")
+    parser.add_argument("--checkpoints", type=int, nargs="+", default=[100, 250, 500, 1000])
+    parser.add_argument("--optimizer-seed", type=int, default=0)
+    parser.add_argument("--max-depth", type=int, default=3, help="depth limit for the backtracking engine")
+    parser.add_argument("--json", help="also write every trace to this file")
+    args = parser.parse_args()
+
+    teams = make_full_league()
+    checkpoints = [c for c in args.checkpoints if c <= args.evaluations]
+    results = []
+
+    header = f"{'engine':<14}{'seed':>6}" + "".join(f"{f'@{c}':>14}" for c in checkpoints) + f"{'evals':>8}{'seconds':>9}"
+    print(header)
+    print("-" * len(header))
+
+    for initial_seed in args.seeds:
+        for engine in args.engines:
+            schedule, base_debug = generate_initial_schedule(teams, num_weeks=18, seed=initial_seed)
+            trace, seconds = traced_run(
+                engine, schedule, teams, base_debug, DEFAULT_WEIGHTS,
+                args.evaluations, args.optimizer_seed, args.max_depth,
+            )
+            # an engine that stopped early keeps its final best cost for the later checkpoints
+            at_checkpoints = [trace[min(c, len(trace) - 1)] for c in checkpoints]
+            print(f"{engine:<14}{initial_seed:>6}" + "".join(f"{cost:>14.1f}" for cost in at_checkpoints)
+                  + f"{len(trace) - 1:>8}{seconds:>9.2f}")
+            results.append({
+                "engine": engine,
+                "initial_seed": initial_seed,
+                "optimizer_seed": args.optimizer_seed,
+                "seconds": seconds,
+                "best_cost_by_evaluation": trace,
+            })
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import math
+
+from schedule_core import compute_metrics
+from compact_schedule import CompactSchedule, SLOT_CODES
+from data_class import ScheduledGame
+from league_index import get_league_index
+from moves import Move, NEIGHBORHOODS
+
+
+class IncrementalMetrics:
+    """
+    The compute_metrics numbers kept as per-team and per-week parts, so a move only recomputes what it
+    touches instead of the whole season:
+      - per team: travel (km and hours), fatigue and strength of schedule, from compute_metrics of just that
+        team's games with just that team
+      - per week: revenue, the sum of every game's revenue from compute_metrics of just that game (the same
+        teams in the same slot always make the same revenue, so each one is only computed once)
+
+    Every part comes from schedule_core's own compute_metrics, so whatever it counts (streaks, long trips,
+    short rest...) is in the parts too. What we assume is only how they add up: travel, fatigue and revenue
+    are sums over teams and games, and sos_variance is the variance of the teams' strength of schedule
+    (debug["team_sos"]). check matches() against a full compute_metrics before trusting them (see
+    optimizer.incremental_evaluation).
+
+    update(weeks) re-reads those weeks of the schedule after a move (or its undo) and recomputes the teams
+    whose games there changed, at most four teams and two weeks for a swap. metrics() adds the parts up.
+    Totals are sums of the current parts, never running sums, so they don't drift however many moves we make.
+    """
+
+    def __init__(self, schedule, teams):
+        index = get_league_index(teams)
+        self.schedule = schedule
+        self.teams = index.teams
+        self.team_ids = index.team_ids
+
+        if isinstance(schedule, CompactSchedule):
+            self.weeks = schedule.weeks.tolist()
+        else:
+            self.weeks = sorted(schedule)
+        self.week_rows = {week: row for row, week in enumerate(self.weeks)}
+
+        num_teams, num_weeks = len(self.teams), len(self.weeks)
+        self.week_keys = [[] for _ in range(num_weeks)]    # (home id, away id, slot) per game, to spot changes
+        self.week_games = [[] for _ in range(num_weeks)]   # the ScheduledGames of every week
+        # every team's games in every week, in schedule order. Usually one game or none, but the original
+        # swap sampler can book a team twice in a week.
+        self.team_games = [[()] * num_weeks for _ in range(num_teams)]
+        self.team_travel = [0.0] * num_teams
+        self.team_hours = [0.0] * num_teams
+        self.team_fatigue = [0.0] * num_teams
+        self.team_sos = [0.0] * num_teams
+        self.week_revenue = [0.0] * num_weeks
+        self.game_revenue = {}   # (home id, away id, slot) -> revenue
+
+        self.update(self.weeks)
+
+    def _read_week(self, week):
+        if isinstance(self.schedule, CompactSchedule):
+            teams = self.teams
+            return [ScheduledGame(week, teams[home_id], teams[away_id], SLOT_CODES[slot_code])
+                    for home_id, away_id, slot_code in self.schedule.games_in_week(week).tolist()]
+        return list(self.schedule[week])
+
+    def update(self, weeks):
+        """
+        Brings the parts up to date with the schedule after these weeks changed
+        """
+        team_ids = self.team_ids
+        changed = set()
+        for week in set(weeks):
+            row = self.week_rows[week]
+            games = self._read_week(week)
+            before = self.week_keys[row]
+            after = [(team_ids[game.home.name], team_ids[game.away.name], game.slot) for game in games]
+            if after == before:
+                continue
+            # only the teams of games that aren't where they were can have changed
+            touched = set()
+            for position in range(max(len(before), len(after))):
+                old = before[position] if position < len(before) else None
+                new = after[position] if position < len(after) else None
+                if old != new:
+                    touched.update(old[:2] if old else ())
+                    touched.update(new[:2] if new else ())
+            for team_id in touched:
+                team_games = tuple(game for game, key in zip(games, after) if team_id == key[0] or team_id == key[1])
+                team_keys = tuple(key for key in after if team_id == key[0] or team_id == key[1])
+                if team_keys != tuple(key for key in before if team_id == key[0] or team_id == key[1]):
+                    changed.add(team_id)
+                self.team_games[team_id][row] = team_games
+            self.week_keys[row] = after
+            self.week_games[row] = games
+            self.week_revenue[row] = sum(self._game_revenue(game, key) for game, key in zip(games, after))
+
+        for team_id in changed:
+            self._update_team(team_id)
+
+    def _game_revenue(self, game, key):
+        revenue = self.game_revenue.get(key)
+        if revenue is None:
+            revenue = compute_metrics({game.week: [game]}, [game.home, game.away], {})["revenue_score"]
+            self.game_revenue[key] = revenue
+        return revenue
+
+    def _update_team(self, team_id):
+        team = self.teams[team_id]
+        team_schedule = {week: list(self.team_games[team_id][row]) for row, week in enumerate(self.weeks)}
+        debug = {}
+        metrics = compute_metrics(team_schedule, [team], debug)
+        self.team_travel[team_id] = metrics["total_travel"]
+        self.team_hours[team_id] = metrics["travel_time_hours"]
+        self.team_fatigue[team_id] = metrics["fatigue_penalty"]
+        self.team_sos[team_id] = debug["team_sos"][team.name]
+
+    def metrics(self):
+        """
+        Same dict as compute_metrics, from the current parts
+        """
+        mean_sos = sum(self.team_sos) / len(self.team_sos)
+        return {
+            "total_travel": sum(self.team_travel),
+            "travel_time_hours": sum(self.team_hours),
+            "fatigue_penalty": sum(self.team_fatigue),
+            "sos_variance": sum((sos - mean_sos) ** 2 for sos in self.team_sos) / len(self.team_sos),
+            "revenue_score": sum(self.week_revenue),
+        }
+
+    def matches(self, full_metrics, rel_tol=1e-9):
+        """
+        Whether metrics() agrees with a full compute_metrics of the same schedule (up to float rounding)
+        """
+        ours = self.metrics()
+        if set(ours) != set(full_metrics):
+            return False
+        return all(math.isclose(ours[key], full_metrics[key], rel_tol=rel_tol, abs_tol=1e-6) for key in ours)
+
+
+class IncrementalMoves:
+    """
+    Wraps a move source (see optimizer.make_move_source) so every apply/undo also updates an
+    IncrementalMetrics with the weeks the move touched
+    """
+
+    def __init__(self, moves, tracker):
+        self.moves = moves
+        self.tracker = tracker
+
+    def apply(self, move, hasher=None):
+        self.moves.apply(move, hasher)
+        self.tracker.update(_move_weeks(move))
+
+    def undo(self, move, hasher=None):
+        self.moves.undo(move, hasher)
+        self.tracker.update(_move_weeks(move))
+
+    def __getattr__(self, name):
+        return getattr(self.moves, name)
+
+
+def _move_weeks(move):
+    if isinstance(move, Move):
+        return move.weeks
+    # (week1, index1, week2, index2) from the original swap sampler
+    return move[0], move[2]
+
+
+def check_incremental_metrics(schedule, teams, num_moves=200, seed=0, neighborhoods=NEIGHBORHOODS):
+    """
+    Applies num_moves random moves to a copy of a dict schedule and compares IncrementalMetrics against a
+    full compute_metrics after every one (and after undoing them all). Returns the number of mismatches.
+    """
+    from optimizer import make_move_source
+    from rng_streams import make_rng
+
+    schedule = {week: list(games) for week, games in schedule.items()}
+    tracker = IncrementalMetrics(schedule, teams)
+    moves = IncrementalMoves(make_move_source(schedule, teams, neighborhoods), tracker)
+    rng = make_rng(seed)
+    mismatches = int(not tracker.matches(compute_metrics(schedule, teams, {})))
+    applied = []
+    for _ in range(num_moves):
+        sampled = moves.sample(1, rng)
+        if not sampled:
+            break
+        moves.apply(sampled[0])
+        applied.append(sampled[0])
+        mismatches += not tracker.matches(compute_metrics(schedule, teams, {}))
+    while applied:
+        moves.undo(applied.pop())
+    mismatches += not tracker.matches(compute_metrics(schedule, teams, {}))
+    return mismatches
@@ -0,0 +1,127 @@
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, astuple
+
+import numpy as np
+
+from schedule_core import haversine, game_quality
+
+# Average door-to-door speed of a team charter, used to turn the distance matrix into hours
+TRAVEL_SPEED_KMH = 800.0
+
+# how many leagues we keep indexes for, least recently used goes first; there's normally just the one
+LEAGUE_CACHE_SIZE = 8
+
+_INDEX_CACHE = OrderedDict()     # fingerprint -> LeagueIndex
+_INDEX_BY_LIST = OrderedDict()   # id(teams) -> (teams, team fields, LeagueIndex), for lists already fingerprinted
+
+
+@dataclass
+class LeagueIndex:
+    """
+    Gives us integer ids for every team and lookup tables for everything metric code keeps
+    recomputing from Team objects:
+
+      - distance[i, j]     : haversine distance in km between team i and team j
+      - travel_time[i, j]  : hours of travel between team i and team j
+      - quality[i, j]      : game_quality with team i hosting team j (includes rivalry bonuses)
+
+    Ids follow the order of the team list the index was built from.
+    """
+
+    teams: list
+    team_ids: dict          # team name -> integer id
+    strength: np.ndarray    # strength rating by id
+    distance: np.ndarray
+    travel_time: np.ndarray
+    quality: np.ndarray
+    fingerprint: str
+
+    def team_id(self, team):
+        return self.team_ids[team.name]
+
+    def team_distance(self, team1, team2):
+        return self.distance[self.team_ids[team1.name], self.team_ids[team2.name]]
+
+    def matchup_quality(self, home, away):
+        return self.quality[self.team_ids[home.name], self.team_ids[away.name]]
+
+
+def league_fingerprint(teams):
+    """
+    Hash of every field of every team, in order. It only changes when the team data changes,
+    so we can use it to decide when a cached index (or anything built from it) is stale.
+    """
+    digest = hashlib.sha1()
+    for team in teams:
+        digest.update(repr(astuple(team)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build_league_index(teams):
+    """
+    Builds the index from scratch. This is the only place that calls haversine and game_quality
+    for every pair of teams, so the optimizer hot loop never has to do the trigonometry again.
+    """
+    n = len(teams)
+    distance = np.zeros((n, n))
+    quality = np.zeros((n, n))
+
+    for i, team1 in enumerate(teams):
+        for j, team2 in enumerate(teams):
+            if i == j:
+                continue
+            distance[i, j] = haversine(team1.lat, team1.lon, team2.lat, team2.lon)
+            quality[i, j] = game_quality(team1, team2)
+
+    return LeagueIndex(
+        teams=list(teams),
+        team_ids={team.name: i for i, team in enumerate(teams)},
+        strength=np.array([team.strength for team in teams]),
+        distance=distance,
+        travel_time=distance / TRAVEL_SPEED_KMH,
+        quality=quality,
+        fingerprint=league_fingerprint(teams),
+    )
+
+
+def get_league_index(teams):
+    """
+    Returns the index for this league, building it only the first time we see this team data.
+
+    Hot paths call this all the time, so a team list we've seen before is found by identity without hashing
+    it again, as long as its teams still have the fields they had then (comparing them is much cheaper than
+    the fingerprint). A team changed in place, added or replaced gets the index for the new data.
+    """
+    entry = _INDEX_BY_LIST.get(id(teams))
+    # the entry keeps the list alive, so its id can't have been reused by another list
+    if entry is not None and entry[0] is teams and entry[1] == [vars(team) for team in teams]:
+        _INDEX_BY_LIST.move_to_end(id(teams))
+        return entry[2]
+
+    fingerprint = league_fingerprint(teams)
+    index = _INDEX_CACHE.get(fingerprint)
+    if index is None:
+        index = build_league_index(teams)
+    _remember(_INDEX_CACHE, fingerprint, index)
+    _remember(_INDEX_BY_LIST, id(teams), (teams, [dict(vars(team)) for team in teams], index))
+    return index
+
+
+def _remember(cache, key, value):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > LEAGUE_CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def index_for_fingerprint(fingerprint):
+    """
+    Returns the cached index with this fingerprint, or None if this process hasn't built it yet
+    """
+    return _INDEX_CACHE.get(fingerprint)
+
+
+def clear_league_indexes():
+    _INDEX_CACHE.clear()
+    _INDEX_BY_LIST.clear()
@@ -0,0 +1,374 @@
+from collections import deque
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from compact_schedule import SLOT_IDS, EMPTY
+from league_index import get_league_index
+
+PRIME_TIME_SLOTS = ("SUN_NIGHT", "MON", "THU")
+PRIME_TIME_CODES = np.array([SLOT_IDS[slot] for slot in PRIME_TIME_SLOTS])
+
+# The kinds of moves (neighborhoods) a MoveGenerator can make:
+#   - "swap": swap two games in different weeks
+#   - "flip": swap home and away of one game
+#   - "slot": swap the time slots of two games in the same week, at least one of them prime time
+#   - "bye" : move a game to a week where both teams are on bye, so their bye moves to the old week
+NEIGHBORHOODS = ("swap", "flip", "slot", "bye")
+
+# how many applied moves deep we remember the candidates from before them, so undoing a move gets them back
+CANDIDATE_CACHE_DEPTH = 8
+
+
+@dataclass(frozen=True)
+class Move:
+    """
+    One change to a schedule. Which fields are used depends on the kind:
+      - swap: game (week1, index1) <-> game (week2, index2)
+      - flip: game (week1, index1)
+      - slot: games (week1, index1) and (week1, index2)
+      - bye : game (week1, index1) moves to the end of week2
+    teams (ids) and weeks are everything the move touches, for incremental evaluators and validators.
+    """
+
+    kind: str
+    week1: int
+    index1: int
+    week2: int = -1
+    index2: int = -1
+    teams: frozenset = frozenset()
+    weeks: tuple = ()
+
+
+class MoveGenerator:
+    """
+    Makes feasible moves for a dict schedule and applies them, keeping a team x week occupancy index up
+    to date so feasibility is an array lookup instead of trying random pairs and throwing most away.
+
+    occupancy[team_id, row] is the index of that team's game in week `weeks[row]`, or EMPTY on a bye.
+    home/away/slot[row, index] mirror the schedule lists (EMPTY past the end of a week), and
+    home_games/games_played are per-team counts used to keep the home/away balance.
+
+    All changes to the schedule have to go through apply/undo so the index stays in sync.
+
+    Building the candidates is the expensive part, so sample() keeps them until the next move. Undo puts the
+    schedule back exactly as it was before the move, so it also puts back the candidates we had then (up to
+    CANDIDATE_CACHE_DEPTH moves deep): trying a move and undoing it, which is most of what the search engines
+    do, never rebuilds them.
+    """
+
+    def __init__(self, schedule, teams, neighborhoods=NEIGHBORHOODS, allowed_bye_weeks=None):
+        index = get_league_index(teams)
+        self.schedule = schedule
+        self.teams = index.teams
+        self.team_ids = index.team_ids
+        self.neighborhoods = tuple(neighborhoods)
+        self.weeks = sorted(schedule)
+        self.week_rows = {week: row for row, week in enumerate(self.weeks)}
+        self.allowed_bye_rows = None
+        if allowed_bye_weeks is not None:
+            self.allowed_bye_rows = np.array([self.week_rows[week] for week in allowed_bye_weeks])
+
+        num_weeks, num_teams = len(self.weeks), len(teams)
+        # room for a full week in every row, since bye moves add games to weeks with byes
+        max_games = max(max(len(games) for games in schedule.values()), num_teams // 2)
+
+        self.home = np.full((num_weeks, max_games), EMPTY, dtype=np.intp)
+        self.away = np.full((num_weeks, max_games), EMPTY, dtype=np.intp)
+        self.slot = np.full((num_weeks, max_games), EMPTY, dtype=np.intp)
+        self.num_games = np.zeros(num_weeks, dtype=np.intp)
+        self.occupancy = np.full((num_teams, num_weeks), EMPTY, dtype=np.intp)
+        self.home_games = np.zeros(num_teams, dtype=np.intp)
+        self.games_played = np.zeros(num_teams, dtype=np.intp)
+
+        for row, week in enumerate(self.weeks):
+            for game_index, game in enumerate(schedule[week]):
+                self._set_game(row, game_index, game)
+            self.num_games[row] = len(schedule[week])
+        np.add.at(self.home_games, self.home[self.home != EMPTY], 1)
+        np.add.at(self.games_played, self.home[self.home != EMPTY], 1)
+        np.add.at(self.games_played, self.away[self.away != EMPTY], 1)
+
+        self._candidates_now = None   # (candidates per neighborhood, offsets) for the schedule as it is
+        self._candidates_before = deque(maxlen=CANDIDATE_CACHE_DEPTH)  # the same from before each applied move
+
+    # ---- generating moves ----
+
+    def sample(self, n, rng):
+        """
+        Up to n distinct feasible moves, picked uniformly from every feasible move of every neighborhood
+        """
+        if self._candidates_now is None:
+            candidates = [(kind, self._candidates(kind)) for kind in self.neighborhoods]
+            sizes = [len(found[0]) for _, found in candidates]
+            self._candidates_now = candidates, np.concatenate([[0], np.cumsum(sizes)])
+        candidates, offsets = self._candidates_now
+        total = int(offsets[-1])
+        if total == 0:
+            return []
+
+        picks = np.sort(rng.choice(total, size=min(n, total), replace=False))
+        moves = []
+        for pick in picks.tolist():
+            which = int(np.searchsorted(offsets, pick, side="right")) - 1
+            kind, found = candidates[which]
+            moves.append(self._make_move(kind, [column[pick - offsets[which]] for column in found]))
+        return moves
+
+    def feasible_moves(self, kind):
+        """
+        Every feasible move of one kind, as Move objects
+        """
+        found = self._candidates(kind)
+        return [self._make_move(kind, values) for values in zip(*found)]
+
+    def _candidates(self, kind):
+        return {
+            "swap": self._swap_candidates,
+            "flip": self._flip_candidates,
+            "slot": self._slot_candidates,
+            "bye": self._bye_candidates,
+        }[kind]()
+
+    def _game_positions(self):
+        rows, columns = np.nonzero(self.home != EMPTY)
+        return rows, columns, self.home[rows, columns], self.away[rows, columns]
+
+    def _swap_candidates(self):
+        """
+        Game A in row r1 can swap with game B in row r2 only if neither team ends up playing twice in a week:
+        A's teams must be on bye in r2 or be B's teams, and the same for B's teams in r1. With the occupancy
+        index we check every (game, other week) pair at once.
+        """
+        rows, columns, home_ids, away_ids = self._game_positions()
+        num_weeks = len(self.weeks)
+        home_at = self.occupancy[home_ids]     # (games, weeks): where A's home team plays in each week
+        away_at = self.occupancy[away_ids]
+        later_week = np.arange(num_weeks)[None, :] > rows[:, None]   # every swap once, from its earlier game
+
+        found_r1, found_i1, found_r2, found_i2 = [], [], [], []
+
+        def keep(mask, partner):
+            game, row2 = np.nonzero(mask)
+            found_r1.append(rows[game])
+            found_i1.append(columns[game])
+            found_r2.append(row2)
+            found_i2.append(partner[game, row2])
+
+        # same two teams play again in the other week
+        keep(later_week & (home_at == away_at) & (home_at != EMPTY), home_at)
+
+        # one of A's teams plays B in the other week and the other is on bye there,
+        # then B's other team has to be on bye in A's week
+        for plays_at, bye_at, team_ids in ((home_at, away_at, home_ids), (away_at, home_at, away_ids)):
+            mask = later_week & (plays_at != EMPTY) & (bye_at == EMPTY)
+            game, row2 = np.nonzero(mask)
+            partner = plays_at[game, row2]
+            partner_home, partner_away = self.home[row2, partner], self.away[row2, partner]
+            other = np.where(partner_home == team_ids[game], partner_away, partner_home)
+            ok = self.occupancy[other, rows[game]] == EMPTY
+            mask[game[~ok], row2[~ok]] = False
+            keep(mask, plays_at)
+
+        # both of A's teams are on bye in the other week, then both of B's teams must be on bye in A's week
+        game, row2 = np.nonzero(later_week & (home_at == EMPTY) & (away_at == EMPTY))
+        for g, r2 in zip(game.tolist(), row2.tolist()):
+            r1 = rows[g]
+            for i2 in range(self.num_games[r2]):
+                if self.occupancy[self.home[r2, i2], r1] == EMPTY and self.occupancy[self.away[r2, i2], r1] == EMPTY:
+                    found_r1.append([r1])
+                    found_i1.append([columns[g]])
+                    found_r2.append([r2])
+                    found_i2.append([i2])
+
+        return tuple(np.concatenate(column).astype(np.intp) for column in (found_r1, found_i1, found_r2, found_i2))
+
+    def _flip_candidates(self):
+        """
+        Flipping home and away keeps every team within one game of an even home/away split
+        """
+        rows, columns, home_ids, away_ids = self._game_positions()
+        new_home_count = self.home_games[home_ids] - 1
+        new_away_team_home_count = self.home_games[away_ids] + 1
+        ok = (
+            (np.abs(2 * new_home_count - self.games_played[home_ids]) <= 1)
+            & (np.abs(2 * new_away_team_home_count - self.games_played[away_ids]) <= 1)
+        )
+        return rows[ok], columns[ok]
+
+    def _slot_candidates(self):
+        """
+        Pairs of games in the same week with different slots where at least one is prime time,
+        so every week keeps the same number of each prime-time slot
+        """
+        found_rows, found_i1, found_i2 = [], [], []
+        for row in range(len(self.weeks)):
+            slots = self.slot[row, :self.num_games[row]]
+            is_prime = np.isin(slots, PRIME_TIME_CODES)
+            first, second = np.nonzero(np.triu(
+                (is_prime[:, None] | is_prime[None, :]) & (slots[:, None] != slots[None, :]), k=1
+            ))
+            found_rows.append(np.full(len(first), row))
+            found_i1.append(first)
+            found_i2.append(second)
+        return tuple(np.concatenate(column).astype(np.intp) for column in (found_rows, found_i1, found_i2))
+
+    def _bye_candidates(self):
+        """
+        A game can move to any week where both its teams are on bye (and the week has room)
+        """
+        rows, columns, home_ids, away_ids = self._game_positions()
+        mask = (self.occupancy[home_ids] == EMPTY) & (self.occupancy[away_ids] == EMPTY)
+        mask &= (self.num_games < self.home.shape[1])[None, :]
+        if self.allowed_bye_rows is not None:
+            # the teams' new bye is the week the game leaves
+            mask &= np.isin(rows, self.allowed_bye_rows)[:, None]
+        game, row2 = np.nonzero(mask)
+        return rows[game], columns[game], row2
+
+    def _make_move(self, kind, values):
+        values = [int(value) for value in values]
+        if kind == "swap":
+            r1, i1, r2, i2 = values
+            team_ids = self._teams_at(r1, i1) | self._teams_at(r2, i2)
+            return Move(kind, self.weeks[r1], i1, self.weeks[r2], i2, team_ids, (self.weeks[r1], self.weeks[r2]))
+        if kind == "flip":
+            r1, i1 = values
+            return Move(kind, self.weeks[r1], i1, teams=self._teams_at(r1, i1), weeks=(self.weeks[r1],))
+        if kind == "slot":
+            r1, i1, i2 = values
+            team_ids = self._teams_at(r1, i1) | self._teams_at(r1, i2)
+            return Move(kind, self.weeks[r1], i1, self.weeks[r1], i2, team_ids, (self.weeks[r1],))
+        r1, i1, r2 = values
+        return Move(kind, self.weeks[r1], i1, self.weeks[r2], teams=self._teams_at(r1, i1),
+                    weeks=(self.weeks[r1], self.weeks[r2]))
+
+    def _teams_at(self, row, game_index):
+        return frozenset((int(self.home[row, game_index]), int(self.away[row, game_index])))
+
+    # ---- applying moves ----
+
+    def apply(self, move, hasher=None):
+        """
+        Makes the move on the schedule and the index. If a ZobristHasher is passed, its hash is updated too.
+        """
+        self._candidates_before.append(self._candidates_now)
+        self._candidates_now = None
+        self._make(move, hasher)
+
+    def undo(self, move, hasher=None):
+        """
+        Undoes the last move applied. Swaps, flips and slot swaps are their own inverse.
+        """
+        if move.kind == "bye":
+            self._move_back_from_bye_week(move, hasher)
+        else:
+            self._make(move, hasher)
+        self._candidates_now = self._candidates_before.pop() if self._candidates_before else None
+
+    def _make(self, move, hasher):
+        if move.kind == "swap":
+            self._swap(move, hasher)
+        elif move.kind == "flip":
+            self._flip(move, hasher)
+        elif move.kind == "slot":
+            self._swap_slots(move, hasher)
+        else:
+            self._move_to_bye_week(move, hasher)
+
+    def _swap(self, move, hasher):
+        if hasher is not None:
+            hasher.update_for_swap(self.schedule, move.week1, move.index1, move.week2, move.index2)
+        games1, games2 = self.schedule[move.week1], self.schedule[move.week2]
+        game1, game2 = games1[move.index1], games2[move.index2]
+        r1, r2 = self.week_rows[move.week1], self.week_rows[move.week2]
+        self._clear_game(r1, move.index1, game1)
+        self._clear_game(r2, move.index2, game2)
+        games1[move.index1], games2[move.index2] = game2, game1
+        self._set_game(r1, move.index1, game2)
+        self._set_game(r2, move.index2, game1)
+
+    def _flip(self, move, hasher):
+        game = self.schedule[move.week1][move.index1]
+        flipped = replace(game, home=game.away, away=game.home)
+        self._replace_game(move.week1, move.index1, flipped, hasher)
+        self.home_games[self.team_ids[game.home.name]] -= 1
+        self.home_games[self.team_ids[game.away.name]] += 1
+
+    def _swap_slots(self, move, hasher):
+        games = self.schedule[move.week1]
+        game1, game2 = games[move.index1], games[move.index2]
+        self._replace_game(move.week1, move.index1, replace(game1, slot=game2.slot), hasher)
+        self._replace_game(move.week1, move.index2, replace(game2, slot=game1.slot), hasher)
+
+    def _move_to_bye_week(self, move, hasher):
+        # the last game of week1 fills the hole, so only two games change position
+        games1, games2 = self.schedule[move.week1], self.schedule[move.week2]
+        r1, r2 = self.week_rows[move.week1], self.week_rows[move.week2]
+        game = games1[move.index1]
+        last = len(games1) - 1
+
+        self._toggle_hash(hasher, move.week1, game)
+        self._clear_game(r1, move.index1, game)
+        if move.index1 != last:
+            self._clear_game(r1, last, games1[last])
+            games1[move.index1] = games1[last]
+            self._set_game(r1, move.index1, games1[move.index1])
+        games1.pop()
+        self.num_games[r1] -= 1
+
+        moved = replace(game, week=move.week2)
+        games2.append(moved)
+        self._set_game(r2, len(games2) - 1, moved)
+        self.num_games[r2] += 1
+        self._toggle_hash(hasher, move.week2, moved)
+
+    def _move_back_from_bye_week(self, move, hasher):
+        games1, games2 = self.schedule[move.week1], self.schedule[move.week2]
+        r1, r2 = self.week_rows[move.week1], self.week_rows[move.week2]
+        moved = games2.pop()
+        self._toggle_hash(hasher, move.week2, moved)
+        self._clear_game(r2, len(games2), moved)
+        self.num_games[r2] -= 1
+
+        game = replace(moved, week=move.week1)
+        if move.index1 == len(games1):
+            games1.append(game)
+        else:
+            displaced = games1[move.index1]
+            self._clear_game(r1, move.index1, displaced)
+            games1.append(displaced)
+            self._set_game(r1, len(games1) - 1, displaced)
+            games1[move.index1] = game
+        self._set_game(r1, move.index1, game)
+        self.num_games[r1] += 1
+        self._toggle_hash(hasher, move.week1, game)
+
+    def _replace_game(self, week, game_index, new_game, hasher):
+        # games can be shared with other copies of the schedule, so we never change one in place
+        games = self.schedule[week]
+        row = self.week_rows[week]
+        self._toggle_hash(hasher, week, games[game_index])
+        self._clear_game(row, game_index, games[game_index])
+        games[game_index] = new_game
+        self._set_game(row, game_index, new_game)
+        self._toggle_hash(hasher, week, new_game)
+
+    def _set_game(self, row, game_index, game):
+        home_id, away_id = self.team_ids[game.home.name], self.team_ids[game.away.name]
+        self.home[row, game_index] = home_id
+        self.away[row, game_index] = away_id
+        self.slot[row, game_index] = SLOT_IDS[game.slot]
+        self.occupancy[home_id, row] = game_index
+        self.occupancy[away_id, row] = game_index
+
+    def _clear_game(self, row, game_index, game):
+        self.home[row, game_index] = EMPTY
+        self.away[row, game_index] = EMPTY
+        self.slot[row, game_index] = EMPTY
+        self.occupancy[self.team_ids[game.home.name], row] = EMPTY
+        self.occupancy[self.team_ids[game.away.name], row] = EMPTY
+
+    def _toggle_hash(self, hasher, week, game):
+        if hasher is not None:
+            hasher.toggle_game(week, (self.team_ids[game.home.name], self.team_ids[game.away.name], SLOT_IDS[game.slot]))
@@ -0,0 +1,122 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from schedule_core import generate_initial_schedule, compute_metrics, objective
+from optimizer import optimize_schedule_backtracking, SearchProfile
+from compact_schedule import encode_schedule, decode_schedule
+from league_index import get_league_index
+
+# Teams of the league a worker process optimizes for, sent once per worker by _init_worker
+_WORKER_TEAMS = None
+
+
+def _init_worker(teams):
+    global _WORKER_TEAMS
+    _WORKER_TEAMS = teams
+    get_league_index(teams)  # build it once per process, every start reuses it
+
+
+def _is_plain(value):
+    # numbers, strings and dicts/lists of them, all the way down
+    if value is None or isinstance(value, (int, float, str)):
+        return True
+    if isinstance(value, dict):
+        return all(isinstance(key, (int, float, str)) and _is_plain(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return all(_is_plain(item) for item in value)
+    return False
+
+
+def _metrics_only(debug):
+    # the debug dict from generate_initial_schedule can hold anything, only send back plain values
+    return {key: value for key, value in debug.items() if _is_plain(value)}
+
+
+def _run_start(start, initial_seed, optimizer_seed, weights, num_weeks, max_depth, max_nodes, time_budget_s, patience,
+               profile):
+    """
+    One start of the multi-start search. Runs inside a worker and only returns the compact schedule
+    plus plain dicts, so no Team objects have to be pickled on the way back.
+    """
+    teams = _WORKER_TEAMS
+    started = time.perf_counter()
+
+    schedule, starting_debug = generate_initial_schedule(teams, num_weeks=num_weeks, seed=initial_seed)
+    initial_metrics = compute_metrics(schedule, teams, {})
+    initial_cost = objective(initial_metrics, *weights)
+
+    best_schedule, debug = optimize_schedule_backtracking(
+        schedule,
+        teams,
+        starting_debug,
+        *weights,
+        max_depth=max_depth,
+        max_nodes=max_nodes,
+        seed=optimizer_seed,
+        time_budget_s=time_budget_s,
+        patience=patience,
+        profile=SearchProfile() if profile else None,
+    )
+
+    stats = {
+        "start": start,
+        "initial_seed": initial_seed,
+        "optimizer_seed": optimizer_seed,
+        "initial_cost": initial_cost,
+        "best_cost": debug["best_cost"],
+        "nodes_visited": debug["nodes_visited"],
+        "seconds": time.perf_counter() - started,
+        "initial_metrics": initial_metrics,
+    }
+    return encode_schedule(best_schedule, teams), _metrics_only(debug), stats
+
+
+def optimize_multistart(
+    teams,
+    n_starts,
+    workers,
+    travel_weight,
+    fatigue_weight,
+    sos_weight,
+    revenue_weight,
+    max_depth=2,
+    max_nodes=400,
+    initial_seed=0,
+    optimizer_seed=0,
+    num_weeks=18,
+    time_budget_s=None,
+    patience=None,
+    profile=False,
+):
+    """
+    Runs optimize_schedule_backtracking from n_starts different initial schedules and keeps the best.
+
+    Start k uses initial_seed + k for generate_initial_schedule and optimizer_seed + k for the search,
+    so start 0 is the same run as a single call with those seeds. With workers > 1 the starts run in
+    that many processes; workers send back CompactSchedule arrays and metric dicts only.
+    time_budget_s and patience apply to every start on its own (see optimize_schedule_backtracking).
+    With profile=True every start is profiled and its SearchProfile summary is in its debug["profile"].
+
+    Returns (best_schedule, best_debug, start_stats), where start_stats has one dict per start
+    (seeds, initial and best cost, nodes visited, seconds, initial metrics) in start order.
+    """
+    weights = (travel_weight, fatigue_weight, sos_weight, revenue_weight)
+    jobs = [
+        (start, initial_seed + start, optimizer_seed + start, weights, num_weeks, max_depth, max_nodes,
+         time_budget_s, patience, profile)
+        for start in range(n_starts)
+    ]
+
+    workers = max(1, min(workers, n_starts, os.cpu_count() or 1))
+    if workers == 1:
+        _init_worker(teams)
+        results = [_run_start(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(teams,)) as pool:
+            results = list(pool.map(_run_start, *zip(*jobs)))
+
+    best_compact, best_debug, _ = min(results, key=lambda result: result[2]["best_cost"])
+    start_stats = [stats for _, _, stats in results]
+
+    return decode_schedule(best_compact, teams), best_debug, start_stats
@@ -1,8 +1,22 @@
-import random
+import json
+import math
+import time
+from collections import deque
 from data_class import Team, ScheduledGame
 from schedule_core import compute_metrics, objective
+from compact_schedule import CompactSchedule, encode_schedule, decode_schedule
+from rng_streams import make_rng
+from transposition import ZobristHasher, TranspositionTable
+from moves import Move, MoveGenerator
+from validation import ScheduleValidator, ValidatedMoves
+from incremental_metrics import IncrementalMetrics, IncrementalMoves
 
-def generate_swap_candidates(schedule, max_pairs=40, seed=0):
+# incremental evaluation double-checks itself with a full compute_metrics this often (0 never)
+DELTA_CHECK_EVERY = 500
+# annealing and tabu log at most this many moves after their best schedule before copying it out
+MOVE_LOG_LIMIT = 10000
+
+def generate_swap_candidates(schedule, max_pairs=40, seed=0, rng=None):
     """
     Given our initial schedule, we want to generate potential game swaps we can try to optimize it.
     
@@ -11,8 +25,11 @@ def generate_swap_candidates(schedule, max_pairs=40, seed=0):
     
     Function returns a list of swap candidates in the format:
       (week1, game_index1, week2, game_index2)
+
+    Picks come from `rng` (a NumPy generator), or a new generator made from `seed`.
     """
-    random.seed(seed)
+    if rng is None:
+        rng = make_rng(seed)
     
       # build a list of all games in the schedule by their (week, index) position
     all_games = []
@@ -26,12 +43,16 @@ def generate_swap_candidates(schedule, max_pairs=40, seed=0):
     attempts = 0
     max_attempts = max_pairs * 10   # max tries to find valid swaps, saves time/computation
 
+    # draw every pick we could need in one go instead of one call per pick
+    picks = rng.integers(0, len(all_games), size=(max_attempts, 2)).tolist()
+
      #keep trying until we have enough valid swaps or run out of attempts
     while len(possible_swaps) < max_pairs and attempts < max_attempts:
         
         # pick two random games
-        week1, index1 = random.choice(all_games)
-        week2, index2 = random.choice(all_games)
+        pick1, pick2 = picks[attempts]
+        week1, index1 = all_games[pick1]
+        week2, index2 = all_games[pick2]
         attempts += 1
         
         #make sure not swapping with itself
@@ -69,15 +90,303 @@ def generate_swap_candidates(schedule, max_pairs=40, seed=0):
             
     return possible_swaps
 
-def swap_games(schedule, week1, index1, week2, index2):
+def swap_games(schedule, week1, index1, week2, index2, hasher=None):
     """
     Swaps two games in the schedule.
     
     We take the game at week1[index1] and swaps it with the game at week2[index2], 
-    which modifies our schedule directly.
+    which modifies our schedule directly. Works on both the dict and the CompactSchedule form.
+    If a ZobristHasher is passed, its hash of the schedule is updated in O(1) too.
     """
+    if hasher is not None:
+        hasher.update_for_swap(schedule, week1, index1, week2, index2)
+    if isinstance(schedule, CompactSchedule):
+        schedule.swap(week1, index1, week2, index2)
+        return
     schedule[week1][index1], schedule[week2][index2] = schedule[week2][index2], schedule[week1][index1]
 
+class _SwapMoves:
+    """
+    The original random swaps (generate_swap_candidates/swap_games) behind the same
+    sample/apply/undo interface as moves.MoveGenerator
+    """
+
+    def __init__(self, schedule):
+        self.schedule = schedule
+
+    def sample(self, n, rng):
+        return generate_swap_candidates(self.schedule, max_pairs=n, rng=rng)
+
+    def apply(self, move, hasher=None):
+        swap_games(self.schedule, *move, hasher)
+
+    undo = apply
+
+def make_move_source(schedule, teams, neighborhoods=None, validate=False):
+    """
+    What the search engines get their moves from. With neighborhoods=None it's the original swap sampler,
+    otherwise a MoveGenerator over those neighborhoods (see moves.NEIGHBORHOODS), which only makes
+    feasible moves but needs a dict schedule.
+    With validate=True, moves that would break more schedule rules than the schedule already breaks are
+    thrown away before they're evaluated (see validation.ValidatedMoves). Also needs a dict schedule.
+    """
+    if (neighborhoods is not None or validate) and isinstance(schedule, CompactSchedule):
+        raise ValueError("neighborhoods and validate need a dict schedule, decode the CompactSchedule first")
+    if neighborhoods is None:
+        moves = _SwapMoves(schedule)
+    else:
+        moves = MoveGenerator(schedule, teams, neighborhoods)
+    if validate:
+        moves = ValidatedMoves(moves, schedule, ScheduleValidator(teams, schedule))
+    return moves
+
+def _same_week_swap(move):
+    # a swap inside one week leaves every week with the same games, so the metrics don't change
+    return not isinstance(move, Move) and move[0] == move[2]
+
+def evaluate_schedule(schedule, teams, weights, debug=None):
+    """
+    The objective every search engine minimizes. weights is (travel, fatigue, sos, revenue).
+    Returns (cost, metrics). Whatever compute_metrics reports besides the metrics (like team_sos) goes in
+    debug if one is passed; the engines pass theirs when scoring the starting schedule.
+    """
+    metrics = compute_metrics(schedule, teams, {} if debug is None else debug)
+    return objective(metrics, *weights), metrics
+
+def incremental_evaluation(schedule, teams, moves, debug, full_evaluate=evaluate_schedule, start_metrics=None,
+                           profile=None, check_every=DELTA_CHECK_EVERY):
+    """
+    Scores schedules from per-team and per-week parts (see incremental_metrics.IncrementalMetrics) that only
+    get recomputed for the teams and weeks a move touches, instead of a full compute_metrics every time.
+    Returns (evaluate, moves), and every move from then on has to go through the returned move source.
+
+    The parts have to add up to start_metrics (a full compute_metrics of schedule, computed here if it's
+    not given), otherwise schedule_core doesn't split into those parts and we keep full_evaluate. Every check_every
+    incremental evaluations we compare against full_evaluate again and switch to it for good if they
+    disagree. debug["incremental_metrics"] says whether the search ended on incremental evaluations,
+    debug["delta_evaluations"] counts them.
+    """
+    debug.setdefault("delta_evaluations", 0)
+    if start_metrics is None:
+        start_metrics = full_evaluate(schedule, teams, (0, 0, 0, 0))[1]
+    try:
+        tracker = IncrementalMetrics(schedule, teams)
+    except (KeyError, ValueError, TypeError, ZeroDivisionError):
+        # compute_metrics can't score one team's or one week's games on their own
+        debug["incremental_metrics"] = False
+        return full_evaluate, moves
+    debug["incremental_metrics"] = tracker.matches(start_metrics)
+    if not debug["incremental_metrics"]:
+        return full_evaluate, moves
+
+    current_metrics = tracker.metrics if profile is None else profile.timed("delta_metrics", tracker.metrics)
+
+    def evaluate(schedule, teams, weights, search_debug=None):
+        if not debug["incremental_metrics"]:
+            return full_evaluate(schedule, teams, weights, search_debug)
+        debug["delta_evaluations"] += 1
+        if check_every and debug["delta_evaluations"] % check_every == 0:
+            cost, metrics = full_evaluate(schedule, teams, weights)
+            debug["incremental_metrics"] = tracker.matches(metrics)
+            return cost, metrics
+        metrics = current_metrics()
+        return objective(metrics, *weights), metrics
+
+    return evaluate, IncrementalMoves(moves, tracker)
+
+class SearchBudget:
+    """
+    Stopping rules and progress reporting shared by every search engine:
+    - max_nodes: stop once debug["nodes_visited"] reaches this
+    - time_budget_s: stop after this many seconds of wall-clock time
+    - patience: stop after this many evaluated schedules in a row without an improvement
+    - progress_callback(elapsed, nodes, best_cost): called every progress_every nodes and once at the end
+    debug["stop_reason"] says which rule fired first ("max_nodes", "time_budget", "patience"),
+    or "exhausted" if the engine ran out of things to try before any of them.
+    If a SearchProfile is passed, improvements also go on its timeline.
+    """
+
+    def __init__(self, debug, max_nodes, time_budget_s=None, patience=None,
+                 progress_callback=None, progress_every=25, profile=None):
+        self.debug = debug
+        self.max_nodes = max_nodes
+        self.time_budget_s = time_budget_s
+        self.patience = patience
+        self.progress_callback = progress_callback
+        self.progress_every = progress_every
+        self.since_improvement = 0
+        self.profile = profile
+        self.started = time.perf_counter()
+        if profile is not None:
+            profile.started = self.started
+        debug["nodes_visited"] = 0
+        debug["evaluations"] = 0
+        debug["stop_reason"] = "exhausted"
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def record_evaluation(self, found_improvement, cost=None):
+        self.debug["evaluations"] += 1
+        self.since_improvement = 0 if found_improvement else self.since_improvement + 1
+        if found_improvement and self.profile is not None:
+            self.profile.timeline.append((self.debug["nodes_visited"], self.elapsed(), cost))
+            self.profile.evaluation_timeline.append((self.debug["evaluations"], cost))
+
+    def visit_node(self, best_cost):
+        self.debug["nodes_visited"] += 1
+        if self.debug["nodes_visited"] % self.progress_every == 0:
+            self.report(best_cost)
+
+    def out_of_budget(self):
+        # checks every stopping rule and remembers which one fired first
+        if self.debug["nodes_visited"] >= self.max_nodes:
+            reason = "max_nodes"
+        elif self.time_budget_s is not None and self.elapsed() >= self.time_budget_s:
+            reason = "time_budget"
+        elif self.patience is not None and self.since_improvement >= self.patience:
+            reason = "patience"
+        else:
+            return False
+        if self.debug["stop_reason"] == "exhausted":
+            self.debug["stop_reason"] = reason
+        return True
+
+    def report(self, best_cost):
+        if self.progress_callback is not None:
+            self.progress_callback(self.elapsed(), self.debug["nodes_visited"], best_cost)
+
+    def state(self):
+        return {"elapsed_s": self.elapsed(), "since_improvement": self.since_improvement}
+
+    def restore(self, state):
+        # carries on the clock and the patience count of a checkpointed run
+        self.started = time.perf_counter() - state["elapsed_s"]
+        self.since_improvement = state["since_improvement"]
+        if self.profile is not None:
+            self.profile.started = self.started
+
+    def finish(self, best_cost, best_metrics):
+        self.debug.update(best_metrics)
+        self.debug["best_cost"] = best_cost
+        self.debug["elapsed_s"] = self.elapsed()
+        self.report(best_cost)
+
+class SearchProfile:
+    """
+    Optional instrumentation for the search engines, pass one in as profile=SearchProfile().
+
+    Records cumulative time and calls per phase ("candidates" for sampling moves, "moves" for applying and
+    undoing them, "compute_metrics", "objective", "copy" for building the best schedule at the end),
+    named counters, and the improvement timeline as (node, seconds, best cost), also as (evaluations, best cost)
+    in evaluation_timeline. Engines only swap in timed
+    versions of their functions when they get a profile, so with profile=None nothing is timed at all.
+    finish() puts the summary in debug["profile"]; to_json() exports it.
+    """
+
+    def __init__(self):
+        self.phases = {}  # phase -> [seconds, calls]
+        self.counters = {}
+        self.timeline = []
+        self.evaluation_timeline = []
+        self.started = time.perf_counter()
+        self.summary = None
+
+    def timed(self, phase, function):
+        """
+        function wrapped so its time and calls add up under phase
+        """
+        totals = self.phases.setdefault(phase, [0.0, 0])
+
+        def timed_function(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                totals[0] += time.perf_counter() - started
+                totals[1] += 1
+
+        return timed_function
+
+    def timed_evaluate(self):
+        """
+        evaluate_schedule, with compute_metrics and objective timed separately
+        """
+        metrics_function = self.timed("compute_metrics", compute_metrics)
+        objective_function = self.timed("objective", objective)
+
+        def evaluate(schedule, teams, weights, debug=None):
+            metrics = metrics_function(schedule, teams, {} if debug is None else debug)
+            return objective_function(metrics, *weights), metrics
+
+        return evaluate
+
+    def timed_moves(self, moves):
+        return _TimedMoves(moves, self)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def finish(self, debug):
+        elapsed = time.perf_counter() - self.started
+        phases = {
+            phase: {"seconds": seconds, "calls": calls, "share": seconds / elapsed if elapsed else 0.0}
+            for phase, (seconds, calls) in self.phases.items()
+        }
+        other = max(elapsed - sum(phase["seconds"] for phase in phases.values()), 0.0)
+        phases["other"] = {"seconds": other, "calls": 0, "share": other / elapsed if elapsed else 0.0}
+
+        considered = self.counters.get("branches_considered", 0)
+        self.summary = {
+            "elapsed_s": elapsed,
+            "nodes_visited": debug["nodes_visited"],
+            "evaluations": debug["evaluations"],
+            "evaluations_per_s": debug["evaluations"] / elapsed if elapsed else 0.0,
+            "phases": phases,
+            "counters": dict(self.counters),
+            "branch_acceptance_rate": self.counters.get("branches_accepted", 0) / considered if considered else None,
+            "timeline": [list(point) for point in self.timeline],
+            "evaluation_timeline": [list(point) for point in self.evaluation_timeline],
+        }
+        debug["profile"] = self.summary
+        return self.summary
+
+    def to_json(self, path=None):
+        text = json.dumps(self.summary, indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+class _TimedMoves:
+    # a move source with sample timed as "candidates" and apply/undo as "moves"
+    def __init__(self, moves, profile):
+        self.moves = moves
+        self.sample = profile.timed("candidates", moves.sample)
+        self.apply = profile.timed("moves", moves.apply)
+        self.undo = profile.timed("moves", moves.undo)
+
+    def __getattr__(self, name):
+        return getattr(self.moves, name)
+
+def _checkpoint_state(rng, budget, schedule, neighborhoods, moves_since_best=(), best_schedule=None, **state):
+    """
+    What every engine saves in a SearchCheckpoint: the schedule it's on (compact, see _saved_schedule) and
+    where the best one is from there (see _BestSchedule.state), the neighborhoods the moves came from,
+    the RNG and budget state and the plain debug values
+    """
+    debug = {key: value for key, value in budget.debug.items() if isinstance(value, (int, float, str, bool))}
+    return {"schedule": schedule, "neighborhoods": neighborhoods, "best_schedule": best_schedule,
+            "moves_since_best": None if moves_since_best is None else list(moves_since_best),
+            "rng": rng.bit_generator.state, "budget": budget.state(), "debug": debug, **state}
+
+def _resume_state(saved, rng, budget):
+    rng.bit_generator.state = saved["rng"]
+    budget.restore(saved["budget"])
+    budget.debug.update(saved["debug"])
+    budget.debug["stop_reason"] = "exhausted"  # the saved run may have stopped on a smaller budget
+    budget.debug["resumed_at_node"] = budget.debug["nodes_visited"]
+
 def optimize_schedule_backtracking(
     schedule, 
     teams, 
@@ -88,7 +397,18 @@ def optimize_schedule_backtracking(
     revenue_weight,
     max_depth=2,
     max_nodes=400,
-    seed=0
+    seed=0,
+    time_budget_s=None,
+    patience=None,
+    progress_callback=None,
+    progress_every=25,
+    transposition_table_size=50000,
+    neighborhoods=None,
+    validate=False,
+    profile=None,
+    archive=None,
+    checkpoint=None,
+    incremental=False,
 ):
     """
     This function is our main optimization of the schedule.
@@ -103,73 +423,587 @@ def optimize_schedule_backtracking(
 
     This will explore the very vast space of possible schedules, and we are trying to find good tradeoffs
     between travel distance, team fatigue, schedule fairness, and TV revenue represented by cost function
+
+    Anytime options, so the run time doesn't depend so much on weights and seeds: time_budget_s, patience
+    and progress_callback (see SearchBudget). Whichever limit hits first, we return the best schedule
+    found so far, and debug["stop_reason"] says why we stopped.
+
+    Different swap orders often lead to the same schedule, so we keep a Zobrist hash of the schedule
+    and a transposition table (up to transposition_table_size schedules, 0 turns it off) of costs we've
+    already computed and how deep we searched below them. Repeated schedules reuse their cost and aren't
+    expanded again unless we can now search deeper below them. debug["tt_hits"]/["tt_misses"] count lookups.
+
+    neighborhoods picks the moves we try (see make_move_source); None keeps the original random swaps.
+    validate=True skips moves that break more schedule rules, debug["rejected_moves"] counts them.
+    profile takes a SearchProfile to time the search phases; it also counts how many branches were within
+    the 5% tolerance and got explored (branches_accepted out of branches_considered).
+    archive takes a pareto.ParetoArchive that gets every schedule we evaluate, so other weights can be
+    answered afterwards without searching again.
+    checkpoint takes a checkpoint.SearchCheckpoint to save the search to disk now and then. The recursion
+    itself can't be saved, so a resumed search carries on from the best schedule the saved one found, with
+    its counters, clock and RNG.
+    incremental=True scores every swap by recomputing only the teams and weeks it touches
+    (see incremental_evaluation) instead of a full compute_metrics every time. It's off by default; with it,
+    the best schedule's cost and metrics are still a full compute_metrics, and so is everything archived.
     """
-    random.seed(seed)
+    weights = (travel_weight, fatigue_weight, sos_weight, revenue_weight)
+    rng = make_rng(seed)  # one generator for the whole search, shared by every node
     debug = dict(base_debug) 
-    debug["nodes_visited"] = 0  # how many schedules we've evaluated
+    budget = SearchBudget(debug, max_nodes, time_budget_s, patience, progress_callback, progress_every, profile)
+    full_evaluate, replay = evaluate_schedule, replay_moves
+    if profile is not None:
+        full_evaluate, replay = profile.timed_evaluate(), profile.timed("copy", replay_moves)
+    evaluate = full_evaluate if archive is None else archive.recording(full_evaluate)
     debug["backtracks"] = 0  # how many times we've undone a swap
+    debug["delta_evaluations"] = 0  # swaps scored without a full compute_metrics
+
+    saved = None
+    if checkpoint is not None:
+        saved = checkpoint.resume("backtracking", schedule, teams, weights, seed=seed, max_depth=max_depth,
+                                  neighborhoods=neighborhoods, validate=validate)
+    start_metrics = None
+    if saved is None:
+        # calculate the cost of the starting schedule which is our baseline
+        best_cost, current_metrics = evaluate(schedule, teams, weights, debug)
+        start_metrics = current_metrics
+    else:
+        # search below the saved best schedule
+        schedule = _restored_schedule(saved["schedule"], schedule, teams)
+        best_cost, current_metrics = saved["best_cost"], saved["best_metrics"]
+        _resume_state(saved, rng, budget)
 
-    # calculate the cost of the starting schedule which is our baseline
-    current_metrics = compute_metrics(schedule, teams, debug)
-    best_cost = objective(current_metrics, travel_weight, fatigue_weight, 
-                         sos_weight, revenue_weight)
-    best_schedule = {week: list(games) for week, games in schedule.items()}
-    best_metrics = dict(current_metrics)
+    hasher, table = None, None
+    if transposition_table_size:
+        hasher = ZobristHasher(teams, schedule.weeks.tolist() if isinstance(schedule, CompactSchedule) else schedule)
+        hasher.hash_schedule(schedule)
+        table = TranspositionTable(transposition_table_size)
+        table.put(hasher.value, best_cost, max_depth)
+    best_metrics = current_metrics
+    mover = make_move_source(schedule, teams, neighborhoods, validate)
+    if saved is not None and validate:
+        mover.rejected = saved["rejected"]
+    if incremental:
+        evaluate, mover = incremental_evaluation(schedule, teams, mover, debug, full_evaluate, start_metrics, profile)
+        if archive is not None:
+            evaluate = archive.recording(evaluate, full_evaluate)
+    if profile is not None:
+        mover = profile.timed_moves(mover)
+
+    def save_checkpoint(best_cost, best_path, best_metrics):
+        # the checkpoint only needs the best schedule: from wherever we are, back up `path` and down best_path
+        best_schedule = _copy_schedule(schedule)
+        walker = make_move_source(best_schedule, teams, neighborhoods)
+        for move in reversed(path):
+            walker.undo(move)
+        for move in best_path:
+            walker.apply(move)
+        checkpoint.save(_checkpoint_state(rng, budget, _saved_schedule(best_schedule, teams), neighborhoods,
+                                          best_cost=best_cost,
+                                          best_metrics=best_metrics, rejected=mover.rejected if validate else 0))
+
+    # Instead of copying the whole schedule on every improvement, we remember the swaps that lead from the
+    # starting schedule to the best one. Every swap is undone on the way back up, so when the search ends
+    # `schedule` is the starting schedule again and we build the best one from it just once.
+    path = []  # swaps applied to get from the start to the schedule we're looking at
+    best_path = ()
     
-    def explore_swaps(current_depth, best_cost, best_schedule, best_metrics):
+    def explore_swaps(current_depth, best_cost, best_path, best_metrics, current_cost, current_metrics):
         """
         Recursive function that explores different game swaps 
         """
-        debug["nodes_visited"] += 1
+        budget.visit_node(best_cost)
+        if checkpoint is not None and checkpoint.due(debug["nodes_visited"]):
+            save_checkpoint(best_cost, best_path, best_metrics)
         
-        # we want to stop if we've evaluated too many schedules bc of computational limits
-        if debug["nodes_visited"] >= max_nodes:
-            return best_cost, best_schedule, best_metrics
+        # we want to stop if we've evaluated too many schedules or ran out of time bc of computational limits
+        if budget.out_of_budget():
+            return best_cost, best_path, best_metrics
 
         if current_depth >= max_depth:
-            return best_cost, best_schedule, best_metrics
+            return best_cost, best_path, best_metrics
         
-        swap_options = generate_swap_candidates(
-            schedule, 
-            max_pairs=20, 
-            seed=current_depth + debug["nodes_visited"]
-        )
+        swap_options = mover.sample(20, rng)
+
+        parent_cost, parent_metrics = current_cost, current_metrics
 
         #try swap
-        for week1, index1, week2, index2 in swap_options:
+        for move in swap_options:
             # make the swap
-            swap_games(schedule, week1, index1, week2, index2)
+            mover.apply(move, hasher)
+            path.append(move)
+            seen = table.get(hasher.value) if table is not None else None
             
             #evaluate this new schedule
-            temp_debug = {}
-            temp_metrics = compute_metrics(schedule, teams, temp_debug)
-            current_cost = objective(temp_metrics, travel_weight, fatigue_weight, 
-                                    sos_weight, revenue_weight)
+            # a schedule we've already scored keeps its cost; it can't be an improvement since best_cost
+            # only went down since then, so we don't need its metrics
+            if seen is not None:
+                temp_metrics = None
+                current_cost = seen[0]
+            # a swap inside the same week leaves every week with the same games, so no team's
+            # sequence changes and the metrics are exactly the ones we already have
+            elif _same_week_swap(move):
+                temp_metrics = parent_metrics
+                current_cost = parent_cost
+                debug["delta_evaluations"] += 1
+            else:
+                current_cost, temp_metrics = evaluate(schedule, teams, weights)
+
+            if seen is None and table is not None:
+                table.put(hasher.value, current_cost, -1)
 
             found_improvement = current_cost < best_cost
+            budget.record_evaluation(found_improvement, current_cost)
             if found_improvement:
                 best_cost = current_cost
-                best_schedule = {week: list(games) for week, games in schedule.items()}
-                best_metrics = dict(temp_metrics)
+                best_path = tuple(path)
+                best_metrics = temp_metrics
 
             # decide whether to explore deeper from this swap
             # we explore if we found an improvement OR if the cost is within 5% of best
             # the 5% tolerance lets us explore "nearly as good" branches that might lead somewhere, I played around with threshold a bit
-            if found_improvement or current_cost <= best_cost * 1.05:
-                best_cost, best_schedule, best_metrics = explore_swaps(
-                    current_depth + 1, best_cost, best_schedule, best_metrics
-                )
+            # (unless we already searched at least as deep below this exact schedule)
+            levels_below = max_depth - current_depth - 1
+            within_tolerance = found_improvement or current_cost <= best_cost * 1.05
+            if profile is not None:
+                profile.count("branches_considered")
+                profile.count("branches_accepted", within_tolerance)
+            if within_tolerance:
+                if seen is None or seen[1] < levels_below:
+                    best_cost, best_path, best_metrics = explore_swaps(
+                        current_depth + 1, best_cost, best_path, best_metrics,
+                        current_cost, temp_metrics
+                    )
+                    # a subtree the budget cut short wasn't searched to levels_below, so it only counts as evaluated
+                    if table is not None:
+                        table.put(hasher.value, current_cost, -1 if budget.out_of_budget() else levels_below)
 
-            swap_games(schedule, week1, index1, week2, index2)
+            mover.undo(move, hasher)
+            path.pop()
             debug["backtracks"] += 1
             
-            if debug["nodes_visited"] >= max_nodes:
+            if budget.out_of_budget():
                 break
         
-        return best_cost, best_schedule, best_metrics
+        return best_cost, best_path, best_metrics
+
+    try:
+        best_cost, best_path, best_metrics = explore_swaps(
+            0, best_cost, best_path, best_metrics, best_cost, best_metrics
+        )
+    finally:
+        # if the search was interrupted (KeyboardInterrupt, a failing callback...) put the schedule back as it was
+        while path:
+            mover.undo(path.pop(), hasher)
+    best_schedule = replay(schedule, best_path, teams, neighborhoods)
+    if incremental:
+        # incremental metrics are only checked now and then, what we return is always a full compute_metrics
+        best_cost, best_metrics = full_evaluate(best_schedule, teams, weights)
+    budget.finish(best_cost, best_metrics)
+    debug["rejected_moves"] = mover.rejected if validate else 0
+    debug["tt_hits"] = table.hits if table is not None else 0
+    debug["tt_misses"] = table.misses if table is not None else 0
+    if checkpoint is not None:
+        save_checkpoint(best_cost, best_path, best_metrics)
+        debug["checkpoints_saved"] = checkpoint.saves
+    debug["best_path_length"] = len(best_path)
+    if profile is not None:
+        profile.finish(debug)
+
+    return best_schedule, debug
+
+def _copy_schedule(schedule):
+    if isinstance(schedule, CompactSchedule):
+        return schedule.copy()
+    return {week: list(games) for week, games in schedule.items()}
+
+def replay_moves(schedule, moves, teams=None, neighborhoods=None):
+    """
+    Returns a copy of the schedule with the moves applied in order, leaving the input as it is.
+    teams and neighborhoods have to match the move source the moves came from.
+    """
+    schedule = _copy_schedule(schedule)
+    mover = make_move_source(schedule, teams, neighborhoods)
+    for move in moves:
+        mover.apply(move)
+    return schedule
+
+def replay_swaps(schedule, swaps):
+    """
+    Returns a copy of the schedule with the swaps applied in order, leaving the input as it is
+    """
+    return replay_moves(schedule, swaps)
+
+def _saved_schedule(schedule, teams):
+    # what goes in a checkpoint: always the compact form, and never the schedule the search keeps changing
+    return schedule.copy() if isinstance(schedule, CompactSchedule) else encode_schedule(schedule, teams)
+
+def _restored_schedule(saved, like, teams):
+    # a saved schedule back in the form of `like`, the schedule the engine was given
+    return saved.copy() if isinstance(like, CompactSchedule) else decode_schedule(saved, teams)
+
+class _BestSchedule:
+    """
+    The best schedule of a walk (annealing, tabu) without copying the schedule on every improvement.
+
+    When we find a new best we're standing on it, so we only log the moves we make after that and get the
+    best back by undoing them from wherever we end up. If the walk goes MOVE_LOG_LIMIT moves without an
+    improvement we copy the best out once and stop logging until the next one, so memory stays flat however
+    long the walk is.
+    """
+
+    def __init__(self, schedule, teams, neighborhoods):
+        self.schedule = schedule  # the one the walk is changing
+        self.teams = teams
+        self.neighborhoods = neighborhoods
+        self.log = []          # moves since the best, None while snapshot holds it
+        self.snapshot = None
+
+    def improved(self):
+        self.log, self.snapshot = [], None
+
+    def moved(self, move):
+        if self.log is None:
+            return
+        self.log.append(move)
+        if len(self.log) >= MOVE_LOG_LIMIT:
+            self.snapshot = self.materialize()
+            self.log = None
+
+    def materialize(self):
+        """
+        A copy of the best schedule
+        """
+        if self.log is None:
+            return _copy_schedule(self.snapshot)
+        best = _copy_schedule(self.schedule)
+        mover = make_move_source(best, self.teams, self.neighborhoods)
+        for move in reversed(self.log):
+            mover.undo(move)
+        return best
+
+    def state(self):
+        return {
+            "moves_since_best": None if self.log is None else list(self.log),
+            "best_schedule": None if self.snapshot is None else _saved_schedule(self.snapshot, self.teams),
+        }
+
+    def restore(self, state):
+        self.log = None if state["moves_since_best"] is None else list(state["moves_since_best"])
+        self.snapshot = None
+        if state["best_schedule"] is not None:
+            self.snapshot = _restored_schedule(state["best_schedule"], self.schedule, self.teams)
+
+def optimize_schedule_annealing(
+    schedule,
+    teams,
+    base_debug,
+    travel_weight,
+    fatigue_weight,
+    sos_weight,
+    revenue_weight,
+    max_nodes=400,
+    seed=0,
+    initial_temperature=0.01,
+    final_temperature=0.00001,
+    time_budget_s=None,
+    patience=None,
+    progress_callback=None,
+    progress_every=25,
+    neighborhoods=None,
+    validate=False,
+    profile=None,
+    archive=None,
+    checkpoint=None,
+    incremental=False,
+):
+    """
+    Simulated annealing over the same swap moves and objective as the backtracking search.
+
+    Every step tries one random swap. Better schedules are always kept, worse ones are kept with
+    probability exp(-relative cost increase / temperature), so early on we can climb out of local minima
+    that backtracking gets stuck in. Temperatures are fractions of the starting cost (so they work for any
+    weights) and cool geometrically from initial_temperature to final_temperature over the node budget,
+    or over the time budget if that runs out first. One node is one evaluated swap.
+    neighborhoods, validate, profile, archive and incremental work like in optimize_schedule_backtracking.
+    With a checkpoint (a checkpoint.SearchCheckpoint), a resumed run picks up exactly where the saved one was,
+    so it ends with the same schedule as a run that was never stopped (unless a time budget is involved).
+
+    The input schedule isn't changed. Returns (best_schedule, debug) like optimize_schedule_backtracking.
+    """
+    weights = (travel_weight, fatigue_weight, sos_weight, revenue_weight)
+    rng = make_rng(seed)
+    debug = dict(base_debug)
+    budget = SearchBudget(debug, max_nodes, time_budget_s, patience, progress_callback, progress_every, profile)
+    full_evaluate = evaluate_schedule if profile is None else profile.timed_evaluate()
+    evaluate = full_evaluate if archive is None else archive.recording(full_evaluate)
+    debug["accepted_moves"] = 0
+    saved = None
+    if checkpoint is not None:
+        saved = checkpoint.resume("annealing", schedule, teams, weights, seed=seed, neighborhoods=neighborhoods,
+                                  validate=validate, initial_temperature=initial_temperature,
+                                  final_temperature=final_temperature)
+
+    # we walk on a copy; improvements don't copy anything, we build the best schedule once at the end
+    # (see _BestSchedule)
+    schedule = _copy_schedule(schedule)
+    if saved is not None:
+        schedule = _restored_schedule(saved["schedule"], schedule, teams)
+    best = _BestSchedule(schedule, teams, neighborhoods)
+    if saved is not None:
+        best.restore(saved)
+    mover = make_move_source(schedule, teams, neighborhoods, validate)
+    if saved is not None and validate:
+        mover.rejected = saved["rejected"]
+    start_metrics = None
+    if saved is None:
+        current_cost, current_metrics = evaluate(schedule, teams, weights, debug)
+        start_metrics = current_metrics
+        best_cost, best_metrics = current_cost, current_metrics
+        cost_scale = abs(current_cost) or 1.0
+    else:
+        current_cost, current_metrics = saved["current_cost"], saved["current_metrics"]
+        best_cost, best_metrics = saved["best_cost"], saved["best_metrics"]
+        cost_scale = saved["cost_scale"]
+        _resume_state(saved, rng, budget)
+    if incremental:
+        evaluate, mover = incremental_evaluation(schedule, teams, mover, debug, full_evaluate, start_metrics, profile)
+        if archive is not None:
+            evaluate = archive.recording(evaluate, full_evaluate)
+    if profile is not None:
+        mover = profile.timed_moves(mover)
+
+    def save_checkpoint():
+        checkpoint.save(_checkpoint_state(
+            rng, budget, _saved_schedule(schedule, teams), neighborhoods, **best.state(), current_cost=current_cost,
+            current_metrics=current_metrics, best_cost=best_cost, best_metrics=best_metrics, cost_scale=cost_scale,
+            rejected=mover.rejected if validate else 0,
+        ))
 
-    best_cost, best_schedule, best_metrics = explore_swaps(0, best_cost, best_schedule, best_metrics)
-    debug.update(best_metrics)
-    debug["best_cost"] = best_cost
+    cooling = final_temperature / initial_temperature
 
-    return best_schedule, debug
\ No newline at end of file
+    while not budget.out_of_budget():
+        if checkpoint is not None and checkpoint.due(debug["nodes_visited"]):
+            save_checkpoint()
+        budget.visit_node(best_cost)
+        swap_options = mover.sample(1, rng)
+        if not swap_options:
+            continue
+        move = swap_options[0]
+
+        mover.apply(move)
+        if _same_week_swap(move):
+            # same games every week, same metrics (see optimize_schedule_backtracking)
+            cost, metrics = current_cost, current_metrics
+        else:
+            cost, metrics = evaluate(schedule, teams, weights)
+
+        found_improvement = cost < best_cost
+        budget.record_evaluation(found_improvement, cost)
+
+        # how far through the search we are, by nodes or by time, whichever is further along
+        done = debug["nodes_visited"] / max_nodes
+        if time_budget_s:
+            done = max(done, budget.elapsed() / time_budget_s)
+        temperature = initial_temperature * cooling ** min(done, 1.0)
+
+        increase = (cost - current_cost) / cost_scale
+        if increase <= 0 or rng.random() < math.exp(-increase / temperature):
+            current_cost, current_metrics = cost, metrics
+            best.moved(move)
+            debug["accepted_moves"] += 1
+        else:
+            mover.undo(move)
+
+        if found_improvement:
+            best_cost, best_metrics = cost, metrics
+            best.improved()
+
+    best_schedule = best.materialize() if profile is None else profile.timed("copy", best.materialize)()
+    if incremental:
+        # same as optimize_schedule_backtracking, the result is always a full compute_metrics
+        best_cost, best_metrics = full_evaluate(best_schedule, teams, weights)
+    budget.finish(best_cost, best_metrics)
+    debug["rejected_moves"] = mover.rejected if validate else 0
+    if checkpoint is not None:
+        save_checkpoint()
+        debug["checkpoints_saved"] = checkpoint.saves
+    if profile is not None:
+        profile.finish(debug)
+    return best_schedule, debug
+
+def optimize_schedule_tabu(
+    schedule,
+    teams,
+    base_debug,
+    travel_weight,
+    fatigue_weight,
+    sos_weight,
+    revenue_weight,
+    max_nodes=400,
+    seed=0,
+    tabu_tenure=30,
+    candidates_per_step=20,
+    time_budget_s=None,
+    patience=None,
+    progress_callback=None,
+    progress_every=25,
+    neighborhoods=None,
+    validate=False,
+    profile=None,
+    archive=None,
+    checkpoint=None,
+    incremental=False,
+):
+    """
+    Tabu search over the same swap moves and objective as the backtracking search.
+
+    Every step evaluates candidates_per_step random swaps and makes the best one, even if it's worse
+    than where we are, which is how we walk out of local minima. The pair of games we just swapped goes on
+    a tabu list for tabu_tenure steps so we don't swap them straight back and loop around the same
+    schedules; a tabu swap is still allowed if it beats the best cost so far. One node is one evaluated swap.
+    neighborhoods, validate, profile, archive, checkpoint and incremental work like in
+    optimize_schedule_annealing.
+
+    The input schedule isn't changed. Returns (best_schedule, debug) like optimize_schedule_backtracking.
+    """
+    weights = (travel_weight, fatigue_weight, sos_weight, revenue_weight)
+    rng = make_rng(seed)
+    debug = dict(base_debug)
+    budget = SearchBudget(debug, max_nodes, time_budget_s, patience, progress_callback, progress_every, profile)
+    full_evaluate = evaluate_schedule if profile is None else profile.timed_evaluate()
+    evaluate = full_evaluate if archive is None else archive.recording(full_evaluate)
+    debug["tabu_skips"] = 0
+    tabu_list = deque(maxlen=tabu_tenure)
+    saved = None
+    if checkpoint is not None:
+        saved = checkpoint.resume("tabu", schedule, teams, weights, seed=seed, neighborhoods=neighborhoods,
+                                  validate=validate, tabu_tenure=tabu_tenure, candidates_per_step=candidates_per_step)
+
+    # same walk on a copy as optimize_schedule_annealing
+    schedule = _copy_schedule(schedule)
+    if saved is not None:
+        schedule = _restored_schedule(saved["schedule"], schedule, teams)
+    best = _BestSchedule(schedule, teams, neighborhoods)
+    if saved is not None:
+        best.restore(saved)
+    mover = make_move_source(schedule, teams, neighborhoods, validate)
+    if saved is not None and validate:
+        mover.rejected = saved["rejected"]
+    start_metrics = None
+    if saved is None:
+        current_cost, current_metrics = evaluate(schedule, teams, weights, debug)
+        start_metrics = current_metrics
+        best_cost, best_metrics = current_cost, current_metrics
+    else:
+        current_cost, current_metrics = saved["current_cost"], saved["current_metrics"]
+        best_cost, best_metrics = saved["best_cost"], saved["best_metrics"]
+        tabu_list.extend(saved["tabu_list"])
+        _resume_state(saved, rng, budget)
+    if incremental:
+        evaluate, mover = incremental_evaluation(schedule, teams, mover, debug, full_evaluate, start_metrics, profile)
+        if archive is not None:
+            evaluate = archive.recording(evaluate, full_evaluate)
+    if profile is not None:
+        mover = profile.timed_moves(mover)
+
+    def save_checkpoint():
+        checkpoint.save(_checkpoint_state(
+            rng, budget, _saved_schedule(schedule, teams), neighborhoods, **best.state(), current_cost=current_cost,
+            current_metrics=current_metrics, best_cost=best_cost, best_metrics=best_metrics,
+            tabu_list=list(tabu_list), rejected=mover.rejected if validate else 0,
+        ))
+
+    while not budget.out_of_budget():
+        if checkpoint is not None and checkpoint.due(debug["nodes_visited"]):
+            save_checkpoint()
+        step_best = None
+        candidates = mover.sample(candidates_per_step, rng)
+        if not candidates:
+            # nothing to try (validate can reject every candidate), still counts as a node so we can't spin forever
+            budget.visit_node(best_cost)
+            continue
+        for move in candidates:
+            budget.visit_node(best_cost)
+            pair = _tabu_key(schedule, move)
+
+            mover.apply(move)
+            if _same_week_swap(move):
+                cost, metrics = current_cost, current_metrics
+            else:
+                cost, metrics = evaluate(schedule, teams, weights)
+            mover.undo(move)
+            budget.record_evaluation(cost < best_cost, cost)
+
+            if pair in tabu_list and not cost < best_cost:
+                debug["tabu_skips"] += 1
+            elif step_best is None or cost < step_best[0]:
+                step_best = (cost, metrics, move, pair)
+
+            if budget.out_of_budget():
+                break
+
+        if step_best is None:
+            continue
+
+        cost, metrics, move, pair = step_best
+        mover.apply(move)
+        best.moved(move)
+        tabu_list.append(pair)
+        current_cost, current_metrics = cost, metrics
+        if cost < best_cost:
+            best_cost, best_metrics = cost, metrics
+            best.improved()
+
+    best_schedule = best.materialize() if profile is None else profile.timed("copy", best.materialize)()
+    if incremental:
+        # same as optimize_schedule_backtracking, the result is always a full compute_metrics
+        best_cost, best_metrics = full_evaluate(best_schedule, teams, weights)
+    budget.finish(best_cost, best_metrics)
+    debug["rejected_moves"] = mover.rejected if validate else 0
+    if checkpoint is not None:
+        save_checkpoint()
+        debug["checkpoints_saved"] = checkpoint.saves
+    if profile is not None:
+        profile.finish(debug)
+    return best_schedule, debug
+
+def _game_pair_key(schedule, week1, index1, week2, index2):
+    # which two games a swap moves, by teams, so the same two games count as the same swap wherever they sit
+    game1, game2 = schedule[week1][index1], schedule[week2][index2]
+    return frozenset([(game1.home.name, game1.away.name), (game2.home.name, game2.away.name)])
+
+def _tabu_key(schedule, move):
+    if not isinstance(move, Move):
+        return _game_pair_key(schedule, *move)
+    # for the other neighborhoods: the kind of move and the matchups it touches, home/away ignored
+    # so flipping a game straight back is tabu too
+    positions = [(move.week1, move.index1)]
+    if move.index2 != -1:
+        positions.append((move.week2, move.index2))
+    matchups = frozenset(
+        frozenset((schedule[week][index].home.name, schedule[week][index].away.name)) for week, index in positions
+    )
+    return move.kind, matchups
+
+# Every search engine takes (schedule, teams, base_debug, the 4 weights, ...) and returns (best_schedule, debug),
+# and they all share make_move_source for moves (neighborhoods=None is the original random swaps)
+# and evaluate_schedule for the objective
+SEARCH_ENGINES = {
+    "backtracking": optimize_schedule_backtracking,
+    "annealing": optimize_schedule_annealing,
+    "tabu": optimize_schedule_tabu,
+}
+
+def register_search_engine(name, engine):
+    SEARCH_ENGINES[name] = engine
+
+def optimize_schedule(engine, schedule, teams, base_debug, travel_weight, fatigue_weight, sos_weight,
+                      revenue_weight, **options):
+    """
+    Runs the search engine registered under `engine`; options go straight to it (max_nodes, seed, ...)
+    """
+    if engine not in SEARCH_ENGINES:
+        raise ValueError(f"Unknown search engine {engine!r}, pick one of {sorted(SEARCH_ENGINES)}")
+    return SEARCH_ENGINES[engine](
+        schedule, teams, base_debug, travel_weight, fatigue_weight, sos_weight, revenue_weight, **options
+    )
@@ -0,0 +1,110 @@
+import numpy as np
+
+from schedule_core import objective
+from compact_schedule import encode_schedule, decode_schedule
+from league_index import get_league_index
+
+# The four metrics objective() combines, and whether smaller is better for each
+PARETO_METRICS = ("total_travel", "fatigue_penalty", "sos_variance", "revenue_score")
+MINIMIZE = np.array([True, True, True, False])
+
+
+class ParetoArchive:
+    """
+    The non-dominated schedules seen during a search on the four objective metrics.
+
+    objective() is a weighted sum of those metrics with positive weights, so for any weights the best
+    schedule the search saw is in the archive (unless it was dropped for space). best(weights) re-scores the archived metrics with
+    objective() instead of searching again, which is instant for a few hundred schedules.
+
+    Schedules are kept as CompactSchedules, copied only when they get into the archive. When there are more
+    than max_size, the most crowded ones go first (smallest gap to their neighbours on the front), so the
+    ends of the front and the sparse parts of it stay.
+    """
+
+    def __init__(self, teams, max_size=200):
+        self.teams = get_league_index(teams).teams
+        self.max_size = max_size
+        self.points = np.empty((0, len(PARETO_METRICS)))  # metrics turned into "smaller is better"
+        self.metrics = []
+        self.schedules = []
+        self.offered = 0
+
+    def offer(self, metrics, schedule):
+        """
+        Adds the schedule if no archived schedule dominates it, dropping the ones it dominates.
+        Returns whether it was added.
+        """
+        self.offered += 1
+        point = self._point(metrics)
+        if len(self.points):
+            if self._dominated(point):
+                return False
+            # anything left that's no better than the new one anywhere is dominated by it
+            keep = ~(point <= self.points).all(axis=1)
+            if not keep.all():
+                self._keep(keep)
+
+        self.points = np.vstack([self.points, point])
+        self.metrics.append(dict(metrics))
+        self.schedules.append(encode_schedule(schedule, self.teams))
+        if len(self.metrics) > self.max_size:
+            self._keep(np.arange(len(self.metrics)) != np.argmin(self._crowding()))
+        return True
+
+    def recording(self, evaluate, full_evaluate=None):
+        """
+        evaluate(schedule, teams, weights, debug=None) that also offers every schedule it scores to the
+        archive, for the engines' archive option. With full_evaluate (when evaluate is the engines'
+        incremental evaluation), a schedule that could get in is scored again with full_evaluate and those
+        metrics are what the archive keeps.
+        """
+        def evaluate_and_record(schedule, teams, weights, debug=None):
+            cost, metrics = evaluate(schedule, teams, weights, debug)
+            if full_evaluate is None:
+                self.offer(metrics, schedule)
+            elif not self._dominated(self._point(metrics)):
+                self.offer(full_evaluate(schedule, teams, weights)[1], schedule)
+            else:
+                self.offered += 1
+            return cost, metrics
+        return evaluate_and_record
+
+    def scores(self, travel_weight, fatigue_weight, sos_weight, revenue_weight):
+        weights = (travel_weight, fatigue_weight, sos_weight, revenue_weight)
+        return np.array([objective(metrics, *weights) for metrics in self.metrics])
+
+    def best(self, travel_weight, fatigue_weight, sos_weight, revenue_weight):
+        """
+        (cost, metrics, schedule) of the archived schedule with the lowest objective for these weights
+        """
+        scores = self.scores(travel_weight, fatigue_weight, sos_weight, revenue_weight)
+        index = int(np.argmin(scores))
+        return scores[index], self.metrics[index], decode_schedule(self.schedules[index], self.teams)
+
+    def __len__(self):
+        return len(self.metrics)
+
+    def _point(self, metrics):
+        return np.where(MINIMIZE, 1, -1) * np.array([metrics[name] for name in PARETO_METRICS])
+
+    def _dominated(self, point):
+        # an archived schedule at least as good on every metric (or the same metrics again) wins
+        return len(self.points) > 0 and (self.points <= point).all(axis=1).any()
+
+    def _keep(self, mask):
+        self.points = self.points[mask]
+        self.metrics = [metrics for metrics, kept in zip(self.metrics, mask) if kept]
+        self.schedules = [schedule for schedule, kept in zip(self.schedules, mask) if kept]
+
+    def _crowding(self):
+        # NSGA-II crowding distance: per metric, the normalized gap between each point's two neighbours
+        count = len(self.points)
+        distance = np.zeros(count)
+        for column in self.points.T:
+            order = np.argsort(column)
+            spread = column[order[-1]] - column[order[0]]
+            distance[order[[0, -1]]] = np.inf
+            if spread > 0:
+                distance[order[1:-1]] += (column[order[2:]] - column[order[:-2]]) / spread
+        return distance
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from compact_schedule import CompactSchedule, encode_schedule, decode_schedule, schedule_digest
+from league_index import get_league_index
+from optimizer import optimize_schedule
+
+DEFAULT_STORE_PATH = os.environ.get("SCHEDULE_RESULT_STORE", "schedule_results.sqlite")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# a hit only writes its last_used back when it's older than this, so most reads don't need the write lock
+LAST_USED_RESOLUTION_S = 60.0
+
+# bump when the search changes in a way that makes old results wrong, so they stop matching
+STORE_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    games BLOB NOT NULL,
+    weeks BLOB NOT NULL,
+    debug TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+
+def result_key(league_fingerprint, **params):
+    """
+    Content address of an optimizer result: SHA-256 of the league fingerprint, STORE_VERSION and every
+    parameter that changes the result (weights, seeds, limits, engine options...), in a fixed order.
+    Parameters have to be JSON values.
+    """
+    parts = {"league": league_fingerprint, "version": STORE_VERSION, "params": params}
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+class ResultStore:
+    """
+    Optimized schedules and their debug dicts in a SQLite file, shared by every process on the machine.
+
+    The database runs in WAL mode, so readers never block each other or the writer. Every put is a
+    single transaction, so a result is either all there or not at all. Schedules are stored as the
+    CompactSchedule arrays. When the stored results add up to more than max_bytes, the least recently
+    used ones are dropped. last_used is only as precise as LAST_USED_RESOLUTION_S, which is plenty to tell
+    what's been used lately and means repeated hits stay reads.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH, max_bytes=DEFAULT_MAX_BYTES, timeout=30.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+
+    def _connect(self):
+        # a connection per call, so one store can be used from Streamlit's script threads and from workers
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return _Closing(conn)
+
+    def get(self, key, teams):
+        """
+        (schedule, debug) stored under key as a dict schedule for teams, or None
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT fingerprint, games, weeks, debug, last_used FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[4] > LAST_USED_RESOLUTION_S:
+                conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (now, key))
+
+        fingerprint, games, weeks, debug, _ = row
+        weeks = np.frombuffer(weeks, dtype=np.int16)
+        compact = CompactSchedule(
+            np.frombuffer(games, dtype=np.int16).reshape(len(weeks), -1, 3).copy(), weeks.copy(), fingerprint
+        )
+        return decode_schedule(compact, teams), json.loads(debug)
+
+    def put(self, key, schedule, debug, teams):
+        compact = schedule if isinstance(schedule, CompactSchedule) else encode_schedule(schedule, teams)
+        games = compact.games.astype(np.int16).tobytes()
+        weeks = compact.weeks.astype(np.int16).tobytes()
+        # debug can hold anything the schedule generator put there, only keep what comes back from JSON as it was
+        debug_json = json.dumps(_plain_values(debug))
+        size = len(games) + len(weeks) + len(debug_json)
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, compact.fingerprint, games, weeks, debug_json, size, now, now),
+                )
+                self._evict(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # oldest first until we're back under the cap
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY last_used").fetchall():
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def get_or_compute(self, key, teams, compute):
+        """
+        The stored result for key, or compute() -> (schedule, debug), which is then stored.
+        Two processes asking for the same new key at once may both compute it; the last one to finish wins.
+        """
+        stored = self.get(key, teams)
+        if stored is not None:
+            return stored
+        schedule, debug = compute()
+        self.put(key, schedule, debug, teams)
+        return schedule, debug
+
+    def stats(self):
+        with self._connect() as conn:
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {"results": count, "bytes": total, "max_bytes": self.max_bytes}
+
+
+def _plain_values(debug):
+    # str-keyed dicts are filtered all the way down, lists are kept only if everything in them is plain
+    plain = {}
+    for key, value in debug.items():
+        if not isinstance(key, str):
+            continue
+        if isinstance(value, dict):
+            plain[key] = _plain_values(value)
+        elif _is_plain(value):
+            plain[key] = value
+    return plain
+
+
+def _is_plain(value):
+    if value is None or isinstance(value, (int, float, str)):
+        return True
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and _is_plain(item) for key, item in value.items())
+    if isinstance(value, list):
+        return all(_is_plain(item) for item in value)
+    return False
+
+
+class _Closing:
+    # sqlite3's own context manager only ends the transaction, this also closes the connection
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, *exc):
+        self.conn.close()
+
+
+def optimize_with_store(store, engine, schedule, teams, base_debug, travel_weight, fatigue_weight, sos_weight,
+                        revenue_weight, **options):
+    """
+    optimizer.optimize_schedule, but the result is looked up in store first, keyed by the league, the
+    starting schedule itself, the weights, the engine and its options. Options that aren't plain values
+    (progress callbacks) and None options (same as leaving them out) don't go in the key. Some runs skip
+    the store: with a profile, since they're about timing; with a time budget, since they stop wherever the
+    clock says and can't be repeated; with an archive, which only fills up when the engine runs; and
+    checkpointed runs, which may carry on from an earlier run.
+    """
+    def compute():
+        return optimize_schedule(engine, schedule, teams, base_debug, travel_weight, fatigue_weight,
+                                 sos_weight, revenue_weight, **options)
+
+    if any(options.get(name) is not None for name in ("profile", "checkpoint", "archive", "time_budget_s")):
+        return compute()
+
+    key = result_key(
+        get_league_index(teams).fingerprint,
+        engine=engine,
+        schedule=schedule_digest(schedule, teams),
+        weights=[travel_weight, fatigue_weight, sos_weight, revenue_weight],
+        options={name: value for name, value in options.items()
+                 if isinstance(value, (int, float, str, bool, list, tuple))},
+    )
+    return store.get_or_compute(key, teams, compute)
@@ -0,0 +1,20 @@
+import numpy as np
+
+# Every random draw in the app goes through generators made here, instead of reseeding the global
+# random module. Philox is counter-based, so streams are cheap to create and never share state,
+# which keeps simulations reproducible and safe to run in threads.
+
+def make_rng(seed=None):
+    """
+    Returns a new generator for an int seed, a SeedSequence, or None for fresh OS entropy
+    """
+    return np.random.Generator(np.random.Philox(seed))
+
+
+def stream_rng(seed, *key):
+    """
+    Returns the generator for one branch of the seed's spawn tree, e.g. stream_rng(seed, season)
+    for a simulated season. The same (seed, key) always gives the same stream, and different keys
+    give independent streams.
+    """
+    return make_rng(np.random.SeedSequence(seed, spawn_key=key))
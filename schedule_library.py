@@ -0,0 +1,164 @@
+"""
+A file of many schedules that can be memory-mapped, so one schedule (or just the metrics of all of them)
+can be read without parsing the whole file or building Team/ScheduledGame objects.
+
+Layout:
+    MAGIC (8 bytes), header length (uint32, little endian), JSON header padded to a multiple of 64 bytes,
+    then fixed-size records back to back.
+
+The header has the league fingerprint, the week numbers, the games per week and the metric names.
+Each record is one schedule: its CompactSchedule games array (int16, weeks x games per week x 3) followed
+by its metrics (float64, in header order). Records are only ever appended and the number of records comes
+from the file size, so a reader that opens the file while a record is being written just doesn't see
+that record yet.
+"""
+import json
+import os
+import struct
+
+import numpy as np
+
+from compact_schedule import CompactSchedule, EMPTY, encode_schedule, decode_schedule
+
+MAGIC = b"NFLSCHED"
+FORMAT_VERSION = 1
+HEADER_ALIGN = 64
+
+# metrics kept for every schedule, NaN when a schedule doesn't have one
+LIBRARY_METRICS = ("best_cost", "total_travel", "travel_time_hours", "fatigue_penalty", "sos_variance",
+                   "revenue_score")
+
+DEFAULT_LIBRARY_PATH = os.environ.get("SCHEDULE_LIBRARY", "schedule_library.nflsched")
+
+
+def _record_dtype(num_weeks, games_per_week, num_metrics):
+    return np.dtype([
+        ("games", "<i2", (num_weeks, games_per_week, 3)),
+        ("metrics", "<f8", (num_metrics,)),
+    ])
+
+
+def create_library(path, fingerprint, weeks, games_per_week=16, metric_names=LIBRARY_METRICS):
+    """
+    Writes an empty library for schedules of this league and these weeks
+    """
+    header = {
+        "version": FORMAT_VERSION,
+        "fingerprint": fingerprint,
+        "weeks": [int(week) for week in weeks],
+        "games_per_week": games_per_week,
+        "metrics": list(metric_names),
+    }
+    text = json.dumps(header).encode()
+    used = len(MAGIC) + 4 + len(text)
+    text += b" " * (-used % HEADER_ALIGN)
+    with open(path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(text)) + text)
+
+
+class ScheduleLibrary:
+    """
+    Reads (and appends to) a library file. records is a read-only memmap of the structured records,
+    so metrics_table() and compact(i) only touch the pages they need.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a schedule library")
+            (header_length,) = struct.unpack("<I", f.read(4))
+            self.header = json.loads(f.read(header_length))
+        if self.header["version"] != FORMAT_VERSION:
+            raise ValueError(f"{path} is version {self.header['version']}, this code reads {FORMAT_VERSION}")
+
+        self.fingerprint = self.header["fingerprint"]
+        self.weeks = np.array(self.header["weeks"], dtype=np.int16)
+        self.metric_names = tuple(self.header["metrics"])
+        self.dtype = _record_dtype(len(self.weeks), self.header["games_per_week"], len(self.metric_names))
+        self.offset = len(MAGIC) + 4 + header_length
+        self.refresh()
+
+    def refresh(self):
+        """
+        Maps the file again, to see records appended since it was opened
+        """
+        count = (os.path.getsize(self.path) - self.offset) // self.dtype.itemsize
+        if count == 0:
+            # mmap can't map zero bytes
+            self.records = np.zeros(0, dtype=self.dtype)
+        else:
+            self.records = np.memmap(self.path, dtype=self.dtype, mode="r", offset=self.offset, shape=(count,))
+
+    def __len__(self):
+        return len(self.records)
+
+    def compact(self, index):
+        """
+        Schedule number index as a CompactSchedule (its games array is a copy, not a view of the file)
+        """
+        return CompactSchedule(np.array(self.records[index]["games"]), self.weeks.copy(), self.fingerprint)
+
+    def schedule(self, index, teams=None):
+        """
+        Schedule number index as a dict schedule. Without teams, this process must already have the
+        league index for the library's fingerprint (see decode_schedule).
+        """
+        return decode_schedule(self.compact(index), teams)
+
+    def metrics(self, index):
+        return dict(zip(self.metric_names, self.records[index]["metrics"].tolist()))
+
+    def metrics_table(self):
+        """
+        (schedules x metrics) float array of every schedule's metrics, straight from the map
+        """
+        return self.records["metrics"]
+
+    def append(self, schedule, metrics, teams=None):
+        """
+        Adds a dict schedule (needs teams) or CompactSchedule with its metrics dict, returns its index
+        """
+        return self.extend([(schedule, metrics)], teams) - 1
+
+    def extend(self, items, teams=None):
+        """
+        Adds many (schedule, metrics) pairs with one write. Returns the new number of schedules.
+        """
+        records = np.zeros(len(items), dtype=self.dtype)
+        games_per_week = self.header["games_per_week"]
+        for record, (schedule, metrics) in zip(records, items):
+            compact = schedule if isinstance(schedule, CompactSchedule) else encode_schedule(schedule, teams)
+            if compact.fingerprint != self.fingerprint:
+                raise ValueError("Schedule was encoded for a different league than the library")
+            if not np.array_equal(compact.weeks, self.weeks):
+                raise ValueError("Schedule has different weeks than the library")
+            if compact.games.shape[1] > games_per_week:
+                raise ValueError(f"Schedule has more than {games_per_week} games in a week")
+            record["games"] = EMPTY
+            record["games"][:, :compact.games.shape[1]] = compact.games
+            record["metrics"] = [metrics.get(name, np.nan) for name in self.metric_names]
+
+        # one write of whole records, in append mode so concurrent writers don't overwrite each other
+        with open(self.path, "ab") as f:
+            f.write(records.tobytes())
+        self.refresh()
+        return len(self)
+
+
+def open_library(path, teams, weeks=range(1, 19), games_per_week=16):
+    """
+    Opens the library at path, creating it for this league and these weeks if it doesn't exist yet
+    """
+    from league_index import get_league_index
+
+    fingerprint = get_league_index(teams).fingerprint
+    if not os.path.exists(path):
+        create_library(path, fingerprint, weeks, games_per_week)
+    library = ScheduleLibrary(path)
+    if library.fingerprint != fingerprint:
+        raise ValueError(f"{path} holds schedules for a different league")
+    if library.weeks.tolist() != [int(week) for week in weeks]:
+        raise ValueError(f"{path} holds schedules for weeks {library.weeks[0]}-{library.weeks[-1]}, "
+                         f"not {weeks[0]}-{weeks[-1]}")
+    return library
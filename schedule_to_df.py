@@ -1,44 +1,172 @@
+import numpy as np
 import pandas as pd
-from models import ScheduledGame, Team
+from compact_schedule import CompactSchedule, SLOT_CODES, SLOT_IDS, HOME, AWAY, SLOT, EMPTY
+from league_index import get_league_index, index_for_fingerprint
 
-def schedule_to_dataframe(schedule):
+#This maps our slot codes to actual day/time strings
+# They also match the real NFL slots
+SLOT_DAY_TIME = {
+    "SUN_1PM": ("Sun", "1:00 PM"),
+    "SUN_4PM": ("Sun", "4:05 PM"),
+    "SUN_NIGHT": ("Sun", "8:20 PM"),
+    "MON": ("Mon", "8:15 PM"),
+    "THU": ("Thu", "8:15 PM"),
+}
+PRIME_TIME_SLOTS = ("SUN_NIGHT", "MON", "THU")
+
+# Lookup tables indexed by slot code, so every slot-derived column is one array index instead of a dict
+# lookup per game. Categories are listed in week order (Thursday first).
+DAYS = ("Thu", "Sun", "Mon")
+TIMES = ("1:00 PM", "4:05 PM", "8:15 PM", "8:20 PM")
+KICKOFFS = tuple(dict.fromkeys(f"{day} {time}" for day, time in sorted(
+    SLOT_DAY_TIME.values(), key=lambda day_time: (DAYS.index(day_time[0]), day_time[1]))))
+SLOT_DAY = np.array([DAYS.index(SLOT_DAY_TIME[slot][0]) for slot in SLOT_CODES])
+SLOT_TIME = np.array([TIMES.index(SLOT_DAY_TIME[slot][1]) for slot in SLOT_CODES])
+SLOT_KICKOFF = np.array([KICKOFFS.index(" ".join(SLOT_DAY_TIME[slot])) for slot in SLOT_CODES])
+SLOT_PRIME_TIME = np.isin(SLOT_CODES, PRIME_TIME_SLOTS)
+# games with a slot we don't know (or none) keep it in the Slot column but are shown as Sunday 1 PM
+DEFAULT_SLOT_ID = SLOT_IDS["SUN_1PM"]
+MISSING_SLOT = -1
+
+
+class _TeamCodes:
+    # numbers teams in the order we first see them, shared by every schedule in one frame. Slots are
+    # numbered too: SLOT_CODES first, then any other slot label in the order we see it
+    def __init__(self, teams=()):
+        self.teams = []
+        self.ids = {}
+        self.slots = list(SLOT_CODES)
+        self.slot_ids = dict(SLOT_IDS)
+        for team in teams:
+            self.id(team)
+
+    def slot_id(self, slot):
+        if slot is None:
+            return MISSING_SLOT
+        slot_id = self.slot_ids.get(slot)
+        if slot_id is None:
+            slot_id = self.slot_ids[slot] = len(self.slots)
+            self.slots.append(slot)
+        return slot_id
+
+    def id(self, team):
+        team_id = self.ids.get(team.name)
+        if team_id is None:
+            team_id = self.ids[team.name] = len(self.teams)
+            self.teams.append(team)
+        return team_id
+
+
+def _schedule_arrays(schedule, codes):
     """
-    Converts our schedule into a pandas DataFrame, which we than can use to display in Streamlit
+    (week, home id, away id, slot code) arrays of every game, for either schedule form
     """
-    rows = []
-    
-    #This maps our slot codes to actual day/time strings
-    # They also match the real NFL slots
-    slot_to_day_time = {
-        "SUN_1PM": ("Sun", "1:00 PM"),
-        "SUN_4PM": ("Sun", "4:05 PM"),
-        "SUN_NIGHT": ("Sun", "8:20 PM"),
-        "MON": ("Mon", "8:15 PM"),
-        "THU": ("Thu", "8:15 PM"),
-    }
+    if isinstance(schedule, CompactSchedule):
+        index = index_for_fingerprint(schedule.fingerprint)
+        if index is None:
+            raise ValueError("No league index for this schedule, pass the teams it was built from")
+        to_code = np.array([codes.id(team) for team in index.teams])
+        rows, columns = np.nonzero(schedule.games[:, :, HOME] != EMPTY)
+        games = schedule.games[rows, columns].astype(np.intp)
+        return schedule.weeks[rows].astype(np.int64), to_code[games[:, HOME]], to_code[games[:, AWAY]], games[:, SLOT]
 
-     # Loop through each week and each game 
+    weeks, home, away, slot = [], [], [], []
     for week_number, games_this_week in schedule.items():
         for game in games_this_week:
-            day, time = slot_to_day_time.get(game.slot, ("Sun", "1:00 PM"))
-            # Create a row with all the game info we want to have/show
-            rows.append({
-                "Week": week_number,
-                "Home": game.home.name,
-                "Away": game.away.name,
-                "City": game.home.city,
-                "Day": day,
-                "Time": time,
-                "Slot": game.slot,
-            })
-
-    df = pd.DataFrame(rows)
-    df["Matchup"] = df["Away"] + " @ " + df["Home"]
-    df["Kickoff"] = df["Day"] + " " + df["Time"]
-    
-    # Mark the prime time games which will be useful for filtering for display later
-    df["Prime Time"] = df["Slot"].isin(["SUN_NIGHT", "MON", "THU"])
-    
-    
+            weeks.append(week_number)
+            home.append(codes.id(game.home))
+            away.append(codes.id(game.away))
+            slot.append(codes.slot_id(game.slot))
+    return (np.array(weeks, dtype=np.int64), np.array(home, dtype=np.intp), np.array(away, dtype=np.intp),
+            np.array(slot, dtype=np.intp))
+
+
+def _build_frame(columns, codes, schedule_ids=None):
+    weeks, home, away, slot = columns
+    names = [team.name for team in codes.teams]
+    cities = list(dict.fromkeys(team.city for team in codes.teams))
+    team_city = np.array([cities.index(team.city) for team in codes.teams], dtype=np.intp)
+
+    # "Away @ Home" for every pair of teams once, then every game is a lookup
+    name_array = np.array(names, dtype=object)
+    matchups = (name_array[None, :] + " @ " + name_array[:, None]).astype(str) if names else np.empty((0, 0), str)
+    matchup = matchups[home, away] if len(weeks) else np.array([], dtype=str)
+
     # Sort by week first, then alphabetically by matchup, will look the cleanest on UI to see
-    return df.sort_values(["Week", "Matchup"]).reset_index(drop=True)
\ No newline at end of file
+    sort_keys = (matchup, weeks) if schedule_ids is None else (matchup, weeks, schedule_ids)
+    order = np.lexsort(sort_keys)
+    weeks, home, away, slot, matchup = weeks[order], home[order], away[order], slot[order], matchup[order]
+
+    # only the SLOT_CODES have a day and time, everything else gets the default slot's
+    known = np.where((slot >= 0) & (slot < len(SLOT_CODES)), slot, DEFAULT_SLOT_ID)
+
+    data = {}
+    if schedule_ids is not None:
+        data["schedule_id"] = schedule_ids[order]
+    data.update({
+        "Week": weeks,
+        "Home": pd.Categorical.from_codes(home, categories=names),
+        "Away": pd.Categorical.from_codes(away, categories=names),
+        "City": pd.Categorical.from_codes(team_city[home], categories=cities),
+        "Day": pd.Categorical.from_codes(SLOT_DAY[known], categories=DAYS),
+        "Time": pd.Categorical.from_codes(SLOT_TIME[known], categories=TIMES),
+        "Slot": pd.Categorical.from_codes(slot, categories=codes.slots),
+        "Matchup": matchup.astype(object),
+        "Kickoff": pd.Categorical.from_codes(SLOT_KICKOFF[known], categories=KICKOFFS),
+        # Mark the prime time games which will be useful for filtering for display later
+        "Prime Time": SLOT_PRIME_TIME[known],
+    })
+    return pd.DataFrame(data)
+
+
+def schedule_to_dataframe(schedule, teams=None):
+    """
+    Converts our schedule into a pandas DataFrame, which we than can use to display in Streamlit
+    (takes either the dict or the CompactSchedule form)
+
+    The frame is built column by column from arrays. Team, city, day, time, slot and kickoff are
+    categoricals, so filtering on them compares small integer codes instead of strings.
+    """
+    if teams is not None:
+        get_league_index(teams)  # so CompactSchedules from this league can be read back
+    codes = _TeamCodes(teams or ())
+    return _build_frame(_schedule_arrays(schedule, codes), codes)
+
+
+def schedules_to_dataframe(schedules, teams=None, schedule_ids=None):
+    """
+    Many schedules in one long frame with a leading schedule_id column (their position in `schedules`
+    unless schedule_ids is given), for batch exports. Team and other categories are shared by all of them.
+    """
+    if teams is not None:
+        get_league_index(teams)
+    codes = _TeamCodes(teams or ())
+    if schedule_ids is None:
+        schedule_ids = range(len(schedules))
+
+    parts = [_schedule_arrays(schedule, codes) for schedule in schedules]
+    ids = np.concatenate([np.full(len(part[0]), schedule_id) for part, schedule_id in zip(parts, schedule_ids)]) \
+        if parts else np.array([], dtype=np.int64)
+    columns = tuple(np.concatenate([part[column] for part in parts]) if parts else np.array([], dtype=np.intp)
+                    for column in range(4))
+    return _build_frame(columns, codes, ids).reset_index(drop=True)
+
+
+def schedule_views(schedule_df):
+    """
+    Per-week and per-team slices of a schedule_to_dataframe frame, built once per schedule so picking a
+    week or a team in the app is a dict lookup. Team slices get H/A and Opponent columns (worked out for
+    every team at once by stacking a home and an away copy of the frame) and are sorted by week.
+    Returns {"by_week": {week: frame}, "by_team": {team name: frame}}.
+    """
+    by_week = {int(week): games.reset_index(drop=True) for week, games in schedule_df.groupby("Week", sort=True)}
+
+    home = schedule_df.assign(Team=schedule_df["Home"], **{"H/A": "Home", "Opponent": schedule_df["Away"]})
+    away = schedule_df.assign(Team=schedule_df["Away"], **{"H/A": "Away", "Opponent": schedule_df["Home"]})
+    both = pd.concat([home, away], ignore_index=True).sort_values("Week", kind="stable")
+    # team categories are in the order teams were first seen, the picker wants them alphabetical
+    by_team = {
+        team: games.drop(columns="Team").reset_index(drop=True)
+        for team, games in sorted(both.groupby("Team", observed=True), key=lambda item: item[0])
+    }
+    return {"by_week": by_week, "by_team": by_team}
@@ -1,47 +1,80 @@
-import random
 import math
-from collections import defaultdict
+import numpy as np
 from data_class import Team, ScheduledGame
+from compact_schedule import CompactSchedule, as_schedule_dict
+from league_index import get_league_index
+from rng_streams import make_rng, stream_rng
+from tiebreakers import playoff_seeding, results_matrix, CONFERENCES, NUM_PLAYOFF_SEEDS
 
-def simulate_game(team1, team2, is_neutral_site=False, seed=None, noise_scale=0.05):
+# Home field advantage boost, arbitrary/custom value I put
+HOME_ADVANTAGE = 0.03
+# After experimenting a bit, the factor of 10 makes the curve steep enough to be the most realistic for nfl games
+LOGISTIC_SCALE = 10
+# Standard deviation of the per-game noise
+NOISE_SCALE = 0.05
+# seasons simulated per batch, so memory stays bounded for big n_sims
+SEASON_CHUNK_SIZE = 10000
+
+# Keys of the two streams a simulated season draws from, so playoff randomness is independent
+REGULAR_SEASON, PLAYOFFS = 0, 1
+PLAYOFF_GAMES = 13  # 6 wild card, 4 divisional, 2 conference and the Super Bowl
+
+def simulate_game(team1, team2, is_neutral_site=False, seed=None, noise_scale=NOISE_SCALE, rng=None):
     """
     This method simulates a single game between two teams based on their strength ratings.
     The probability of team1 winning is based on the strength differential, with a
     small boost for home field advantage and then I add a small element of noise(bc upsets do happen ocassionally)
     It returns the winning team at end, so either team 1 or team 2
+
+    Randomness comes from `rng` (a NumPy generator), or a new generator made from `seed`.
     """
-    if seed is not None:
-        random.seed(seed)
-        
-    # Home field advantage boost, arbitrary/custom value I put
-    home_advantage = 0.03 if not is_neutral_site else 0.0
+    if rng is None:
+        rng = make_rng(seed)
+
+    # Add some random noise to make games not direct bc upsets happen, need to reflect this
+    noise = rng.normal(0, noise_scale)
+    return decide_game(team1, team2, is_neutral_site, noise, rng.random())
+
+
+def decide_game(team1, team2, is_neutral_site, noise, roll):
+    """
+    The game model of simulate_game, with the noise and the roll already drawn
+    """
+    home_advantage = HOME_ADVANTAGE if not is_neutral_site else 0.0
     
     # Calculate the strength difference between teams
-    strength_diff = (team1.strength + home_advantage) - team2.strength
-    
-    # Add some random noise to make games not direct bc upsets happen, need to reflect this
-    noise = random.gauss(0, noise_scale)
-    strength_diff += noise
+    strength_diff = (team1.strength + home_advantage) - team2.strength + noise
 
      #Use a logistic function to convert strength difference to win probability
-    # After experimenting a bit, the factor of 10 makes the curve steep enough to be the most realistic for nfl games
-    win_prob_team1 = 1 / (1 + math.exp(-10 * strength_diff))
+    win_prob_team1 = 1 / (1 + math.exp(-LOGISTIC_SCALE * strength_diff))
     
     
     # basically rolling a number to see who wins based on prob value above
-    if random.random() < win_prob_team1:
+    if roll < win_prob_team1:
         return team1
     else:
         return team2
 
 
-def simulate_season(schedule, teams, seed=None):
+def simulate_season(schedule, teams, seed=None, rng=None, results=None):
     """
     Simulates the entire regular season and returns team records.
     It gives the team records in the form  of a dictionary like: {team_name: {'wins': int, 'losses': int, 'team': Team}}
+    The schedule can be the dict or the CompactSchedule form.
+    If results (a teams x teams int array, ids like get_league_index) is given, results[i, j] also counts
+    how many times team i beat team j, which is what the playoff tiebreakers need.
+
+    All the noise and rolls for the season are drawn up front from one stream, and game number k
+    (in schedule order) always uses entry k, so results are the same for a given seed.
     """
-    if seed is not None:
-        random.seed(seed)
+    schedule = as_schedule_dict(schedule, teams)
+    if rng is None:
+        rng = stream_rng(seed, REGULAR_SEASON)
+
+    num_games = sum(len(games) for games in schedule.values())
+    team_ids = get_league_index(teams).team_ids
+    noise = rng.normal(0, NOISE_SCALE, size=num_games).tolist()
+    rolls = rng.random(num_games).tolist()
     
     records = {}
     for team in teams:
@@ -58,74 +91,111 @@ def simulate_season(schedule, teams, seed=None):
             home_team = game.home
             away_team = game.away
             
-            # Each game gets its own seed so results are consistent but different
-            game_seed = seed + game_counter if seed is not None else None
-            winner = simulate_game(home_team, away_team, is_neutral_site=False, seed=game_seed)
+            winner = decide_game(home_team, away_team, False, noise[game_counter], rolls[game_counter])
             
              # Update win/loss records based on who won and who lost
             if winner.name == home_team.name:
                 records[home_team.name]['wins'] += 1
                 records[away_team.name]['losses'] += 1
+                loser = away_team
             else:
                 records[away_team.name]['wins'] += 1
                 records[home_team.name]['losses'] += 1
+                loser = home_team
+            if results is not None:
+                results[team_ids[winner.name], team_ids[loser.name]] += 1
             
             game_counter += 1
     
     return records
 
-def determine_playoff_teams(records, conference):
+def schedule_team_ids(schedule, teams):
+    """
+    Flat arrays of home and away team ids (league index ids) for every game, in week order
+    """
+    if isinstance(schedule, CompactSchedule):
+        home_ids, away_ids = schedule.home_away_arrays()
+        return home_ids.astype(np.intp), away_ids.astype(np.intp)
+
+    team_ids = get_league_index(teams).team_ids
+    games = [game for week_num in sorted(schedule) for game in schedule[week_num]]
+    home_ids = np.array([team_ids[game.home.name] for game in games], dtype=np.intp)
+    away_ids = np.array([team_ids[game.away.name] for game in games], dtype=np.intp)
+    return home_ids, away_ids
+
+def simulate_seasons(schedule, teams, n_sims, seed=None, noise_scale=NOISE_SCALE, chunk_size=SEASON_CHUNK_SIZE,
+                     with_results=False):
+    """
+    Batch version of simulate_season that plays n_sims whole seasons at once with NumPy.
+
+    Every game uses the same model as simulate_game (home boost, gaussian noise, logistic curve),
+    but the noise and the win/loss rolls for a whole chunk of seasons are drawn as matrices.
+    Returns an (n_sims x number of teams) array of wins, with columns in the order of `teams`.
+    Seasons are done chunk_size at a time so memory stays bounded for big n_sims.
+
+    with_results=True also returns who won every game, as an (n_sims x games) bool array of whether the
+    home team won, games in schedule_team_ids order (one bit per game and season, see
+    tiebreakers.results_matrix for the who-beat-whom matrix).
+    """
+    wins = np.zeros((n_sims, len(teams)), dtype=np.int32)
+    if with_results:
+        home_won_all = np.zeros((n_sims, len(schedule_team_ids(schedule, teams)[0])), dtype=bool)
+
+    for start, chunk_wins, home_won in _simulate_season_chunks(schedule, teams, n_sims, seed, noise_scale,
+                                                               chunk_size):
+        wins[start:start + len(chunk_wins)] = chunk_wins
+        if with_results:
+            home_won_all[start:start + len(chunk_wins)] = home_won
+
+    if with_results:
+        return wins, home_won_all
+    return wins
+
+def _simulate_season_chunks(schedule, teams, n_sims, seed, noise_scale, chunk_size):
+    # yields (first season, wins, home_won) for chunk_size seasons at a time, see simulate_seasons
+    home_ids, away_ids = schedule_team_ids(schedule, teams)
+    strength = get_league_index(teams).strength
+    num_teams = len(teams)
+    num_games = len(home_ids)
+
+    # the strength difference of every game doesn't change between seasons, so compute it once
+    base_diff = strength[home_ids] + HOME_ADVANTAGE - strength[away_ids]
+
+    rng = stream_rng(seed, REGULAR_SEASON)
+    for start in range(0, n_sims, chunk_size):
+        n = min(chunk_size, n_sims - start)
+        noise = rng.normal(0.0, noise_scale, size=(n, num_games))
+        win_prob_home = 1 / (1 + np.exp(-LOGISTIC_SCALE * (base_diff + noise)))
+        home_won = rng.random((n, num_games)) < win_prob_home
+        winners = np.where(home_won, home_ids, away_ids)
+
+        # offset each season's team ids so a single bincount counts wins for every season in the chunk
+        season_offsets = np.arange(n)[:, None] * num_teams
+        counts = np.bincount((winners + season_offsets).ravel(), minlength=n * num_teams)
+        yield start, counts.reshape(n, num_teams), home_won
+
+def determine_playoff_teams(records, conference, results=None):
     """
     Determines the 7 playoff teams for a given conference using NFL playoff rules, which are:
-    - 4 division winners, so the best record in each division gets a spot in the playoffs
-    - 3 wild card teams, which determined by the next 3 best records in that conference
+    - 4 division winners, so the best record in each division gets a spot in the playoffs, seeded 1-4
+    - 3 wild card teams, which determined by the next 3 best records in that conference, seeded 5-7
+    - ties are broken with head-to-head, division, common games and conference records (see tiebreakers.py),
+      which needs results from simulate_season; without it ties go to the stronger team
     - in the end it returns list of 7 teams seeded 1-7, which is final playoff seeding
     """
-    
-    # Group teams by division within the conference
-    divisions = defaultdict(list)
-    for team_name, record in records.items():
-        team = record['team']
-        if team.conference == conference:
-            divisions[team.division].append({
-                'team': team,
-                'wins': record['wins'],
-                'losses': record['losses']
-            })
-    
-    # Find the winner of each division
-    # Sort by wins first, then by team strength as tiebreaker
-    division_winners = []
-    for division, teams_in_div in divisions.items():
-        teams_in_div.sort(key=lambda x: (x['wins'], x['team'].strength), reverse=True)
-        division_winners.append(teams_in_div[0])
-    # Sort division winners by record to establish initial seeding (seeds 1-4)
-    division_winners.sort(key=lambda x: (x['wins'], x['team'].strength), reverse=True)
-    
-    # Get all teams in this conference for wild card selection
-    all_teams = []
-    for team_name, record in records.items():
-        team = record['team']
-        if team.conference == conference:
-            all_teams.append({
-                'team': team,
-                'wins': record['wins'],
-                'losses': record['losses']
-            })
-    
-    division_winner_names = {dw['team'].name for dw in division_winners}
-    # Wild card pool is everyone except the division winners
-    wild_card_pool = [t for t in all_teams if t['team'].name not in division_winner_names]
-    # Take the top 3 non-division winners as wild cards (seeds 5-7)
-    wild_card_pool.sort(key=lambda x: (x['wins'], x['team'].strength), reverse=True)
-    wild_card_teams = wild_card_pool[:3]
-    # Combine and sort again to get final seeding 1-7
-    playoff_teams = division_winners + wild_card_teams
-    playoff_teams.sort(key=lambda x: (x['wins'], x['team'].strength), reverse=True)
-    
-    return [t['team'] for t in playoff_teams]
-
-def simulate_playoffs(afc_teams, nfc_teams, seed=None):
+    # records are in the order of the team list they were simulated for, which is the order of the ids
+    teams = [record['team'] for record in records.values()]
+    return _playoff_teams(records, teams, results)[conference]
+
+def _playoff_teams(records, teams, results=None):
+    # both conferences' seeds 1-7 as Team lists from one tiebreaker pass, records simulated for teams
+    wins = np.array([[records[team.name]['wins'] for team in teams]])
+    if results is None:
+        results = np.zeros((len(teams), len(teams)), dtype=np.int8)
+    seeds = seed_conferences(wins, teams, results[None])
+    return {conf: [teams[team_id] for team_id in seeds[conf][0]] for conf in CONFERENCES}
+
+def simulate_playoffs(afc_teams, nfc_teams, seed=None, rng=None):
     """
     Simulates the NFL playoffs with the current format:
     - Wild Card Round: #7 with #2, #6 with #3, #5 with #4 x2 bc for each conference
@@ -134,9 +204,17 @@ def simulate_playoffs(afc_teams, nfc_teams, seed=None):
     - Super Bowl usually some random neutral site
     
     Returns dictionary with results of each round and Super Bowl champion
+
+    The noise and rolls for all 13 playoff games are drawn up front from the seed's playoff stream
+    (or from `rng`), and each game uses the entry for its game number.
     """
-    if seed is not None:
-        random.seed(seed)
+    if rng is None:
+        rng = stream_rng(seed, PLAYOFFS)
+    noise = rng.normal(0, NOISE_SCALE, size=PLAYOFF_GAMES).tolist()
+    rolls = rng.random(PLAYOFF_GAMES).tolist()
+
+    def play_game(home_team, away_team, game_index, is_neutral_site=False):
+        return decide_game(home_team, away_team, is_neutral_site, noise[game_index], rolls[game_index])
     
     results = {
         'wild_card': {'AFC': [], 'NFC': []},
@@ -152,18 +230,15 @@ def simulate_playoffs(afc_teams, nfc_teams, seed=None):
 
         # Wild Card Round, so three games per conference 7 plays 2, 6 plays 3, 5 plays 4, latter team is home team
         
-        game_seed = seed + game_counter if seed is not None else None
-        winner1 = simulate_game(teams[1], teams[6], seed=game_seed)
+        winner1 = play_game(teams[1], teams[6], game_counter)
         results['wild_card'][conf].append(f"{teams[6].name} @ {teams[1].name} → {winner1.name} wins")
         game_counter += 1
         
-        game_seed = seed + game_counter if seed is not None else None
-        winner2 = simulate_game(teams[2], teams[5], seed=game_seed)
+        winner2 = play_game(teams[2], teams[5], game_counter)
         results['wild_card'][conf].append(f"{teams[5].name} @ {teams[2].name} → {winner2.name} wins")
         game_counter += 1
         
-        game_seed = seed + game_counter if seed is not None else None
-        winner3 = simulate_game(teams[3], teams[4], seed=game_seed)
+        winner3 = play_game(teams[3], teams[4], game_counter)
         results['wild_card'][conf].append(f"{teams[4].name} @ {teams[3].name} → {winner3.name} wins")
         game_counter += 1
         
@@ -179,16 +254,14 @@ def simulate_playoffs(afc_teams, nfc_teams, seed=None):
         # divisional Round so two games per conference, and the lowest remaining seed plays the #1 seed who had a bye
         #during wild card round 
         lowest_seed_team, _ = wild_card_winners[0]
-        game_seed = seed + game_counter if seed is not None else None
-        div_winner1 = simulate_game(teams[0], lowest_seed_team, seed=game_seed)
+        div_winner1 = play_game(teams[0], lowest_seed_team, game_counter)
         results['divisional'][conf].append(f"{lowest_seed_team.name} @ {teams[0].name} → {div_winner1.name} wins")
         game_counter += 1
         
         # The other two wild card winners play each other, the higher seed hosts at their home stadium
         middle_seed_team, middle_seed = wild_card_winners[1]
         highest_seed_team, highest_seed = wild_card_winners[2]
-        game_seed = seed + game_counter if seed is not None else None
-        div_winner2 = simulate_game(highest_seed_team, middle_seed_team, seed=game_seed)
+        div_winner2 = play_game(highest_seed_team, middle_seed_team, game_counter)
         results['divisional'][conf].append(f"{middle_seed_team.name} @ {highest_seed_team.name} → {div_winner2.name} wins")
         game_counter += 1
     
@@ -201,8 +274,7 @@ def simulate_playoffs(afc_teams, nfc_teams, seed=None):
         else:
             home_team, away_team = div_winner2, div_winner1
         
-        game_seed = seed + game_counter if seed is not None else None
-        conf_champ = simulate_game(home_team, away_team, seed=game_seed)
+        conf_champ = play_game(home_team, away_team, game_counter)
         results['conference'][conf] = f"{away_team.name} @ {home_team.name} → {conf_champ.name} wins"
         game_counter += 1
         
@@ -212,8 +284,7 @@ def simulate_playoffs(afc_teams, nfc_teams, seed=None):
             nfc_champ = conf_champ
     
     # Super Bowl, which is played at some neutral site
-    game_seed = seed + game_counter if seed is not None else None
-    sb_winner = simulate_game(afc_champ, nfc_champ, is_neutral_site=True, seed=game_seed)
+    sb_winner = play_game(afc_champ, nfc_champ, game_counter, is_neutral_site=True)
     results['super_bowl'] = f"{afc_champ.name} vs {nfc_champ.name} → {sb_winner.name} wins Super Bowl!"
     results['champion'] = sb_winner
     
@@ -230,17 +301,135 @@ def full_season_playoff_simulation(schedule, teams, seed=None):
     - playoff_results: results of all playoff rounds
     """
     
-    # Simulate all 18 weeks of regular season
-    records = simulate_season(schedule, teams, seed=seed)
+    # Simulate all 18 weeks of regular season, keeping who beat whom for the tiebreakers
+    results = np.zeros((len(teams), len(teams)), dtype=np.int8)
+    records = simulate_season(schedule, teams, seed=seed, results=results)
     
     
-    # Determine which 7 teams from each conference make the playoffs
-    afc_playoff_teams = determine_playoff_teams(records, 'AFC')
-    nfc_playoff_teams = determine_playoff_teams(records, 'NFC')
+    # Determine which 7 teams from each conference make the playoffs, both from one seeding of the season
+    playoff_teams = _playoff_teams(records, teams, results)
+    afc_playoff_teams = playoff_teams['AFC']
+    nfc_playoff_teams = playoff_teams['NFC']
     
-    #simulates the playoffs with a different seed to add variety
-    # Adding 1000 to our seed lets it so that playoff randomness is independent from regular season, we want uncorrelated randomness here
-    playoff_seed = (seed + 1000) if seed is not None else None
-    playoff_results = simulate_playoffs(afc_playoff_teams, nfc_playoff_teams, seed=playoff_seed)
+    #simulates the playoffs from the same seed; simulate_playoffs draws from its own stream of the seed,
+    # so playoff randomness is independent from regular season, we want uncorrelated randomness here
+    playoff_results = simulate_playoffs(afc_playoff_teams, nfc_playoff_teams, seed=seed)
     
-    return records, afc_playoff_teams, nfc_playoff_teams, playoff_results
\ No newline at end of file
+    return records, afc_playoff_teams, nfc_playoff_teams, playoff_results
+
+def seed_conferences(wins, teams, results):
+    """
+    Batch version of determine_playoff_teams for a (n_sims x number of teams) wins array and the matching
+    (n_sims x teams x teams) results array from tiebreakers.results_matrix.
+    Returns {conference: (n_sims x 7) array of team ids}, seed 1 in column 0.
+    """
+    return playoff_seeding(teams).seed(wins, results)
+
+def play_games(home_ids, away_ids, strength, rng, is_neutral_site=False, noise_scale=NOISE_SCALE):
+    """
+    Vectorized simulate_game: plays home_ids[k] vs away_ids[k] for every k and returns the winner ids
+    """
+    home_advantage = HOME_ADVANTAGE if not is_neutral_site else 0.0
+    strength_diff = strength[home_ids] + home_advantage - strength[away_ids]
+    strength_diff = strength_diff + rng.normal(0.0, noise_scale, size=len(home_ids))
+    win_prob_home = 1 / (1 + np.exp(-LOGISTIC_SCALE * strength_diff))
+    return np.where(rng.random(len(home_ids)) < win_prob_home, home_ids, away_ids)
+
+def simulate_playoffs_batch(seeds, teams, seed=None):
+    """
+    Batch version of simulate_playoffs, running the same bracket for every simulated season at once.
+
+    Takes the output of seed_conferences and returns integer team id arrays (one entry per season):
+      - 'wild_card'  : {conference: (n_sims x 3)} wild card round winners
+      - 'divisional' : {conference: (n_sims x 2)} divisional round winners
+      - 'conference' : {conference: (n_sims,)} conference champions
+      - 'super_bowl' : (n_sims,) Super Bowl champions
+    """
+    strength = get_league_index(teams).strength
+    rng = stream_rng(seed, PLAYOFFS)
+
+    results = {'wild_card': {}, 'divisional': {}, 'conference': {}}
+    for conf in CONFERENCES:
+        conf_seeds = seeds[conf]
+        rows = np.arange(len(conf_seeds))
+
+        # Wild Card Round, 7 plays 2, 6 plays 3, 5 plays 4 and the better seed hosts
+        wild_card_winners = np.stack([
+            play_games(conf_seeds[:, 1], conf_seeds[:, 6], strength, rng),
+            play_games(conf_seeds[:, 2], conf_seeds[:, 5], strength, rng),
+            play_games(conf_seeds[:, 3], conf_seeds[:, 4], strength, rng),
+        ], axis=1)
+
+        # seed positions (0-6) of the wild card winners, sorted the same way simulate_playoffs does
+        winner_positions = np.stack([
+            np.where(wild_card_winners[:, 0] == conf_seeds[:, 1], 1, 6),
+            np.where(wild_card_winners[:, 1] == conf_seeds[:, 2], 2, 5),
+            np.where(wild_card_winners[:, 2] == conf_seeds[:, 3], 3, 4),
+        ], axis=1)
+        winner_positions.sort(axis=1)
+        first, middle, last = winner_positions.T
+
+        # Divisional Round, the #1 seed hosts the first remaining team and the other two play each other
+        div_winner1 = play_games(conf_seeds[:, 0], conf_seeds[rows, first], strength, rng)
+        div_winner2 = play_games(conf_seeds[rows, last], conf_seeds[rows, middle], strength, rng)
+
+        # Conference Championship, the higher seed hosts
+        div_w1_seed = np.where(div_winner1 == conf_seeds[:, 0], 0, first)
+        div_w2_seed = np.where(div_winner2 == conf_seeds[rows, last], last, middle)
+        w1_hosts = div_w1_seed < div_w2_seed
+        conf_champ = play_games(
+            np.where(w1_hosts, div_winner1, div_winner2),
+            np.where(w1_hosts, div_winner2, div_winner1),
+            strength, rng,
+        )
+
+        results['wild_card'][conf] = wild_card_winners
+        results['divisional'][conf] = np.stack([div_winner1, div_winner2], axis=1)
+        results['conference'][conf] = conf_champ
+
+    results['super_bowl'] = play_games(
+        results['conference']['AFC'], results['conference']['NFC'], strength, rng, is_neutral_site=True
+    )
+    return results
+
+def playoff_probabilities(schedule, teams, n_sims, seed=None, chunk_size=5000):
+    """
+    Simulates n_sims regular seasons and playoffs and returns per-team odds, indexed like `teams`:
+      - 'mean_wins'      : average regular season wins
+      - 'make_playoffs'  : probability of being one of the 7 seeds in the conference
+      - 'seed'           : (number of teams x 7) probability of getting each seed
+      - 'win_conference' : probability of winning the conference championship
+      - 'win_super_bowl' : probability of winning the Super Bowl
+    """
+    # both steps draw from their own stream of the seed, so the playoff randomness is independent
+    home_ids, away_ids = schedule_team_ids(schedule, teams)
+    seeding = playoff_seeding(teams)
+    wins = np.zeros((n_sims, len(teams)), dtype=np.int32)
+    chunks = []
+    for start, chunk_wins, home_won in _simulate_season_chunks(schedule, teams, n_sims, seed, NOISE_SCALE,
+                                                               SEASON_CHUNK_SIZE):
+        wins[start:start + len(chunk_wins)] = chunk_wins
+        # only the seeds are kept, the game results go as soon as they're seeded. The who-beat-whom matrices
+        # are teams x teams per season, so they're only built chunk_size seasons at a time
+        for offset in range(0, len(chunk_wins), chunk_size):
+            part = slice(offset, offset + chunk_size)
+            chunks.append(seeding.seed(chunk_wins[part],
+                                       results_matrix(home_ids, away_ids, home_won[part], len(teams))))
+    seeds = {conf: np.concatenate([chunk[conf] for chunk in chunks]) for conf in CONFERENCES}
+    results = simulate_playoffs_batch(seeds, teams, seed=seed)
+
+    num_teams = len(teams)
+    seed_counts = np.zeros((num_teams, NUM_PLAYOFF_SEEDS), dtype=np.int64)
+    conference_counts = np.zeros(num_teams, dtype=np.int64)
+    for conf in CONFERENCES:
+        for position in range(NUM_PLAYOFF_SEEDS):
+            seed_counts[:, position] += np.bincount(seeds[conf][:, position], minlength=num_teams)
+        conference_counts += np.bincount(results['conference'][conf], minlength=num_teams)
+
+    return {
+        'mean_wins': wins.mean(axis=0),
+        'make_playoffs': seed_counts.sum(axis=1) / n_sims,
+        'seed': seed_counts / n_sims,
+        'win_conference': conference_counts / n_sims,
+        'win_super_bowl': np.bincount(results['super_bowl'], minlength=num_teams) / n_sims,
+    }
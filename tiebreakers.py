@@ -0,0 +1,174 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from league_index import get_league_index
+
+CONFERENCES = ('AFC', 'NFC')
+NUM_PLAYOFF_SEEDS = 7
+MIN_COMMON_GAMES = 4  # the common games step only counts with at least this many common games
+SEEDING_CACHE_SIZE = 4
+
+_SEEDINGS = OrderedDict()
+
+
+def results_matrix(home_ids, away_ids, home_won, num_teams):
+    """
+    Who beat whom in a batch of seasons: (n_sims x teams x teams) int8 where results[s, i, j] is how many
+    times team i beat team j in season s. home_won is (n_sims x games) bool, in the order of home_ids/away_ids.
+    """
+    n_sims = len(home_won)
+    winners = np.where(home_won, home_ids, away_ids)
+    losers = np.where(home_won, away_ids, home_ids)
+    # offset each season so one bincount fills every season's matrix
+    cells = winners * num_teams + losers + np.arange(n_sims)[:, None] * num_teams * num_teams
+    counts = np.bincount(cells.ravel(), minlength=n_sims * num_teams * num_teams)
+    return counts.reshape(n_sims, num_teams, num_teams).astype(np.int8)
+
+
+def _win_pct(wins, games):
+    # no games counts as .500, so it neither helps nor hurts
+    return np.where(games > 0, wins / np.maximum(games, 1), 0.5)
+
+
+def playoff_seeding(teams):
+    """
+    The PlayoffSeeding for this league, built once per league fingerprint and shared, since its tables only
+    depend on the teams
+    """
+    fingerprint = get_league_index(teams).fingerprint
+    seeding = _SEEDINGS.get(fingerprint)
+    if seeding is None:
+        seeding = PlayoffSeeding(teams)
+        _SEEDINGS[fingerprint] = seeding
+        if len(_SEEDINGS) > SEEDING_CACHE_SIZE:
+            _SEEDINGS.popitem(last=False)
+    _SEEDINGS.move_to_end(fingerprint)
+    return seeding
+
+
+class PlayoffSeeding:
+    """
+    NFL playoff seeding with real tiebreakers, for thousands of simulated seasons at once.
+
+    Every conference gets its 4 division winners as seeds 1-4 and the 3 best other teams as seeds 5-7.
+    Teams with the same number of wins are ordered by:
+      - within a division: head-to-head, division record, common games, conference record
+      - between divisions (seeding division winners, picking wild cards): head-to-head, conference record,
+        common games
+    and then team strength and list order (standing in for strength of victory and the coin toss).
+
+    Head-to-head is the record against the other teams tied with it, common games the record against the
+    opponents every tied team played (at least MIN_COMMON_GAMES of them, otherwise the step is skipped).
+    Every step is a lookup in the results matrix (see results_matrix), so a batch of seasons is a few array
+    operations. Unlike the NFL rules, multi-team ties are broken in one pass instead of restarting the steps
+    every time a team is separated, and a wild card tie inside a division doesn't go through the division
+    steps first.
+    """
+
+    def __init__(self, teams):
+        self.teams = teams
+        index = get_league_index(teams)
+        num_teams = len(teams)
+
+        conferences = np.array([team.conference for team in teams])
+        divisions = np.array([f"{team.conference} {team.division}" for team in teams])
+        self.same_conference = conferences[:, None] == conferences[None, :]
+        self.same_division = divisions[:, None] == divisions[None, :]
+        self.conference_ids = {conf: np.nonzero(conferences == conf)[0] for conf in CONFERENCES}
+
+        # teams sorted by division, and where each division starts in that order
+        division_names, self.division_code = np.unique(divisions, return_inverse=True)
+        self.conference_code = np.unique(conferences, return_inverse=True)[1]
+        self.by_division = np.argsort(self.division_code, kind="stable")
+        self.division_starts = np.searchsorted(self.division_code[self.by_division], np.arange(len(division_names)))
+
+        # the last two tiebreakers are the same in every season: stronger team, then earlier in the list
+        self.strength = np.asarray(index.strength, dtype=float)
+        self.list_order = np.arange(num_teams)
+
+    def seed(self, wins, results):
+        """
+        {conference: (n_sims x 7) array of team ids}, seed 1 in column 0, for wins (n_sims x teams) and
+        results (n_sims x teams x teams, see results_matrix). Every season has to be of the same schedule.
+        """
+        n_sims, num_teams = wins.shape
+        results = results.astype(np.float32)
+        # who plays whom how often is the same in every season of a schedule, so it comes from the first one
+        games = results[0] + results[0].T
+        conference_pct = self._group_pct(results, games, self.conference_code)
+        division_winner = self._division_winners(wins, results, games, conference_pct)
+
+        # division winners only break ties with division winners, everyone else with everyone else
+        head_to_head, common_pct = self._tiebreak_records(
+            wins, results, games, self.same_conference[None] & (division_winner[:, :, None] == division_winner[:, None, :])
+        )
+
+        seeds = {}
+        for conf, conf_ids in self.conference_ids.items():
+            order = np.lexsort((
+                np.broadcast_to(self.list_order[conf_ids], (n_sims, len(conf_ids))),
+                np.broadcast_to(-self.strength[conf_ids], (n_sims, len(conf_ids))),
+                -common_pct[:, conf_ids],
+                -conference_pct[:, conf_ids],
+                -head_to_head[:, conf_ids],
+                -wins[:, conf_ids],
+                ~division_winner[:, conf_ids],  # division winners first
+            ), axis=-1)
+            seeds[conf] = conf_ids[order[:, :NUM_PLAYOFF_SEEDS]]
+        return seeds
+
+    def _division_winners(self, wins, results, games, conference_pct):
+        """
+        (n_sims x teams) bool, True for the team that wins its division in that season
+        """
+        n_sims, num_teams = wins.shape
+        head_to_head, common_pct = self._tiebreak_records(wins, results, games, self.same_division[None])
+        division_pct = self._group_pct(results, games, self.division_code)
+
+        # sort each division's teams best first, the winner is the first one of every division
+        columns = self.by_division
+        order = np.lexsort((
+            np.broadcast_to(self.list_order[columns], (n_sims, num_teams)),
+            np.broadcast_to(-self.strength[columns], (n_sims, num_teams)),
+            -conference_pct[:, columns],
+            -common_pct[:, columns],
+            -division_pct[:, columns],
+            -head_to_head[:, columns],
+            -wins[:, columns],
+            np.broadcast_to(self.division_code[columns], (n_sims, num_teams)),
+        ), axis=-1)
+        winners = columns[order[:, self.division_starts]]
+
+        division_winner = np.zeros((n_sims, num_teams), dtype=bool)
+        division_winner[np.arange(n_sims)[:, None], winners] = True
+        return division_winner
+
+    def _group_pct(self, results, games, group_code):
+        """
+        Every team's win percentage against its own group (conference or division), from one matmul
+        against the group membership matrix
+        """
+        membership = np.eye(group_code.max() + 1, dtype=np.float32)[group_code]  # teams x groups
+        own_group = (np.arange(len(group_code)), group_code)
+        group_wins = (results @ membership)[:, own_group[0], own_group[1]]
+        group_games = (games @ membership)[own_group]
+        return _win_pct(group_wins, group_games)
+
+    def _tiebreak_records(self, wins, results, games, same_group):
+        """
+        Head-to-head and common games win percentages of every team, against the teams tied with it
+        (same wins and same_group, n_sims x teams x teams)
+        """
+        tied = same_group & (wins[:, :, None] == wins[:, None, :])  # includes the team itself
+        others = (tied & ~np.eye(wins.shape[1], dtype=bool)).astype(np.float32)
+        head_to_head = _win_pct(np.einsum("sij,sij->si", results, others), np.einsum("sij,ij->si", others, games))
+
+        # common opponents: played by every team in the tie, and not one of them
+        tied = tied.astype(np.float32)
+        played_by = tied @ (games > 0).astype(np.float32)
+        common = ((played_by == tied.sum(axis=-1)[:, :, None]) & (tied == 0)).astype(np.float32)
+        common_games = np.einsum("sij,ij->si", common, games)
+        common_pct = np.where(common_games >= MIN_COMMON_GAMES,
+                              _win_pct(np.einsum("sij,sij->si", results, common), common_games), 0.5)
+        return head_to_head, common_pct
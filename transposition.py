@@ -0,0 +1,131 @@
+from collections import OrderedDict
+
+from compact_schedule import CompactSchedule, SLOT_CODES, SLOT_IDS, HOME, EMPTY
+from league_index import get_league_index
+from rng_streams import make_rng
+
+# Fixed seed for the Zobrist keys, so the same schedule hashes the same way in every run
+ZOBRIST_SEED = 20240917
+# key tables we keep around, one per league and season length
+KEY_TABLE_CACHE_SIZE = 4
+
+_KEY_TABLES = OrderedDict()
+
+
+def zobrist_keys(fingerprint, num_weeks, num_teams):
+    """
+    The Zobrist key table for a league and season length, [week row][home][away][slot] -> 64-bit key.
+    Built once and shared by every ZobristHasher, since the keys only depend on the fixed seed and the shape.
+    """
+    cache_key = (fingerprint, num_weeks)
+    keys = _KEY_TABLES.get(cache_key)
+    if keys is None:
+        keys = make_rng(ZOBRIST_SEED).integers(
+            0, 2**63, size=(num_weeks, num_teams, num_teams, len(SLOT_CODES)), dtype="int64"
+        )
+        # nested lists of python ints are much faster to index one at a time than a NumPy array
+        keys = keys.tolist()
+        _KEY_TABLES[cache_key] = keys
+        if len(_KEY_TABLES) > KEY_TABLE_CACHE_SIZE:
+            _KEY_TABLES.popitem(last=False)
+    _KEY_TABLES.move_to_end(cache_key)
+    return keys
+
+
+class ZobristHasher:
+    """
+    Incremental 64-bit hash of a schedule.
+
+    Every (week, home team, away team, slot) combination gets a random 64-bit key and the hash of a schedule
+    is the XOR of the keys of all its games. Swapping two games only changes four keys, so swap_games can
+    keep the hash up to date in O(1) instead of rehashing the whole season. The order of the games inside
+    a week doesn't change the hash, since it doesn't change the schedule either.
+    """
+
+    def __init__(self, teams, weeks):
+        index = get_league_index(teams)
+        self.team_ids = index.team_ids
+        self.week_rows = {week: row for row, week in enumerate(sorted(weeks))}
+
+        self.keys = zobrist_keys(index.fingerprint, len(self.week_rows), len(teams))
+        self.value = 0
+
+    def game_ids(self, schedule, week, index):
+        """
+        (home id, away id, slot code) of the game at schedule[week][index], for either schedule form
+        """
+        if isinstance(schedule, CompactSchedule):
+            home_id, away_id, slot_code = schedule.games[schedule.week_row(week), index].tolist()
+            return home_id, away_id, slot_code
+        game = schedule[week][index]
+        return self.team_ids[game.home.name], self.team_ids[game.away.name], SLOT_IDS[game.slot]
+
+    def game_key(self, week, ids):
+        home_id, away_id, slot_code = ids
+        return self.keys[self.week_rows[week]][home_id][away_id][slot_code]
+
+    def hash_schedule(self, schedule):
+        """
+        Hashes a whole schedule from scratch and makes it the current value
+        """
+        value = 0
+        if isinstance(schedule, CompactSchedule):
+            for row, week in enumerate(schedule.weeks.tolist()):
+                for ids in schedule.games[row].tolist():
+                    if ids[HOME] != EMPTY:
+                        value ^= self.game_key(week, ids)
+        else:
+            for week, games in schedule.items():
+                for index in range(len(games)):
+                    value ^= self.game_key(week, self.game_ids(schedule, week, index))
+        self.value = value
+        return value
+
+    def toggle_game(self, week, ids):
+        """
+        Adds a game to the hash, or takes it out if it's already in (XOR both ways)
+        """
+        self.value ^= self.game_key(week, ids)
+
+    def update_for_swap(self, schedule, week1, index1, week2, index2):
+        """
+        Updates the hash for swapping schedule[week1][index1] and schedule[week2][index2].
+        Works before or after the swap, since the change is the same XOR either way.
+        """
+        ids1 = self.game_ids(schedule, week1, index1)
+        ids2 = self.game_ids(schedule, week2, index2)
+        self.value ^= (
+            self.game_key(week1, ids1) ^ self.game_key(week2, ids1)
+            ^ self.game_key(week2, ids2) ^ self.game_key(week1, ids2)
+        )
+
+
+class TranspositionTable:
+    """
+    Size-capped LRU map from schedule hash to (cost, searched_depth), where searched_depth is how many more
+    levels the search went below that schedule (-1 if it was only evaluated). Counts hits and misses.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, cost, searched_depth):
+        previous = self.entries.get(key)
+        if previous is not None:
+            searched_depth = max(searched_depth, previous[1])
+        self.entries[key] = (cost, searched_depth)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
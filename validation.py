@@ -0,0 +1,235 @@
+from compact_schedule import CompactSchedule, SLOT_IDS, as_schedule_dict
+from league_index import get_league_index
+from moves import Move
+
+# The rules a schedule is checked against, see ScheduleValidator
+RULES = ("double_booked", "byes", "home_away", "division", "prime_time")
+
+# how many games of each slot every week has to have
+REQUIRED_SLOTS_PER_WEEK = {"SUN_NIGHT": 1, "MON": 1}
+
+
+class ScheduleValidator:
+    """
+    Checks the schedule invariants:
+      - double_booked: nobody plays more than once in a week
+      - byes:          every team has byes_per_team weeks off
+      - home_away:     every team's home and away games are within max_home_imbalance of each other
+      - division:      division rivals play each other division_games times
+      - prime_time:    every week has the games per slot in required_slots (one SUN_NIGHT and one MON)
+
+    reset(schedule) counts everything from scratch. After that the counters are kept up to date one game at
+    a time (add_game/remove_game, or apply_move around a move), and for every rule we keep how many teams,
+    weeks or pairs break it, so violation_count()/is_valid() are O(1) and a move costs O(1) to check.
+    violations() lists every problem in words, for reports.
+    """
+
+    def __init__(self, teams, weeks, byes_per_team=1, max_home_imbalance=1, division_games=2,
+                 required_slots=REQUIRED_SLOTS_PER_WEEK):
+        index = get_league_index(teams)
+        self.teams = index.teams
+        self.team_ids = index.team_ids
+        self.weeks = sorted(weeks)
+        self.week_rows = {week: row for row, week in enumerate(self.weeks)}
+        self.byes_per_team = byes_per_team
+        self.max_home_imbalance = max_home_imbalance
+        self.division_games = division_games
+        self.required_slots = {SLOT_IDS[slot]: count for slot, count in required_slots.items()}
+        self.rivals = [
+            [t1 is not t2 and t1.conference == t2.conference and t1.division == t2.division for t2 in self.teams]
+            for t1 in self.teams
+        ]
+        self.reset()
+
+    def reset(self, schedule=None):
+        """
+        Clears the counters and counts every game of schedule (if given)
+        """
+        num_teams, num_weeks = len(self.teams), len(self.weeks)
+        # nested lists, since we only ever touch one counter at a time
+        self.plays = [[0] * num_weeks for _ in range(num_teams)]
+        self.byes = [num_weeks] * num_teams
+        self.home_games = [0] * num_teams
+        self.games_played = [0] * num_teams
+        self.pair_games = [[0] * num_teams for _ in range(num_teams)]
+        self.slot_counts = [[0] * len(SLOT_IDS) for _ in range(num_weeks)]
+
+        # with no games at all, every team has too many byes, every division pair is missing games
+        # and every week is missing its prime-time games
+        self.counts = dict.fromkeys(RULES, 0)
+        self.counts["byes"] = num_teams if num_weeks != self.byes_per_team else 0
+        self.counts["division"] = sum(map(sum, self.rivals)) // 2 if self.division_games else 0
+        self.counts["prime_time"] = num_weeks if any(self.required_slots.values()) else 0
+
+        if schedule is not None:
+            for week, games in as_schedule_dict(schedule, self.teams).items():
+                for game in games:
+                    self.add_game(week, game)
+
+    def add_game(self, week, game):
+        self._count_game(week, game, 1)
+
+    def remove_game(self, week, game):
+        self._count_game(week, game, -1)
+
+    def apply_move(self, schedule, move, make_move, undo=False):
+        """
+        Keeps the counters in sync with a move: takes out the games the move touches, calls make_move()
+        to change the schedule and counts the games at their new places. Pass undo=True when make_move
+        undoes `move` rather than making it. move is a moves.Move or an optimizer swap tuple.
+        """
+        for week, index in _touched_positions(schedule, move, applied=undo):
+            self.remove_game(week, schedule[week][index])
+        make_move()
+        for week, index in _touched_positions(schedule, move, applied=not undo):
+            self.add_game(week, schedule[week][index])
+
+    def violation_count(self):
+        return sum(self.counts.values())
+
+    def is_valid(self):
+        return self.violation_count() == 0
+
+    def violations(self):
+        """
+        Every broken rule as a readable message, in RULES order
+        """
+        names = [team.name for team in self.teams]
+        found = []
+        for team, rows in enumerate(self.plays):
+            for row, plays in enumerate(rows):
+                if plays > 1:
+                    found.append(f"{names[team]} plays {plays} games in week {self.weeks[row]}")
+        for team, byes in enumerate(self.byes):
+            if byes != self.byes_per_team:
+                found.append(f"{names[team]} has {byes} byes instead of {self.byes_per_team}")
+        for team in range(len(names)):
+            if self._unbalanced(team):
+                away = self.games_played[team] - self.home_games[team]
+                found.append(f"{names[team]} has {self.home_games[team]} home and {away} away games")
+        for t1 in range(len(names)):
+            for t2 in range(t1 + 1, len(names)):
+                if self.rivals[t1][t2] and self.pair_games[t1][t2] != self.division_games:
+                    found.append(f"{names[t1]} and {names[t2]} play {self.pair_games[t1][t2]} times "
+                                 f"instead of {self.division_games}")
+        slot_names = {code: slot for slot, code in SLOT_IDS.items()}
+        for row, counts in enumerate(self.slot_counts):
+            for code, required in self.required_slots.items():
+                if counts[code] != required:
+                    found.append(f"Week {self.weeks[row]} has {counts[code]} {slot_names[code]} games "
+                                 f"instead of {required}")
+        return found
+
+    def _count_game(self, week, game, step):
+        row = self.week_rows[week]
+        home, away = self.team_ids[game.home.name], self.team_ids[game.away.name]
+        for team in (home, away):
+            self._count_plays(team, row, step)
+
+        before = self._unbalanced(home), self._unbalanced(away)
+        self.home_games[home] += step
+        self.games_played[home] += step
+        self.games_played[away] += step
+        self._tally("home_away", before[0], self._unbalanced(home))
+        self._tally("home_away", before[1], self._unbalanced(away))
+
+        if self.rivals[home][away]:
+            count = self.pair_games[home][away]
+            self.pair_games[home][away] = self.pair_games[away][home] = count + step
+            self._tally("division", count != self.division_games, count + step != self.division_games)
+
+        slot = SLOT_IDS[game.slot]
+        if slot in self.required_slots:
+            before = self._slots_wrong(row)
+            self.slot_counts[row][slot] += step
+            self._tally("prime_time", before, self._slots_wrong(row))
+        else:
+            self.slot_counts[row][slot] += step
+
+    def _count_plays(self, team, row, step):
+        plays = self.plays[team]
+        was_bye = plays[row] == 0
+        self._tally("double_booked", plays[row] > 1, plays[row] + step > 1)
+        plays[row] += step
+        if was_bye != (plays[row] == 0):
+            before = self.byes[team] != self.byes_per_team
+            self.byes[team] += 1 if plays[row] == 0 else -1
+            self._tally("byes", before, self.byes[team] != self.byes_per_team)
+
+    def _unbalanced(self, team):
+        return abs(2 * self.home_games[team] - self.games_played[team]) > self.max_home_imbalance
+
+    def _slots_wrong(self, row):
+        counts = self.slot_counts[row]
+        return any(counts[code] != required for code, required in self.required_slots.items())
+
+    def _tally(self, rule, was_broken, is_broken):
+        self.counts[rule] += is_broken - was_broken
+
+
+def _touched_positions(schedule, move, applied):
+    """
+    (week, index) of every game a move changes, before it's made (applied=False) or after (applied=True).
+    Games that only change position inside a week don't count, they're the same game in the same week.
+    """
+    if not isinstance(move, Move):
+        week1, index1, week2, index2 = move
+        return [(week1, index1), (week2, index2)]
+    if move.kind == "swap":
+        return [(move.week1, move.index1), (move.week2, move.index2)]
+    if move.kind == "flip":
+        return [(move.week1, move.index1)]
+    if move.kind == "slot":
+        return [(move.week1, move.index1), (move.week1, move.index2)]
+    # bye: the game leaves week1 and is appended to week2
+    if applied:
+        return [(move.week2, len(schedule[move.week2]) - 1)]
+    return [(move.week1, move.index1)]
+
+
+class ValidatedMoves:
+    """
+    Wraps a move source (see optimizer.make_move_source) so sample() only hands out moves that don't add
+    violations, checked with the validator's O(1) counters. Moves that would are counted in `rejected`.
+    Starting schedules don't have to be perfect, a move only has to not make things worse.
+    """
+
+    def __init__(self, moves, schedule, validator):
+        self.moves = moves
+        self.schedule = schedule
+        self.validator = validator
+        self.rejected = 0
+        validator.reset(schedule)
+
+    def sample(self, n, rng):
+        allowed = self.validator.violation_count()
+        kept = []
+        for move in self.moves.sample(n, rng):
+            self.apply(move)
+            ok = self.validator.violation_count() <= allowed
+            self.undo(move)
+            if ok:
+                kept.append(move)
+            else:
+                self.rejected += 1
+        return kept
+
+    def apply(self, move, hasher=None):
+        self.validator.apply_move(self.schedule, move, lambda: self.moves.apply(move, hasher))
+
+    def undo(self, move, hasher=None):
+        self.validator.apply_move(self.schedule, move, lambda: self.moves.undo(move, hasher), undo=True)
+
+
+def validate_schedule(schedule, teams, **rules):
+    """
+    Full check of a dict or CompactSchedule, e.g. one loaded from disk. rules are ScheduleValidator's
+    options. Returns the list of violations, empty if the schedule is valid.
+    """
+    if isinstance(schedule, CompactSchedule):
+        weeks = schedule.weeks.tolist()
+    else:
+        weeks = list(schedule)
+    validator = ScheduleValidator(teams, weeks, **rules)
+    validator.reset(schedule)
+    return validator.violations()